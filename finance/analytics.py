@@ -0,0 +1,99 @@
+"""
+Spending / income breakdowns for ``/analytics/spending/``.
+
+Everything is computed by one grouped query: the user's transactions in
+the date range, GROUP BY the requested dimensions (category, merchant,
+account) and optionally a day/week/month period, summing money out and
+money in the way the monthly rollups do (abs(amount), split on isIncome).
+``WHERE user_id = ? AND transactionDate`` in range is served by
+``tx_user_date_idx`` (``tx_user_account_date_idx`` with ``?account=``), so
+the cost follows the user's rows in the range, not the size of the table.
+
+With a shared cache, results are cached per user and parameters under
+the user's analytics version, which every transaction write
+(``TransactionLedger.save``), account save/delete and Plaid account
+upsert drops on commit. With a per-process cache every request runs the
+query (see ``services.shared_cache``).
+"""
+import hashlib
+import json
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, Optional, Sequence
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, Count, DateField, FloatField, Sum, Value, When
+from django.db.models.functions import Abs, Trunc
+from django.utils import timezone
+
+from .models import Transactions
+from .services import SPENDING_ANALYTICS_VERSION_KEY, cache_version, shared_cache
+
+# ?group_by= name -> grouped columns (ids first, display names after) and how they are returned.
+DIMENSIONS = {
+    "category": (("category_id", "category"), ("category__name", "categoryName")),
+    "merchant": (("merchantName", "merchant"),),
+    "account": (("account_id", "account"), ("account__accountName", "accountName")),
+}
+INTERVALS = ("day", "week", "month")
+# Rows beyond this are dropped and the response says ``truncated``.
+MAX_ROWS = 5000
+
+
+def _flow(is_income: bool):
+    return Sum(Case(When(isIncome=is_income, then=Abs("amount")), default=Value(0.0), output_field=FloatField()))
+
+
+def _day_start(day: date) -> datetime:
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def spending_rows(user_id, start: date, end: date, group_by: Sequence[str], interval: Optional[str] = None,
+                  accounts: Optional[Iterable[int]] = None) -> dict:
+    """Run the grouped query: ``{"results": [...], "truncated": bool}``, biggest spend first within a period."""
+    qs = Transactions.objects.filter(
+        user_id=user_id, transactionDate__gte=_day_start(start), transactionDate__lt=_day_start(end + timedelta(days=1)),
+    )
+    if accounts:
+        qs = qs.filter(account_id__in=list(accounts))
+    columns = [pair for name in group_by for pair in DIMENSIONS[name]]
+    if interval:
+        qs = qs.annotate(period=Trunc("transactionDate", interval, output_field=DateField(),
+                                      tzinfo=timezone.get_current_timezone()))
+        columns.insert(0, ("period", "period"))
+    totals = {"spend": _flow(False), "income": _flow(True), "count": Count("id")}
+
+    if columns:
+        ordering = (["period"] if interval else []) + ["-spend"] + [col for col, _ in columns if col != "period"]
+        rows = list(
+            qs.values(*(col for col, _ in columns)).annotate(**totals).order_by(*ordering)[: MAX_ROWS + 1]
+        )
+    else:
+        rows = [qs.aggregate(**totals)]
+    truncated = len(rows) > MAX_ROWS
+
+    results = []
+    for row in rows[:MAX_ROWS]:
+        out = {label: row[col] for col, label in columns}
+        if interval:
+            out["period"] = row["period"].isoformat()
+        spend, income = row["spend"] or 0.0, row["income"] or 0.0
+        out.update(spend=round(spend, 2), income=round(income, 2), net=round(income - spend, 2), count=row["count"])
+        results.append(out)
+    return {"results": results, "truncated": truncated}
+
+
+def spending_breakdown(user_id, start: date, end: date, group_by: Sequence[str], interval: Optional[str] = None,
+                       accounts: Optional[Iterable[int]] = None) -> dict:
+    """spending_rows(), cached per user and parameters until the user's transactions change."""
+    accounts = sorted(set(accounts or ()))
+    if not shared_cache():
+        return spending_rows(user_id, start, end, group_by, interval, accounts)
+    params = json.dumps([start.isoformat(), end.isoformat(), list(group_by), interval, accounts])
+    version = cache_version(SPENDING_ANALYTICS_VERSION_KEY.format(user_id))
+    key = f"spending-analytics:{user_id}:{version}:{hashlib.sha1(params.encode()).hexdigest()}"
+    result = cache.get(key)
+    if result is None:
+        result = spending_rows(user_id, start, end, group_by, interval, accounts)
+        cache.set(key, result, getattr(settings, "SPENDING_ANALYTICS_CACHE_TIMEOUT", 900))
+    return result
@@ -2,3 +2,23 @@ from django.apps import AppConfig
 class FinanceConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'finance'
+
+    def ready(self):
+        from django.core.checks import Tags, register
+        from django.db.models.signals import post_delete, post_save
+        from .category_index import invalidate_category_index
+        from .checks import check_shared_cache
+        from .models import Account, Category
+        from .services import invalidate_spending_analytics
+
+        register(check_shared_cache, Tags.caches, deploy=True)
+
+        post_save.connect(invalidate_category_index, sender=Category, dispatch_uid="category_index_save")
+        post_delete.connect(invalidate_category_index, sender=Category, dispatch_uid="category_index_delete")
+
+        # Spending analytics show account names, and deleting an account cascades to its transactions.
+        def invalidate_owner_analytics(sender, instance, **kwargs):
+            invalidate_spending_analytics([instance.user_id])
+
+        post_save.connect(invalidate_owner_analytics, sender=Account, dispatch_uid="spending_analytics_account_save")
+        post_delete.connect(invalidate_owner_analytics, sender=Account, dispatch_uid="spending_analytics_account_delete")
@@ -0,0 +1,110 @@
+import re
+import threading
+from typing import Dict, Optional
+
+from .models import Category
+
+UNKNOWN_DESCRIPTION = "UNKNOWN"
+
+
+def _label_key(label: str) -> str:
+    """Normalise a label: Bank fees, bank-fees and BANK_FEES all become bank_fees."""
+    return re.sub(r"[^0-9a-z]+", "_", label.casefold()).strip("_")
+
+
+class CategoryIndex:
+    """
+    Process-local map of case-folded Plaid PFC ``detailed`` strings -> Category.id,
+    plus a looser map of normalised names/descriptions for ``match()``.
+
+    Built lazily from one query over the Category table and dropped whenever a
+    Category is saved/deleted or the Plaid category import runs.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_description: Optional[Dict[str, int]] = None
+        self._by_name: Dict[str, int] = {}
+        self._unknown_id: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.builds = 0
+
+    def _load(self) -> Dict[str, int]:
+        index = self._by_description
+        if index is not None:
+            return index
+        with self._lock:
+            if self._by_description is None:
+                built: Dict[str, int] = {}
+                names: Dict[str, int] = {}
+                # Later rows overwrite earlier ones, so on duplicate descriptions the first by name
+                # wins, as with the old .first() lookup (Category is ordered by name).
+                rows = Category.objects.order_by("-name", "-id").values_list("id", "description", "name")
+                for cat_id, desc, name in rows:
+                    if desc:
+                        built[desc.strip().casefold()] = cat_id
+                    for label in (name, desc):
+                        if label:
+                            names[_label_key(label)] = cat_id
+                self._unknown_id = built.get(UNKNOWN_DESCRIPTION.casefold())
+                self._by_name = names
+                self._by_description = built
+                self.builds += 1
+            return self._by_description
+
+    def unknown_id(self) -> Optional[int]:
+        self._load()
+        return self._unknown_id
+
+    def resolve(self, detailed: Optional[str]) -> Optional[int]:
+        """Return the Category id for a PFC ``detailed`` value, falling back to UNKNOWN."""
+        index = self._load()
+        if detailed:
+            cat_id = index.get(detailed.strip().casefold())
+            if cat_id is not None:
+                self.hits += 1
+                return cat_id
+        self.misses += 1
+        return self._unknown_id
+
+    def match(self, label: Optional[str]) -> Optional[int]:
+        """
+        Category id for a free-text label (e.g. a statement's category column):
+        a detailed description or a primary name. No UNKNOWN fallback.
+        """
+        if not label:
+            return None
+        index = self._load()
+        cat_id = index.get(label.strip().casefold())
+        if cat_id is None:
+            cat_id = self._by_name.get(_label_key(label))
+        if cat_id is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return cat_id
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._by_description = None
+            self._by_name = {}
+            self._unknown_id = None
+
+    def stats(self) -> dict:
+        index = self._by_description
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "builds": self.builds,
+            "size": len(index) if index is not None else 0,
+            "loaded": index is not None,
+        }
+
+
+category_index = CategoryIndex()
+
+
+def invalidate_category_index(*args, **kwargs) -> None:
+    """Signal-friendly wrapper around ``category_index.invalidate``."""
+    category_index.invalidate()
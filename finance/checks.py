@@ -0,0 +1,16 @@
+from django.core.checks import Warning
+
+from .services import shared_cache
+
+
+def check_shared_cache(app_configs, **kwargs):
+    """Balance history and spending analytics stay uncached unless every worker shares the cache."""
+    if shared_cache():
+        return []
+    return [
+        Warning(
+            "The default cache is per-process, so balance history and spending analytics are not cached.",
+            hint="Point CACHE_URL at a shared cache (redis, memcached) so invalidations reach every worker.",
+            id="finance.W001",
+        )
+    ]
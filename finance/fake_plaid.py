@@ -0,0 +1,343 @@
+"""
+Local stand-in for the handful of Plaid endpoints this app calls.
+
+Serves /link/token/create, /item/public_token/exchange, /accounts/get and
+/transactions/sync with deterministic data (same config -> same ids, amounts
+and cursors), so the sync path can be load-tested without Plaid credentials.
+Start it with ``manage.py run_fake_plaid`` and set PLAID_ENV=local.
+
+Cursor model: generation 0 is the item's full history (``history_transactions``
+added rows, paged by ``count``). Each later sync run receives one more
+generation (up to ``update_batches``) holding new, modified and removed rows,
+after which the item reports no further changes.
+"""
+import base64
+import hashlib
+import json
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+PFC_CATEGORIES = [
+    ("FOOD_AND_DRINK", "FOOD_AND_DRINK_COFFEE", "Starbucks"),
+    ("FOOD_AND_DRINK", "FOOD_AND_DRINK_GROCERIES", "Trader Joe's"),
+    ("FOOD_AND_DRINK", "FOOD_AND_DRINK_RESTAURANT", "Olive Garden"),
+    ("GENERAL_MERCHANDISE", "GENERAL_MERCHANDISE_SUPERSTORES", "Target"),
+    ("GENERAL_MERCHANDISE", "GENERAL_MERCHANDISE_ONLINE_MARKETPLACES", "Amazon"),
+    ("TRANSPORTATION", "TRANSPORTATION_GAS", "Shell"),
+    ("TRANSPORTATION", "TRANSPORTATION_TAXIS_AND_RIDE_SHARES", "Uber"),
+    ("RENT_AND_UTILITIES", "RENT_AND_UTILITIES_INTERNET_AND_CABLE", "Comcast"),
+    ("ENTERTAINMENT", "ENTERTAINMENT_TV_AND_MOVIES", "Netflix"),
+    ("INCOME", "INCOME_WAGES", "Employer Inc"),
+    ("TRANSFER_IN", "TRANSFER_IN_ACCOUNT_TRANSFER", "Zelle"),
+    ("LOAN_PAYMENTS", "LOAN_PAYMENTS_CREDIT_CARD_PAYMENT", "Credit Card AutoPay"),
+]
+
+
+@dataclass
+class FakePlaidConfig:
+    seed: int = 42
+    accounts_per_item: int = 2
+    history_transactions: int = 2000
+    history_days: int = 730
+    end_date: date = date(2025, 1, 1)
+    update_batches: int = 3
+    added_per_update: int = 25
+    modified_per_update: int = 10
+    removed_per_update: int = 5
+    max_count: int = 500
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    error_code: str = "INTERNAL_SERVER_ERROR"
+    stats: dict = field(default_factory=dict)
+
+
+class FakePlaidError(Exception):
+    def __init__(self, status: int, error_type: str, error_code: str, message: str):
+        super().__init__(message)
+        self.status = status
+        self.payload = {
+            "error_type": error_type,
+            "error_code": error_code,
+            "error_message": message,
+            "display_message": None,
+            "request_id": _request_id(),
+        }
+
+
+def _request_id() -> str:
+    return uuid.uuid4().hex[:15]
+
+
+def _digest(*parts) -> str:
+    return hashlib.sha1(":".join(str(p) for p in parts).encode()).hexdigest()
+
+
+def encode_cursor(generation: int, offset: int) -> str:
+    raw = json.dumps({"g": generation, "o": offset}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]):
+    if not cursor:
+        return 0, 0
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded))
+        return int(data["g"]), int(data["o"])
+    except (ValueError, KeyError, TypeError):
+        raise FakePlaidError(400, "INVALID_INPUT", "INVALID_FIELD", "cursor is not valid")
+
+
+class FakePlaidData:
+    """Pure, deterministic generators for items, accounts and transactions."""
+
+    def __init__(self, config: FakePlaidConfig):
+        self.config = config
+
+    # ---- identities ----
+    def item_for_public_token(self, public_token: str) -> str:
+        return f"item-local-{_digest(self.config.seed, public_token)[:12]}"
+
+    def access_token_for_item(self, item_id: str) -> str:
+        return f"access-local-{item_id[len('item-local-'):]}"
+
+    def item_for_access_token(self, access_token: str) -> str:
+        if not access_token or not access_token.startswith("access-local-"):
+            raise FakePlaidError(400, "INVALID_INPUT", "INVALID_ACCESS_TOKEN", "provided access token is in an invalid format")
+        return f"item-local-{access_token[len('access-local-'):]}"
+
+    def account_ids(self, item_id: str):
+        return [f"{item_id}-acc-{k}" for k in range(self.config.accounts_per_item)]
+
+    # ---- payloads ----
+    def accounts(self, item_id: str):
+        out = []
+        for k, account_id in enumerate(self.account_ids(item_id)):
+            rng = random.Random(_digest(self.config.seed, account_id))
+            credit = k % 2 == 1
+            current = round(rng.uniform(100, 5000), 2)
+            out.append({
+                "account_id": account_id,
+                "balances": {
+                    "available": None if credit else current,
+                    "current": current,
+                    "limit": 5000.0 if credit else None,
+                    "iso_currency_code": "USD",
+                    "unofficial_currency_code": None,
+                },
+                "mask": f"{rng.randrange(10000):04d}",
+                "name": "Plaid Credit Card" if credit else "Plaid Checking",
+                "official_name": "Local Fake Credit" if credit else "Local Fake Checking",
+                "type": "credit" if credit else "depository",
+                "subtype": "credit card" if credit else "checking",
+            })
+        return out
+
+    def item(self, item_id: str):
+        return {
+            "item_id": item_id,
+            "institution_id": "ins_local",
+            "webhook": "",
+            "error": None,
+            "available_products": ["balance"],
+            "billed_products": ["transactions"],
+            "products": ["transactions"],
+            "consented_products": ["transactions"],
+            "consent_expiration_time": None,
+            "update_type": "background",
+        }
+
+    def transaction(self, item_id: str, tx_id: str, version: int = 0):
+        rng = random.Random(_digest(self.config.seed, tx_id, version))
+        accounts = self.account_ids(item_id)
+        primary, detailed, merchant = PFC_CATEGORIES[rng.randrange(len(PFC_CATEGORIES))]
+        income = primary in ("INCOME", "TRANSFER_IN")
+        amount = round(rng.uniform(3, 250), 2)
+        if income:
+            amount = -round(rng.uniform(200, 4500), 2)
+        day = self.config.end_date - timedelta(days=rng.randrange(max(1, self.config.history_days)))
+        return {
+            "transaction_id": tx_id,
+            "account_id": accounts[rng.randrange(len(accounts))],
+            "amount": amount,
+            "iso_currency_code": "USD",
+            "unofficial_currency_code": None,
+            "category": None,
+            "category_id": None,
+            "check_number": None,
+            "date": day.isoformat(),
+            "datetime": None,
+            "authorized_date": day.isoformat(),
+            "authorized_datetime": None,
+            "location": {
+                "address": None, "city": "San Francisco", "region": "CA", "postal_code": None,
+                "country": "US", "lat": None, "lon": None, "store_number": None,
+            },
+            "name": merchant if version == 0 else f"{merchant} (updated)",
+            "merchant_name": merchant,
+            "logo_url": None,
+            "website": None,
+            "payment_meta": {
+                "reference_number": None, "ppd_id": None, "payee": None, "by_order_of": None,
+                "payer": None, "payment_method": None, "payment_processor": None, "reason": None,
+            },
+            "payment_channel": "in store",
+            "pending": False,
+            "pending_transaction_id": None,
+            "account_owner": None,
+            "transaction_type": "place",
+            "transaction_code": None,
+            "personal_finance_category": {"primary": primary, "detailed": detailed, "confidence_level": "HIGH"},
+            "personal_finance_category_icon_url": f"https://plaid-category-icons.plaid.com/PFC_{primary}.png",
+        }
+
+    def generation_events(self, item_id: str, generation: int):
+        """Ordered (kind, tx_id, version) events for one generation; empty past the last batch."""
+        cfg = self.config
+        if generation == 0:
+            return [("added", f"{item_id}-tx-0-{i}", 0) for i in range(cfg.history_transactions)]
+        if generation > cfg.update_batches:
+            return []
+        rng = random.Random(_digest(cfg.seed, item_id, "gen", generation))
+        history = cfg.history_transactions
+        picks = rng.sample(range(history), min(history, cfg.modified_per_update + cfg.removed_per_update))
+        modified = picks[:cfg.modified_per_update]
+        removed = picks[cfg.modified_per_update:]
+        events = [("added", f"{item_id}-tx-{generation}-{i}", 0) for i in range(cfg.added_per_update)]
+        events += [("modified", f"{item_id}-tx-0-{i}", generation) for i in modified]
+        events += [("removed", f"{item_id}-tx-0-{i}", 0) for i in removed]
+        return events
+
+    def transactions_sync(self, access_token: str, cursor: Optional[str], count: int):
+        item_id = self.item_for_access_token(access_token)
+        generation, offset = decode_cursor(cursor)
+        count = max(1, min(int(count or 100), self.config.max_count))
+        events = self.generation_events(item_id, generation)
+        page = events[offset:offset + count]
+
+        added, modified, removed = [], [], []
+        for kind, tx_id, version in page:
+            if kind == "removed":
+                removed.append({"transaction_id": tx_id, "account_id": self.account_ids(item_id)[0]})
+            else:
+                (added if kind == "added" else modified).append(self.transaction(item_id, tx_id, version))
+
+        has_more = offset + count < len(events)
+        if has_more:
+            next_cursor = encode_cursor(generation, offset + count)
+        elif generation <= self.config.update_batches:
+            next_cursor = encode_cursor(generation + 1, 0)
+        else:
+            next_cursor = encode_cursor(generation, 0)
+
+        return {
+            "transactions_update_status": "HISTORICAL_UPDATE_COMPLETE",
+            "accounts": self.accounts(item_id),
+            "added": added,
+            "modified": modified,
+            "removed": removed,
+            "next_cursor": next_cursor,
+            "has_more": has_more,
+            "request_id": _request_id(),
+        }
+
+
+class FakePlaidHandler(BaseHTTPRequestHandler):
+    server_version = "FakePlaid/1.0"
+    data: FakePlaidData = None
+    error_rng: random.Random = None
+    lock = threading.Lock()
+
+    def log_message(self, fmt, *args):
+        if getattr(self.server, "verbose", False):
+            super().log_message(fmt, *args)
+
+    def _reply(self, status: int, payload: dict):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _inject_faults(self):
+        cfg = self.data.config
+        if cfg.latency_ms or cfg.jitter_ms:
+            with self.lock:
+                jitter = self.error_rng.uniform(0, cfg.jitter_ms) if cfg.jitter_ms else 0
+            time.sleep((cfg.latency_ms + jitter) / 1000.0)
+        if cfg.error_rate:
+            with self.lock:
+                fail = self.error_rng.random() < cfg.error_rate
+            if fail:
+                status = 400 if cfg.error_code == "TRANSACTIONS_SYNC_MUTATION_DURING_PAGINATION" else 500
+                error_type = "TRANSACTIONS_ERROR" if status == 400 else "API_ERROR"
+                raise FakePlaidError(status, error_type, cfg.error_code, "injected by fake Plaid server")
+
+    def do_POST(self):
+        routes = {
+            "/link/token/create": self.link_token_create,
+            "/item/public_token/exchange": self.public_token_exchange,
+            "/accounts/get": self.accounts_get,
+            "/transactions/sync": self.transactions_sync,
+        }
+        handler = routes.get(self.path.split("?", 1)[0])
+        stats = self.data.config.stats
+        with self.lock:
+            stats[self.path] = stats.get(self.path, 0) + 1
+        try:
+            if handler is None:
+                raise FakePlaidError(404, "INVALID_REQUEST", "NOT_FOUND", f"unknown endpoint {self.path}")
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+            self._inject_faults()
+            self._reply(200, handler(body))
+        except FakePlaidError as e:
+            self._reply(e.status, e.payload)
+        except ValueError:
+            self._reply(400, FakePlaidError(400, "INVALID_REQUEST", "INVALID_BODY", "body is not valid JSON").payload)
+
+    def link_token_create(self, body):
+        expiration = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(hours=4)
+        return {
+            "link_token": f"link-local-{uuid.uuid4().hex}",
+            "expiration": expiration.isoformat().replace("+00:00", "Z"),
+            "request_id": _request_id(),
+        }
+
+    def public_token_exchange(self, body):
+        public_token = body.get("public_token")
+        if not public_token:
+            raise FakePlaidError(400, "INVALID_REQUEST", "MISSING_FIELDS", "public_token is required")
+        item_id = self.data.item_for_public_token(public_token)
+        return {
+            "access_token": self.data.access_token_for_item(item_id),
+            "item_id": item_id,
+            "request_id": _request_id(),
+        }
+
+    def accounts_get(self, body):
+        item_id = self.data.item_for_access_token(body.get("access_token"))
+        return {"accounts": self.data.accounts(item_id), "item": self.data.item(item_id), "request_id": _request_id()}
+
+    def transactions_sync(self, body):
+        return self.data.transactions_sync(body.get("access_token"), body.get("cursor"), body.get("count"))
+
+
+def make_server(config: FakePlaidConfig, host: str = "127.0.0.1", port: int = 8765, verbose: bool = False):
+    handler = type("BoundFakePlaidHandler", (FakePlaidHandler,), {
+        "data": FakePlaidData(config),
+        "error_rng": random.Random(config.seed),
+        "lock": threading.Lock(),
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.verbose = verbose
+    return server
@@ -0,0 +1,113 @@
+"""
+Balance-over-time series for ``/accounts/{id}/balance-history/``.
+
+Only the current balance is stored, so history is derived from it: the
+closing balance of a bucket (day, week or month) is the current balance
+minus the net of every transaction dated after that bucket, each counted
+as abs(amount) in the direction of ``isIncome`` (``services.signed_flow``)
+so Plaid's signed amounts come out the same way as manual ones. One
+grouped query sums the account's transactions per bucket
+(``tx_user_account_date_idx`` serves it), and a suffix sum over those few
+rows gives the closing balance of every bucket that has activity. Quiet
+buckets carry the previous one.
+
+With a shared cache (see ``services.shared_cache``) that sparse series is
+cached per (account, interval) under the account's balance-history
+version, which every ledger write and balance overwrite drops on commit
+(see ``services.invalidate_balance_history``), so any ``from``/``to``
+window is sliced from the cache without touching the database. A
+per-process cache could not see another worker's invalidation, so there
+the series is rebuilt on every request.
+"""
+from bisect import bisect_right
+from datetime import date, timedelta
+from itertools import accumulate
+from typing import List
+
+from dateutil.relativedelta import relativedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import DateField, Sum
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+from .models import Transactions
+from .services import BALANCE_HISTORY_VERSION_KEY, account_balance, cache_version, shared_cache, signed_flow
+
+INTERVALS = ("day", "week", "month")
+# Upper bound on points in one response (ten years of days).
+MAX_POINTS = 3660
+
+
+def bucket_start(day: date, interval: str) -> date:
+    """The first day of the bucket holding ``day`` (weeks start on Monday, as TruncWeek does)."""
+    if interval == "week":
+        return day - timedelta(days=day.weekday())
+    if interval == "month":
+        return day.replace(day=1)
+    return day
+
+
+def bucket_step(interval: str):
+    if interval == "week":
+        return timedelta(weeks=1)
+    if interval == "month":
+        return relativedelta(months=1)
+    return timedelta(days=1)
+
+
+def _build_series(account_id, user_id, interval: str) -> dict:
+    """Closing balance of every bucket with transactions, oldest first."""
+    rows = list(
+        # Undated rows sort before everything else, so they are part of every closing balance.
+        Transactions.objects.filter(user_id=user_id, account_id=account_id, transactionDate__isnull=False)
+        .annotate(bucket=Trunc("transactionDate", interval, output_field=DateField(),
+                               tzinfo=timezone.get_current_timezone()))
+        .values("bucket").annotate(net=Sum(signed_flow())).order_by("bucket")
+        .values_list("bucket", "net")
+    )
+    current = float(account_balance(account_id))
+    # later[i]: net of everything after bucket i, accumulated from the newest bucket backwards.
+    later = list(accumulate((net or 0.0 for _, net in reversed(rows[1:])), initial=0.0))[::-1] if rows else []
+    return {
+        "buckets": [bucket.isoformat() for bucket, _ in rows],
+        "closing": [current - after for after in later],
+        "opening": current - sum(net or 0.0 for _, net in rows),
+    }
+
+
+def balance_series(account, interval: str) -> dict:
+    """The account's cached sparse series for ``interval``, built on a miss."""
+    if not shared_cache():
+        return _build_series(account.pk, account.user_id, interval)
+    version = cache_version(BALANCE_HISTORY_VERSION_KEY.format(account.pk))
+    key = f"balance-history:{account.pk}:{interval}:{version}"
+    series = cache.get(key)
+    if series is None:
+        series = _build_series(account.pk, account.user_id, interval)
+        cache.set(key, series, getattr(settings, "BALANCE_HISTORY_CACHE_TIMEOUT", 3600))
+    return series
+
+
+def balance_history(account, start: date, end: date, interval: str) -> List[dict]:
+    """``[{"date", "balance"}, ...]``: the closing balance of each bucket from ``start`` to ``end``."""
+    series = balance_series(account, interval)
+    buckets, closing = series["buckets"], series["closing"]
+    step = bucket_step(interval)
+    out = []
+    day = bucket_start(start, interval)
+    while day <= end:
+        i = bisect_right(buckets, day.isoformat())
+        balance = closing[i - 1] if i else series["opening"]
+        out.append({"date": day.isoformat(), "balance": round(balance, 2)})
+        day += step
+    return out
+
+
+def count_buckets(start: date, end: date, interval: str) -> int:
+    """How many points balance_history(start, end, interval) returns."""
+    start = bucket_start(start, interval)
+    if interval == "month":
+        return (end.year - start.year) * 12 + end.month - start.month + 1
+    days = (end - start).days
+    return days // 7 + 1 if interval == "week" else days + 1
@@ -0,0 +1,474 @@
+"""
+Bank-statement import (CSV, OFX/QFX, QIF) for accounts Plaid does not cover.
+
+The file is read as a stream: each parser yields one ``StatementLine`` at a
+time and ``StatementImporter`` buffers at most ``batch_size`` unsaved rows
+before writing them with ``bulk_create``. Memory stays flat however long the
+statement is; the only per-row state kept for the whole run is a short
+digest per distinct line, used to tell genuine repeats (two identical coffees
+on the same day) apart.
+
+Every imported row carries ``Transactions.importHash``, a digest of the
+account, date, signed amount and description (or the bank's own FITID /
+transaction id when the file has one) plus the line's occurrence number
+within the file. Importing the same or an overlapping statement again skips
+rows that are already there; ``tx_account_import_hash_uniq`` backs this up
+in the database.
+
+Amounts follow the statement's sign: negative is money out. Rows are stored
+the way the rest of the app stores them, ``amount`` positive and
+``isIncome`` set for money in, and the balance ledger gets one aggregated
+row per (account, month) at the end of the import.
+"""
+import csv
+import hashlib
+import io
+import re
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional
+
+from dateutil import parser as date_parser
+from django.db import transaction
+from django.utils import timezone
+
+from .category_index import category_index
+from .models import Account, Transactions
+from .services import TransactionLedger
+
+FORMATS = ("csv", "ofx", "qif")
+BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 50
+SNIFF_BYTES = 4096
+OFX_READ_CHUNK = 64 * 1024
+
+_NAME_MAX = Transactions._meta.get_field("name").max_length
+_MERCHANT_MAX = Transactions._meta.get_field("merchantName").max_length
+_CHECK_MAX = Transactions._meta.get_field("checkNumber").max_length
+_CURRENCY_MAX = Transactions._meta.get_field("currencyCode").max_length
+
+
+class StatementFormatError(ValueError):
+    """The file as a whole cannot be read (unknown format, no date/amount columns...)."""
+
+
+@dataclass
+class StatementLine:
+    line: int
+    date: Optional[datetime] = None
+    amount: Optional[Decimal] = None  # signed, negative = money out
+    name: Optional[str] = None
+    merchant: Optional[str] = None
+    memo: Optional[str] = None
+    category: Optional[str] = None
+    check_number: Optional[str] = None
+    currency: Optional[str] = None
+    ref: Optional[str] = None  # bank-assigned id (OFX FITID, CSV transaction id)
+    error: Optional[str] = None
+
+
+# ---- value parsing ---------------------------------------------------------
+
+_AMOUNT_JUNK = re.compile(r"[^\d.,\-+]")
+
+
+def parse_amount(raw: Optional[str]) -> Optional[Decimal]:
+    """'1,234.56', '-12.00', '(12.00)', '$ 12', '12.00 CR' -> Decimal (None if blank)."""
+    if raw is None:
+        return None
+    text = raw.strip()
+    if not text:
+        return None
+    negative = False
+    if text.startswith("(") and text.endswith(")"):
+        negative, text = True, text[1:-1]
+    upper = text.upper()
+    if upper.endswith("DR"):
+        negative, text = True, text[:-2]
+    elif upper.endswith("CR"):
+        text = text[:-2]
+    text = _AMOUNT_JUNK.sub("", text)
+    if text.endswith("-"):  # trailing minus, e.g. "12.00-"
+        negative, text = True, text[:-1]
+    # "1.234,56" (decimal comma) vs "1,234.56": the last separator is the decimal point.
+    if "," in text and text.rfind(",") > text.rfind("."):
+        text = text.replace(".", "").replace(",", ".")
+    else:
+        text = text.replace(",", "")
+    try:
+        value = Decimal(text)
+    except InvalidOperation:
+        raise ValueError(f"invalid amount {raw!r}")
+    return -abs(value) if negative else value
+
+
+@lru_cache(maxsize=4096)
+def parse_date(raw: str, dayfirst: bool = False) -> datetime:
+    """Free-form statement date -> aware datetime. Statements repeat dates, hence the cache."""
+    text = raw.strip().replace("'", "/")  # QIF writes 1/31'24
+    if not text:
+        raise ValueError("missing date")
+    try:
+        value = date_parser.parse(text, dayfirst=dayfirst)
+    except (ValueError, OverflowError):
+        raise ValueError(f"invalid date {raw!r}")
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+_OFX_DATE = re.compile(r"(\d{4})(\d{2})(\d{2})(?:(\d{2})(\d{2})(\d{2})?)?")
+
+
+def parse_ofx_date(raw: str) -> datetime:
+    """OFX DTPOSTED: YYYYMMDD[HHMM[SS[.XXX]]][[+-offset:TZ]]; the offset is ignored."""
+    m = _OFX_DATE.match(raw.strip())
+    if not m:
+        raise ValueError(f"invalid date {raw!r}")
+    parts = [int(p) if p else 0 for p in m.groups()]
+    return timezone.make_aware(datetime(*parts))
+
+
+def _clean(value: Optional[str], limit: Optional[int] = None) -> Optional[str]:
+    if value is None:
+        return None
+    value = " ".join(value.split())
+    if not value:
+        return None
+    return value[:limit] if limit else value
+
+
+# ---- CSV -------------------------------------------------------------------
+
+# Normalised header -> StatementLine field. Explicit ``columns`` override these.
+CSV_ALIASES = {
+    "date": ("date", "transaction date", "posted date", "posting date", "post date",
+             "booking date", "trans date", "value date"),
+    "amount": ("amount", "transaction amount", "value", "amount usd"),
+    "debit": ("debit", "debits", "withdrawal", "withdrawals", "money out", "paid out", "debit amount"),
+    "credit": ("credit", "credits", "deposit", "deposits", "money in", "paid in", "credit amount"),
+    "name": ("description", "name", "payee", "details", "narrative", "transaction description",
+             "original description"),
+    "merchant": ("merchant", "merchant name"),
+    "category": ("category", "category name"),
+    "memo": ("memo", "note", "notes", "reference"),
+    "currency": ("currency", "currency code", "iso currency code"),
+    "check_number": ("check number", "check", "check no", "cheque number", "cheque no"),
+    "ref": ("transaction id", "id", "fitid", "reference number", "bank reference"),
+}
+
+
+def _header_key(header: str) -> str:
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", header.casefold()).split())
+
+
+def _csv_mapping(headers: List[str], columns: Optional[Dict[str, str]]) -> Dict[str, int]:
+    """StatementLine field -> column index."""
+    by_key = {}
+    for i, header in enumerate(headers):
+        by_key.setdefault(_header_key(header), i)
+    mapping = {}
+    for field, aliases in CSV_ALIASES.items():
+        for alias in aliases:
+            if alias in by_key:
+                mapping[field] = by_key[alias]
+                break
+    for field, header in (columns or {}).items():
+        if field not in CSV_ALIASES:
+            raise StatementFormatError(f"Unknown column mapping {field!r}; expected one of {', '.join(CSV_ALIASES)}.")
+        key = _header_key(header)
+        if key not in by_key:
+            raise StatementFormatError(f"Column {header!r} (for {field}) is not in the header row.")
+        mapping[field] = by_key[key]
+    if "date" not in mapping:
+        raise StatementFormatError("No date column found; pass a column mapping for 'date'.")
+    if "amount" not in mapping and not ({"debit", "credit"} & mapping.keys()):
+        raise StatementFormatError("No amount (or debit/credit) column found; pass a column mapping for 'amount'.")
+    return mapping
+
+
+def iter_csv(stream: io.TextIOBase, columns: Optional[Dict[str, str]] = None,
+             dayfirst: bool = False) -> Iterator[StatementLine]:
+    sample = stream.read(SNIFF_BYTES)
+    stream.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t|")
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.reader(stream, dialect)
+    headers = next(reader, None)
+    if not headers:
+        raise StatementFormatError("The CSV file is empty.")
+    mapping = _csv_mapping(headers, columns)
+
+    def cell(row, field):
+        i = mapping.get(field)
+        return row[i] if i is not None and i < len(row) else None
+
+    for row in reader:
+        line = StatementLine(line=reader.line_num)
+        if not any(c.strip() for c in row):
+            continue
+        try:
+            line.date = parse_date(cell(row, "date") or "", dayfirst)
+            if "amount" in mapping:
+                line.amount = parse_amount(cell(row, "amount"))
+            else:
+                credit = parse_amount(cell(row, "credit")) or Decimal("0")
+                debit = parse_amount(cell(row, "debit")) or Decimal("0")
+                line.amount = abs(credit) - abs(debit)
+            if line.amount is None:
+                raise ValueError("missing amount")
+        except ValueError as e:
+            line.error = str(e)
+            yield line
+            continue
+        line.name = cell(row, "name")
+        line.merchant = cell(row, "merchant")
+        line.memo = cell(row, "memo")
+        line.category = cell(row, "category")
+        line.check_number = cell(row, "check_number")
+        line.currency = cell(row, "currency")
+        line.ref = cell(row, "ref")
+        yield line
+
+
+# ---- OFX / QFX -------------------------------------------------------------
+
+_OFX_TXN = re.compile(r"<STMTTRN>(.*?)</STMTTRN>", re.S | re.I)
+_OFX_LEAF = re.compile(r"<([A-Z0-9.]+)>([^<\r\n]*)", re.I)
+_OFX_CURDEF = re.compile(r"<CURDEF>([^<\r\n]*)", re.I)
+
+
+def iter_ofx(stream: io.TextIOBase, **_) -> Iterator[StatementLine]:
+    """
+    Both OFX 1.x (SGML, leaf tags left open) and 2.x (XML) keep <STMTTRN>
+    blocks closed, so the file is scanned chunk by chunk for complete blocks.
+    """
+    buf = ""
+    currency = None
+    count = 0
+    while True:
+        chunk = stream.read(OFX_READ_CHUNK)
+        buf += chunk
+        if currency is None:
+            m = _OFX_CURDEF.search(buf)
+            if m:
+                currency = m.group(1).strip() or None
+        end = 0
+        for m in _OFX_TXN.finditer(buf):
+            count += 1
+            yield _ofx_line(count, m.group(1), currency)
+            end = m.end()
+        buf = buf[end:]
+        if not chunk:
+            break
+        # Keep the tail only from the last unfinished block, so junk between blocks does not pile up.
+        start = buf.upper().rfind("<STMTTRN>")
+        buf = buf[start:] if start >= 0 else buf[-len("<STMTTRN>"):]
+    if not count:
+        raise StatementFormatError("No <STMTTRN> transactions found in the OFX file.")
+
+
+def _ofx_line(index: int, block: str, currency: Optional[str]) -> StatementLine:
+    tags = {k.upper(): v.strip() for k, v in _OFX_LEAF.findall(block)}
+    line = StatementLine(line=index, currency=tags.get("CURRENCY") or currency)
+    try:
+        line.date = parse_ofx_date(tags.get("DTPOSTED") or tags.get("DTUSER") or "")
+        line.amount = parse_amount(tags.get("TRNAMT"))
+        if line.amount is None:
+            raise ValueError("missing TRNAMT")
+    except ValueError as e:
+        line.error = str(e)
+        return line
+    line.name = tags.get("NAME") or tags.get("PAYEE") or tags.get("MEMO")
+    line.memo = tags.get("MEMO") if tags.get("NAME") else None
+    line.check_number = tags.get("CHECKNUM")
+    line.ref = tags.get("FITID")
+    return line
+
+
+# ---- QIF -------------------------------------------------------------------
+
+QIF_NON_TRANSACTION_TYPES = {"CAT", "CLASS", "MEMORIZED", "SECURITY", "PRICES"}
+
+
+def iter_qif(stream: io.TextIOBase, dayfirst: bool = False, **_) -> Iterator[StatementLine]:
+    """One field per line (D date, T/U amount, P payee, M memo, L category, N number), records end with '^'."""
+    fields: Dict[str, str] = {}
+    start = None
+    skipping = False  # inside an account list / category list section
+    for number, raw in enumerate(stream, start=1):
+        text = raw.rstrip("\r\n")
+        if not text:
+            continue
+        if text.startswith("!"):
+            header = text.upper()
+            if header.startswith("!TYPE:"):
+                skipping = header[6:].strip() in QIF_NON_TRANSACTION_TYPES
+            elif header.startswith("!ACCOUNT"):
+                skipping = True
+            continue
+        code, value = text[0], text[1:].strip()
+        if code == "^":
+            if fields and not skipping:
+                yield _qif_line(start, fields, dayfirst)
+            fields, start = {}, None
+            continue
+        if start is None:
+            start = number
+        if code in "SE$":  # split lines; the record total in T already covers them
+            continue
+        fields.setdefault(code, value)
+    if fields and not skipping:
+        yield _qif_line(start, fields, dayfirst)
+
+
+def _qif_line(number: int, fields: Dict[str, str], dayfirst: bool) -> StatementLine:
+    line = StatementLine(line=number)
+    try:
+        line.date = parse_date(fields.get("D", ""), dayfirst)
+        line.amount = parse_amount(fields.get("T") or fields.get("U"))
+        if line.amount is None:
+            raise ValueError("missing amount")
+    except ValueError as e:
+        line.error = str(e)
+        return line
+    category = fields.get("L")
+    if category and not category.startswith("["):  # "[Savings]" is a transfer, not a category
+        line.category = category.split(":")[-1]
+    line.name = fields.get("P")
+    line.memo = fields.get("M")
+    line.check_number = fields.get("N")
+    return line
+
+
+PARSERS = {"csv": iter_csv, "ofx": iter_ofx, "qif": iter_qif}
+
+
+def detect_format(filename: Optional[str], stream) -> str:
+    """From the extension, else from the first bytes of a seekable binary stream."""
+    ext = (filename or "").rsplit(".", 1)[-1].lower() if filename and "." in filename else ""
+    if ext in ("ofx", "qfx"):
+        return "ofx"
+    if ext in FORMATS:
+        return ext
+    head = stream.read(SNIFF_BYTES)
+    stream.seek(0)
+    head = head.lstrip(b"\xef\xbb\xbf").lstrip().upper()
+    if head.startswith((b"OFXHEADER", b"<OFX")) or (head.startswith(b"<?XML") and b"<OFX" in head):
+        return "ofx"
+    if head.startswith((b"!TYPE", b"!ACCOUNT", b"!OPTION")):
+        return "qif"
+    return "csv"
+
+
+def iter_statement(binary, fmt: str, columns: Optional[Dict[str, str]] = None,
+                   dayfirst: bool = False) -> Iterator[StatementLine]:
+    """Parse a seekable binary file object as ``fmt`` without reading it into memory."""
+    if fmt not in PARSERS:
+        raise StatementFormatError(f"Unsupported format {fmt!r}; expected one of {', '.join(FORMATS)}.")
+    stream = io.TextIOWrapper(binary, encoding="utf-8-sig", errors="replace", newline="")
+    try:
+        if fmt == "csv":
+            yield from iter_csv(stream, columns=columns, dayfirst=dayfirst)
+        else:
+            yield from PARSERS[fmt](stream, dayfirst=dayfirst)
+    finally:
+        stream.detach()  # the caller owns (and closes) the underlying file
+
+
+# ---- import ----------------------------------------------------------------
+
+class StatementImporter:
+    """
+    Write parsed statement lines into one account.
+
+    Everything runs in one database transaction: a failure leaves neither
+    rows nor a balance change behind. Lines that fail to parse are skipped
+    and reported (the first ``MAX_REPORTED_ERRORS`` of them).
+    """
+
+    def __init__(self, account: Account, batch_size: int = BATCH_SIZE):
+        self.account = account
+        self.batch_size = batch_size
+        self.parsed = self.created = self.duplicates = self.invalid = 0
+        self.errors: List[dict] = []
+        self.ledger = TransactionLedger()
+        self._occurrences: Counter = Counter()
+
+    def run(self, lines) -> dict:
+        batch: List[Transactions] = []
+        with transaction.atomic():
+            for line in lines:
+                if line.error:
+                    self.invalid += 1
+                    if len(self.errors) < MAX_REPORTED_ERRORS:
+                        self.errors.append({"line": line.line, "error": line.error})
+                    continue
+                self.parsed += 1
+                batch.append(self._build(line))
+                if len(batch) >= self.batch_size:
+                    self._flush(batch)
+                    batch = []
+            self._flush(batch)
+            self.ledger.save()
+        return self.summary()
+
+    def summary(self) -> dict:
+        return {
+            "account": self.account.id,
+            "parsed": self.parsed,
+            "created": self.created,
+            "duplicates": self.duplicates,
+            "invalid": self.invalid,
+            "balanceDelta": self.ledger.balance_deltas().get(self.account.id, Decimal("0")),
+            "errors": self.errors,
+        }
+
+    def _hash(self, line: StatementLine) -> str:
+        if line.ref:
+            base = f"{self.account.id}|ref|{line.ref.strip()}"
+        else:
+            name = (line.name or "").strip().casefold()
+            memo = (line.memo or "").strip().casefold()
+            base = f"{self.account.id}|{line.date.isoformat()}|{line.amount.normalize()}|{name}|{memo}"
+        key = hashlib.blake2b(base.encode(), digest_size=16).digest()
+        occurrence = self._occurrences[key]
+        self._occurrences[key] += 1
+        return hashlib.sha256(f"{base}|{occurrence}".encode()).hexdigest()
+
+    def _build(self, line: StatementLine) -> Transactions:
+        account = self.account
+        return Transactions(
+            user_id=account.user_id,
+            ownerId=str(account.user_id),
+            account_id=account.id,
+            amount=float(abs(line.amount)),
+            isIncome=line.amount > 0,
+            name=_clean(line.name, _NAME_MAX),
+            merchantName=_clean(line.merchant, _MERCHANT_MAX),
+            note=_clean(line.memo),
+            checkNumber=_clean(line.check_number, _CHECK_MAX),
+            currencyCode=_clean(line.currency, _CURRENCY_MAX) or account.isoCurrencyCode,
+            transactionDate=line.date,
+            category_id=category_index.match(line.category),
+            importHash=self._hash(line),
+        )
+
+    def _flush(self, batch: List[Transactions]) -> None:
+        if not batch:
+            return
+        existing = set(
+            Transactions.objects.filter(account_id=self.account.id, importHash__in=[o.importHash for o in batch])
+            .values_list("importHash", flat=True)
+        )
+        new = [o for o in batch if o.importHash not in existing]
+        self.duplicates += len(batch) - len(new)
+        Transactions.objects.bulk_create(new, batch_size=self.batch_size)
+        self.created += len(new)
+        for obj in new:
+            self.ledger.add(obj)
@@ -0,0 +1,106 @@
+import statistics
+import threading
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
+
+from finance.models import Account
+from finance.services import account_balance, apply_delta_to_account, rollup_balance_deltas
+
+STEP = Decimal("0.01")
+
+
+def _locked_write(account_id, delta):
+    """The pre-ledger write path: lock the Account row and update it in place."""
+    Account.objects.select_for_update().filter(id=account_id).update(
+        currentBalance=Coalesce(F("currentBalance"), Value(0)) + delta
+    )
+
+
+WRITERS = {"locked": _locked_write, "ledger": apply_delta_to_account}
+
+
+def _writer(write, account_id, ops, hold, start, latencies, errors):
+    start.wait()
+    try:
+        for i in range(ops):
+            began = time.perf_counter()
+            with transaction.atomic():
+                write(account_id, STEP if i % 2 == 0 else -STEP)
+                if hold:
+                    time.sleep(hold)  # the rest of the request's transaction (row insert, serializer...)
+            latencies.append(time.perf_counter() - began)
+    except Exception as e:
+        errors.append(e)
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark N concurrent writers changing one account's balance, with the old "
+        "row-locking update and with the append-only ledger. Writes alternate +/-0.01 "
+        "so the balance is unchanged afterwards. Use a Postgres database: SQLite locks "
+        "the whole file and serializes both paths alike."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--account", type=int, required=True, help="Account id to write to")
+        parser.add_argument("--writers", default="1,4,16", help="Comma-separated writer counts to run")
+        parser.add_argument("--ops", type=int, default=200, help="Writes per writer")
+        parser.add_argument("--hold-ms", type=float, default=2.0,
+                            help="Extra time each write's transaction stays open, as a real request would")
+        parser.add_argument("--mode", choices=("locked", "ledger", "both"), default="both")
+
+    def handle(self, *args, **opts):
+        account_id = opts["account"]
+        if not Account.objects.filter(id=account_id).exists():
+            raise CommandError(f"Account {account_id} does not exist.")
+        try:
+            counts = [int(n) for n in opts["writers"].split(",") if n.strip()]
+        except ValueError:
+            raise CommandError("--writers expects comma-separated integers, e.g. 1,4,16")
+        if not counts or min(counts) < 1 or opts["ops"] < 1:
+            raise CommandError("--writers and --ops must be >= 1")
+        ops = opts["ops"] + opts["ops"] % 2  # even, so the +/- writes cancel out
+        hold = opts["hold_ms"] / 1000
+        modes = ("locked", "ledger") if opts["mode"] == "both" else (opts["mode"],)
+
+        rollup_balance_deltas(account_ids=[account_id])
+        before = account_balance(account_id)
+        self.stdout.write(f"{connection.vendor}, account {account_id}, {ops} writes/writer, hold {opts['hold_ms']}ms")
+        self.stdout.write(f"{'mode':<8}{'writers':>8}{'writes/s':>12}{'p50 ms':>10}{'p95 ms':>10}")
+
+        connection.close()  # each writer thread opens its own
+        for mode in modes:
+            for n in counts:
+                start = threading.Event()
+                latencies, errors = [], []
+                threads = [
+                    threading.Thread(target=_writer, args=(WRITERS[mode], account_id, ops, hold, start, latencies, errors))
+                    for _ in range(n)
+                ]
+                for t in threads:
+                    t.start()
+                began = time.perf_counter()
+                start.set()
+                for t in threads:
+                    t.join()
+                elapsed = time.perf_counter() - began
+                if errors:
+                    raise CommandError(f"{mode} x{n}: {errors[0]!r}")
+                latencies.sort()
+                p95 = latencies[int(len(latencies) * 0.95) - 1]
+                self.stdout.write(
+                    f"{mode:<8}{n:>8}{len(latencies) / elapsed:>12.0f}"
+                    f"{statistics.median(latencies) * 1000:>10.2f}{p95 * 1000:>10.2f}"
+                )
+
+        folded = rollup_balance_deltas(account_ids=[account_id])
+        after = account_balance(account_id)
+        verdict = self.style.SUCCESS("unchanged") if after == before else self.style.ERROR(f"DRIFTED to {after}")
+        self.stdout.write(f"Rolled up {folded['deltas']} ledger row(s); balance {before} -> {verdict}")
@@ -0,0 +1,167 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from finance import views
+from finance.models import Transactions
+
+
+def _list_queryset(viewset_class, user, query: str):
+    """The queryset a list request would run for ``user`` (owner scoping + filter backends)."""
+    request = Request(APIRequestFactory().get(f"/?{query}"))
+    request.user = user
+    view = viewset_class(request=request, format_kwarg=None, action="list", kwargs={})
+    return view.filter_queryset(view.get_queryset())
+
+
+def _keyset_queryset(user):
+    """The second keyset page, built by the list view's own keyset paginator from a decoded cursor."""
+    base = _list_queryset(views.TransactionsViewSet, user, "pagination=keyset")
+    paginator = views.TransactionsViewSet.pagination_class.keyset_class()
+    first = paginator.keyset_queryset(base, None).first()
+    if first is None:
+        return paginator.keyset_queryset(base, None)
+    paginator.base_url = "http://testserver/?pagination=keyset"
+    request = Request(APIRequestFactory().get(paginator.encode_cursor(first, reverse=False)))
+    return paginator.keyset_queryset(base, paginator.decode_cursor(request))
+
+
+def _count_list_queries(viewset_class, user, query: str):
+    """(queries, rows) for one rendered list response."""
+    request = APIRequestFactory().get(f"/?{query}")
+    force_authenticate(request, user=user)
+    view = viewset_class.as_view({"get": "list"})
+    with CaptureQueriesContext(connection) as ctx:
+        response = view(request)
+        response.render()
+    return len(ctx), len(response.data.get("results", []))
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN the main owner-scoped list queries and flag any that are not served by their "
+        "index (full scans, another index, or a sort for ordered lists); check that "
+        "the transactions list runs a fixed number of queries whatever the page size. "
+        "Run with --check in CI against a migrated Postgres database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, help="User id to plan for (default: first user with transactions)")
+        parser.add_argument("--check", action="store_true", help="Exit non-zero if any check fails")
+        parser.add_argument("--verbose-plans", action="store_true", help="Print full plans, not just the verdict")
+
+    def handle(self, *args, **opts):
+        User = get_user_model()
+        if opts["user"]:
+            user = User.objects.filter(id=opts["user"]).first()
+        else:
+            owner = (
+                Transactions.objects.values_list("user_id", flat=True).order_by("user_id").first()
+            )
+            user = User.objects.filter(id=owner).first() if owner else User.objects.order_by("id").first()
+        if user is None:
+            raise CommandError("No user to plan queries for; pass --user or seed some data.")
+
+        account_id = Transactions.objects.filter(user=user).values_list("account_id", flat=True).first()
+        category_id = (
+            Transactions.objects.filter(user=user, category__isnull=False)
+            .values_list("category_id", flat=True).first()
+        )
+
+        page = 50
+        tx = "finance_transactions"
+        # (label, table, queryset, indexes that may serve it, whether the index must also give the order)
+        cases = [
+            ("transactions", tx, _list_queryset(views.TransactionsViewSet, user, ""), ("tx_user_date_idx",), True),
+            ("transactions by date", tx, _list_queryset(views.TransactionsViewSet, user, "ordering=-transactionDate"),
+             ("tx_user_date_idx",), True),
+            ("transactions date range", tx, _list_queryset(
+                views.TransactionsViewSet, user,
+                "transactionDate__gte=2024-01-01T00:00:00Z&transactionDate__lt=2024-02-01T00:00:00Z",
+            ), ("tx_user_date_idx",), True),
+            ("transactions keyset page", tx, _keyset_queryset(user), ("tx_user_date_id_keyset_idx",), True),
+            # Ranked by similarity on Postgres, so sorted; the trigram indexes or the date index find the rows.
+            ("transactions search", tx, _list_queryset(views.TransactionsViewSet, user, "search=coffee"),
+             ("tx_user_date_idx", "tx_name_trgm_idx", "tx_merchant_trgm_idx"), False),
+            ("bills by due date", "finance_bills", _list_queryset(views.BillsViewSet, user, "ordering=dueDate"),
+             ("bills_user_due_idx",), True),
+        ]
+        # The FK filters validate their value, so they need a real row to plan with.
+        if account_id:
+            cases.append(("transactions by account", tx, _list_queryset(
+                views.TransactionsViewSet, user, f"account={account_id}&ordering=-transactionDate"),
+                ("tx_user_account_date_idx",), True))
+        if category_id:
+            cases.append(("transactions by category", tx, _list_queryset(
+                views.TransactionsViewSet, user, f"category={category_id}&ordering=-transactionDate"),
+                ("tx_user_category_date_idx",), True))
+
+        failures = []
+        with transaction.atomic():
+            if connection.vendor == "postgresql":
+                # Tiny dev/CI tables make a seq scan cheapest; ask whether the index *can* serve the query.
+                with connection.cursor() as cur:
+                    cur.execute("SET LOCAL enable_seqscan = off")
+            for label, table, qs, indexes, ordered in cases:
+                plan = qs[:page].explain()
+                problem = self.plan_problem(plan, table, indexes, ordered)
+                verdict = self.style.ERROR(problem) if problem else self.style.SUCCESS("index")
+                self.stdout.write(f"{label:<28} {verdict}")
+                if opts["verbose_plans"] or problem:
+                    self.stdout.write("    " + plan.replace("\n", "\n    "))
+                if problem:
+                    failures.append(label)
+
+        # N+1 guard: a 5-row and a 200-row page must cost the same number of queries.
+        small = _count_list_queries(views.TransactionsViewSet, user, "pagination=keyset&page_size=5")
+        large = _count_list_queries(views.TransactionsViewSet, user, "pagination=keyset&page_size=200")
+        if small[0] != large[0]:
+            self.stdout.write(self.style.ERROR(
+                f"transactions list queries grow with page size: {small[1]} rows -> {small[0]} queries, "
+                f"{large[1]} rows -> {large[0]} queries"
+            ))
+            failures.append("transactions list query count")
+        else:
+            self.stdout.write(f"{'transactions list queries':<28} {self.style.SUCCESS(f'{large[0]} per page')}")
+
+        if failures and opts["check"]:
+            raise CommandError(f"{len(failures)} list query check(s) failed: {', '.join(failures)}")
+
+    @classmethod
+    def plan_problem(cls, plan: str, table: str, indexes, ordered: bool):
+        """Why ``plan`` is not served by one of ``indexes`` (in index order when ``ordered``), or None."""
+        scan = cls._full_scan(plan, table)
+        if scan:
+            return f"FULL SCAN ({scan})"
+        if not any(re.search(rf"\b{index}\b", plan) for index in indexes):
+            return f"NOT USING {' or '.join(indexes)}"
+        sort = cls._sort_step(plan) if ordered else None
+        if sort:
+            return f"SORT ({sort})"
+        return None
+
+    @staticmethod
+    def _sort_step(plan: str):
+        """The plan line that sorts rows instead of reading them in index order, if any."""
+        for line in plan.splitlines():
+            if re.search(r"(^|->)\s*(Incremental )?Sort\s+\(", line):  # postgres
+                return line.strip()
+            if re.search(r"USE TEMP B-TREE FOR (RIGHT PART OF |LAST TERMS? OF )?ORDER BY", line):  # sqlite
+                return line.strip()
+        return None
+
+    @staticmethod
+    def _full_scan(plan: str, table: str):
+        """The plan line that reads all of ``table`` without an index, if any."""
+        for line in plan.splitlines():
+            if f"Seq Scan on {table}" in line:  # postgres
+                return line.strip()
+            # sqlite: "SCAN finance_transactions" (a "SCAN ... USING INDEX" still walks an index)
+            if re.search(rf"\bSCAN {table}\b(?!.*USING (COVERING )?INDEX)", line):
+                return line.strip()
+        return None
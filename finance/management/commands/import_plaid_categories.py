@@ -3,6 +3,7 @@ from pathlib import Path
 from warnings import catch_warnings
 
 from django.core.management.base import BaseCommand
+from finance.category_index import category_index
 from finance.models import Category
 
 class Command(BaseCommand):
@@ -35,6 +36,7 @@ class Command(BaseCommand):
                 else:
                     count_skipped += 1
 
+        category_index.invalidate()
 
         self.stdout.write(
             self.style.SUCCESS(f"Done. Created {count_created}, skipped {count_skipped} (already existed).")
@@ -0,0 +1,86 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Case, FloatField, Sum, Value, When
+from django.db.models.functions import Abs, TruncMonth
+from django.utils import timezone
+
+from finance.models import AccountBalances, BalanceDelta, Transactions, transaction_sort_date
+from finance.services import month_key
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the monthly AccountBalances rollups (income, expenses, closing balance "
+        "from the opening balance) from transactions with one grouped query. "
+        "Transaction writes wait while it runs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--account", type=int, action="append", dest="accounts",
+                            help="Only rebuild these account ids")
+        parser.add_argument("--batch-size", type=int, default=2000, help="Rows per bulk_create")
+
+    def handle(self, *args, **opts):
+        accounts = opts["accounts"]
+        started = time.monotonic()
+        ts = timezone.now()
+
+        with transaction.atomic():
+            if connection.vendor == "postgresql":
+                # Writers insert their ledger row in the same transaction as the transaction row,
+                # so once this lock is granted every write is either fully visible here or waits.
+                with connection.cursor() as cur:
+                    cur.execute(f"LOCK TABLE {BalanceDelta._meta.db_table} IN SHARE ROW EXCLUSIVE MODE")
+
+            # Pending monthly flows are about to be counted straight from the transactions;
+            # keep only their currentBalance part for the next rollup.
+            pending = BalanceDelta.objects.filter(month__isnull=False)
+            existing = AccountBalances.objects.filter(account__isnull=False)
+            tx = Transactions.objects.all()
+            if accounts:
+                pending = pending.filter(account_id__in=accounts)
+                existing = existing.filter(account_id__in=accounts)
+                tx = tx.filter(account_id__in=accounts)
+            pending.filter(amount=0).delete()
+            pending.update(month=None, income=0, expense=0)
+            removed, _ = existing.delete()
+
+            rows = (
+                tx.annotate(month=TruncMonth(transaction_sort_date()))
+                .values("account_id", "account__user_id", "account__openingBalance", "month")
+                .annotate(
+                    income=Sum(Case(When(isIncome=True, then=Abs("amount")), default=Value(0.0),
+                                    output_field=FloatField())),
+                    expense=Sum(Case(When(isIncome=False, then=Abs("amount")), default=Value(0.0),
+                                     output_field=FloatField())),
+                )
+                .order_by("account_id", "month")
+            )
+
+            batch, created, account_count = [], 0, 0
+            current, closing = None, 0.0
+            for row in rows.iterator(chunk_size=opts["batch_size"]):
+                if row["account_id"] != current:
+                    current, closing = row["account_id"], row["account__openingBalance"] or 0.0
+                    account_count += 1
+                income, expense = row["income"] or 0.0, row["expense"] or 0.0
+                closing += income - expense
+                user_id = row["account__user_id"]
+                batch.append(AccountBalances(
+                    user_id=user_id, ownerId=str(user_id), account_id=current,
+                    balanceMonth=month_key(row["month"]), income=income, expanses=expense,
+                    balance=closing, balancedUpdatedDate=ts,
+                ))
+                if len(batch) >= opts["batch_size"]:
+                    AccountBalances.objects.bulk_create(batch)
+                    created += len(batch)
+                    batch = []
+            AccountBalances.objects.bulk_create(batch)
+            created += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {created} monthly row(s) for {account_count} account(s) "
+            f"(replaced {removed}) in {time.monotonic() - started:.1f}s."
+        ))
@@ -0,0 +1,129 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max, Min, Q, Value
+from django.db.models.functions import Coalesce
+
+from finance.models import Account
+from finance.services import apply_deltas_to_accounts, to_decimal, transactions_net, with_pending_balance
+
+
+def _accounts(include_plaid: bool, only_ids=None):
+    qs = Account.objects.all()
+    if not include_plaid:
+        # Plaid reports these balances itself; their transactions never moved currentBalance.
+        qs = qs.exclude(Q(plaidItem__isnull=False) | Q(plaid_access_token__gt=""))
+    if only_ids:
+        qs = qs.filter(id__in=only_ids)
+    return qs
+
+
+def _check_chunk(lo, hi, tolerance, repair, include_plaid, only_ids):
+    """
+    Reconcile accounts with lo <= id < hi using one aggregate query:
+    actual = currentBalance + pending ledger deltas,
+    expected = openingBalance + net of the account's transactions.
+    Returns (checked, [(id, user_id, expected, actual, drift), ...], error).
+    """
+    try:
+        rows = (
+            with_pending_balance(_accounts(include_plaid, only_ids).filter(id__gte=lo, id__lt=hi))
+            .annotate(txNet=Coalesce(transactions_net(), Value(0.0)))
+            .order_by("id")
+            .values_list("id", "user_id", "openingBalance", "currentBalance", "pendingBalance", "txNet")
+        )
+        checked, drifted = 0, []
+        for pk, user_id, opening, current, pending, net in rows.iterator(chunk_size=2000):
+            checked += 1
+            actual = to_decimal(current) + to_decimal(pending)
+            expected = to_decimal(opening) + to_decimal(net)
+            drift = actual - expected
+            if abs(drift) > tolerance:
+                drifted.append((pk, user_id, expected, actual, drift))
+        if repair and drifted:
+            # Correct through the ledger: concurrent writers' deltas still add up.
+            with transaction.atomic():
+                apply_deltas_to_accounts({pk: -drift for pk, _, _, _, drift in drifted})
+        return checked, drifted, None
+    except Exception as e:
+        return 0, [], e
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Check every account's balance against its transaction history "
+        "(openingBalance + net of transactions) and report, or --repair, drift above a tolerance. "
+        "Accounts are processed in id-range chunks by parallel workers, one aggregate query per chunk."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tolerance", type=Decimal, default=Decimal("0.01"),
+                            help="Ignore differences up to this amount")
+        parser.add_argument("--repair", action="store_true",
+                            help="Move drifted balances back to the expected value")
+        parser.add_argument("--workers", type=int, default=4, help="Chunks reconciled at the same time")
+        parser.add_argument("--chunk-size", type=int, default=5000, help="Account ids per chunk")
+        parser.add_argument("--include-plaid", action="store_true",
+                            help="Also check Plaid-linked accounts (their balance comes from Plaid)")
+        parser.add_argument("--account", type=int, action="append", dest="accounts",
+                            help="Only check these account ids")
+        parser.add_argument("--max-report", type=int, default=100, help="Drifted accounts listed individually")
+        parser.add_argument("--check", action="store_true", help="Exit non-zero if drift remains")
+
+    def handle(self, *args, **opts):
+        if opts["workers"] < 1 or opts["chunk_size"] < 1:
+            raise CommandError("--workers and --chunk-size must be >= 1")
+        bounds = _accounts(opts["include_plaid"], opts["accounts"]).aggregate(lo=Min("id"), hi=Max("id"))
+        if bounds["lo"] is None:
+            self.stdout.write("No accounts to reconcile.")
+            return
+        chunks = range(bounds["lo"], bounds["hi"] + 1, opts["chunk_size"])
+        started = time.monotonic()
+        checked = drifted = reported = 0
+        total_drift = Decimal("0")
+        failures = []
+
+        connection.close()  # workers open their own connections
+        with ThreadPoolExecutor(max_workers=opts["workers"]) as pool:
+            futures = {
+                pool.submit(
+                    _check_chunk, lo, lo + opts["chunk_size"], opts["tolerance"], opts["repair"],
+                    opts["include_plaid"], opts["accounts"],
+                ): lo
+                for lo in chunks
+            }
+            for fut in as_completed(futures):
+                n, rows, error = fut.result()
+                if error is not None:
+                    failures.append(futures[fut])
+                    self.stdout.write(self.style.ERROR(f"ids {futures[fut]}+: {error}"))
+                    continue
+                checked += n
+                drifted += len(rows)
+                for pk, user_id, expected, actual, drift in rows:
+                    total_drift += abs(drift)
+                    if reported < opts["max_report"]:
+                        reported += 1
+                        self.stdout.write(self.style.WARNING(
+                            f"account {pk} (user {user_id}): balance {actual:.2f}, "
+                            f"transactions say {expected:.2f}, drift {drift:+.2f}"
+                        ))
+        if drifted > reported:
+            self.stdout.write(f"... and {drifted - reported} more")
+
+        elapsed = max(time.monotonic() - started, 1e-9)
+        action = "repaired" if opts["repair"] else "drifted"
+        summary = (
+            f"{checked} account(s) checked in {elapsed:.1f}s ({checked / elapsed:.0f}/s): "
+            f"{drifted} {action}, total drift {total_drift:.2f}."
+        )
+        self.stdout.write(self.style.SUCCESS(summary) if not drifted else self.style.WARNING(summary))
+        if failures:
+            raise CommandError(f"{len(failures)} chunk(s) failed.")
+        if opts["check"] and drifted and not opts["repair"]:
+            raise CommandError(f"{drifted} account(s) drifted beyond {opts['tolerance']}.")
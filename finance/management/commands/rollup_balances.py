@@ -0,0 +1,42 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from finance.services import ROLLUP_BATCH_SIZE, rollup_balance_deltas
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold pending BalanceDelta ledger rows into Account.currentBalance and the monthly "
+        "AccountBalances rollups. "
+        "Run once (cron) or with --interval as a long-lived background process."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interval", type=float, default=0,
+                            help="Seconds between passes; 0 = one pass and exit")
+        parser.add_argument("--batch-size", type=int, default=ROLLUP_BATCH_SIZE,
+                            help="Ledger rows folded per transaction")
+        parser.add_argument("--account", type=int, action="append", dest="accounts",
+                            help="Only roll up these account ids")
+
+    def handle(self, *args, **opts):
+        if opts["batch_size"] < 1:
+            raise CommandError("--batch-size must be >= 1")
+        stop = threading.Event()
+        if opts["interval"] > 0:
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(sig, lambda *_: stop.set())
+
+        while True:
+            result = rollup_balance_deltas(batch_size=opts["batch_size"], account_ids=opts["accounts"])
+            if result["deltas"] or opts["interval"] <= 0:
+                self.stdout.write(
+                    f"Folded {result['deltas']} delta(s) into {result['accounts']} account and "
+                    f"{result['months']} month update(s) in {result['batches']} batch(es)."
+                )
+            if opts["interval"] <= 0 or stop.wait(opts["interval"]):
+                break
+            connection.close_if_unusable_or_obsolete()
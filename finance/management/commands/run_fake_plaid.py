@@ -0,0 +1,60 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from finance.fake_plaid import FakePlaidConfig, make_server
+
+
+class Command(BaseCommand):
+    help = "Serve a deterministic local stand-in for the Plaid API (use with PLAID_ENV=local)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--accounts", type=int, default=2, help="Accounts per item")
+        parser.add_argument("--transactions", type=int, default=2000, help="History rows per item (first sync)")
+        parser.add_argument("--days", type=int, default=730, help="Days of history the rows are spread over")
+        parser.add_argument("--end-date", type=date.fromisoformat, default=date(2025, 1, 1))
+        parser.add_argument("--update-batches", type=int, default=3,
+                            help="Follow-up syncs that return new/modified/removed rows")
+        parser.add_argument("--added", type=int, default=25, help="New rows per update batch")
+        parser.add_argument("--modified", type=int, default=10, help="Modified rows per update batch")
+        parser.add_argument("--removed", type=int, default=5, help="Removed rows per update batch")
+        parser.add_argument("--max-count", type=int, default=500, help="Largest page size honoured")
+        parser.add_argument("--latency-ms", type=float, default=0.0, help="Added to every response")
+        parser.add_argument("--jitter-ms", type=float, default=0.0, help="Random extra latency, 0..N ms")
+        parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail (0..1)")
+        parser.add_argument("--error-code", default="INTERNAL_SERVER_ERROR",
+                            help="Plaid error_code for injected failures")
+        parser.add_argument("--verbose", action="store_true", help="Log every request")
+
+    def handle(self, *args, **opts):
+        config = FakePlaidConfig(
+            seed=opts["seed"],
+            accounts_per_item=opts["accounts"],
+            history_transactions=opts["transactions"],
+            history_days=opts["days"],
+            end_date=opts["end_date"],
+            update_batches=opts["update_batches"],
+            added_per_update=opts["added"],
+            modified_per_update=opts["modified"],
+            removed_per_update=opts["removed"],
+            max_count=opts["max_count"],
+            latency_ms=opts["latency_ms"],
+            jitter_ms=opts["jitter_ms"],
+            error_rate=opts["error_rate"],
+            error_code=opts["error_code"],
+        )
+        server = make_server(config, opts["host"], opts["port"], verbose=opts["verbose"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Fake Plaid listening on http://{opts['host']}:{opts['port']} "
+            f"(set PLAID_ENV=local, PLAID_LOCAL_URL to this address)"
+        ))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f"Requests served: {config.stats}")
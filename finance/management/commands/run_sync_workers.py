@@ -0,0 +1,83 @@
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from finance import sync_queue
+from finance.plaid_client import close_plaid_clients
+
+
+class Command(BaseCommand):
+    help = "Run Plaid transactions-sync workers that drain the PlaidWebhookEvent queue."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4, help="Number of concurrent workers")
+        parser.add_argument("--mode", choices=("thread", "process"), default="thread",
+                            help="Run workers as threads in this process or as forked processes")
+        parser.add_argument("--poll-interval", type=float, default=2.0,
+                            help="Seconds an idle worker waits before polling again")
+        parser.add_argument("--max-attempts", type=int, default=sync_queue.DEFAULT_MAX_ATTEMPTS)
+        parser.add_argument("--backoff", type=float, default=sync_queue.DEFAULT_BACKOFF_SECONDS,
+                            help="Base retry delay in seconds (doubles per attempt)")
+        parser.add_argument("--backoff-max", type=float, default=sync_queue.DEFAULT_BACKOFF_MAX_SECONDS)
+        parser.add_argument("--lease", type=float, default=sync_queue.DEFAULT_LEASE_SECONDS,
+                            help="Seconds before a 'processing' job is considered abandoned")
+        parser.add_argument("--once", action="store_true", help="Exit when the queue is empty")
+
+    def handle(self, *args, **opts):
+        n = int(opts["workers"])
+        if n < 1:
+            raise CommandError("--workers must be >= 1")
+
+        loop_opts = dict(
+            poll_interval=opts["poll_interval"],
+            once=opts["once"],
+            lease_seconds=opts["lease"],
+            max_attempts=opts["max_attempts"],
+            backoff=opts["backoff"],
+            backoff_max=opts["backoff_max"],
+        )
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+
+        if opts["mode"] == "process":
+            ctx = multiprocessing.get_context("fork")
+            stop = ctx.Event()
+            # Children must not inherit the parent's DB sockets.
+            connections.close_all()
+            workers = [
+                ctx.Process(target=sync_queue.worker_loop, args=(f"{prefix}:p{i}", stop), kwargs=loop_opts)
+                for i in range(n)
+            ]
+        else:
+            stop = threading.Event()
+            workers = [
+                threading.Thread(target=sync_queue.worker_loop, args=(f"{prefix}:t{i}", stop),
+                                 kwargs=loop_opts, daemon=True)
+                for i in range(n)
+            ]
+
+        def _shutdown(signum, frame):
+            self.stdout.write(self.style.WARNING("Stopping workers after their current job..."))
+            stop.set()
+
+        signal.signal(signal.SIGTERM, _shutdown)
+        signal.signal(signal.SIGINT, _shutdown)
+
+        self.stdout.write(self.style.SUCCESS(f"Starting {n} sync worker(s) in {opts['mode']} mode."))
+        for w in workers:
+            w.start()
+        for w in workers:
+            # Short joins keep the main thread responsive to signals.
+            while w.is_alive():
+                w.join(timeout=1.0)
+        close_plaid_clients()
+
+        savings = sync_queue.sync_savings()
+        self.stdout.write(self.style.SUCCESS(
+            f"All sync workers stopped. Sync requests: {savings['requested']}, "
+            f"coalesced: {savings['coalesced']}, syncs run: {savings['syncs']}."
+        ))
@@ -6,11 +6,10 @@ from decimal import Decimal, ROUND_HALF_UP
 from django.core.management.base import BaseCommand, CommandError
 from django.contrib.auth import get_user_model
 from django.db import transaction
-from django.db.models import F, Value
-from django.db.models.functions import Coalesce
 from django.utils import timezone
 
 from finance.models import Account, Transactions, Category
+from finance.services import TransactionLedger
 
 User = get_user_model()
 
@@ -48,12 +47,6 @@ def upsert_category(id: int) -> Category:
     return cat
 
 
-def bump_balance(account_id, delta: Decimal):
-    Account.objects.filter(id=account_id).update(
-        currentBalance=Coalesce(F("currentBalance"), Value(0)) + delta
-    )
-
-
 def pick_account_by_type(accounts, type_keywords: tuple[str, ...]):
     for acc in accounts:
         t = (acc.accountType or "").lower()
@@ -366,6 +359,8 @@ class Command(BaseCommand):
         created, months_done = 0, 0
         y, m = start_year, start_month
         balance_deltas = {}
+        # Balance and monthly rollups, recorded once per (account, month) at the end.
+        ledger = TransactionLedger()
 
         ctx_mgr = transaction.atomic if not dry_run else _nullcontext  # type: ignore
         with ctx_mgr():
@@ -391,7 +386,7 @@ class Command(BaseCommand):
                         balance_deltas[acc.id] = balance_deltas.get(acc.id, Decimal("0")) + delta
                         continue
 
-                    Transactions.objects.create(
+                    tx = Transactions.objects.create(
                         user=user,
                         ownerId=str(user.id),
                         amount=float(amt),
@@ -407,7 +402,7 @@ class Command(BaseCommand):
                         isCashAccount=False,
                         canDelete=True,
                     )
-                    bump_balance(acc.id, delta)
+                    ledger.add(tx)
                     created += 1
 
                 months_done += 1
@@ -421,6 +416,9 @@ class Command(BaseCommand):
                 else:
                     m += 1
 
+            if not dry_run:
+                ledger.save()
+
         if dry_run:
             self.stdout.write(self.style.WARNING("\nDRY RUN — no DB writes performed."))
             if balance_deltas:
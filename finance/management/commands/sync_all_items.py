@@ -0,0 +1,142 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from finance.models import PlaidItem
+from finance.plaid_client import close_plaid_clients
+from finance.services import SyncLeaseUnavailable, sync_plaid_item_transactions
+
+
+class RateLimiter:
+    """Thread-safe token bucket: at most ``rate`` acquisitions per second (bursts up to ``rate``)."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_for = (1 - self.tokens) / self.rate
+            time.sleep(wait_for)
+
+
+def _sync_one(item_id, throttle):
+    started = time.monotonic()
+    try:
+        result = sync_plaid_item_transactions(item_id, worker="sync_all_items", throttle=throttle)
+        return item_id, result, None, time.monotonic() - started
+    except Exception as e:
+        return item_id, None, e, time.monotonic() - started
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = "Sync transactions for every linked PlaidItem concurrently (nightly / post-outage catch-up)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=8, help="Items synced at the same time")
+        parser.add_argument("--per-user", type=int, default=1,
+                            help="Max items of a single user synced at the same time")
+        parser.add_argument("--rate", type=float, default=0,
+                            help="Global ceiling on Plaid requests per second (0 = unlimited)")
+        parser.add_argument("--item", action="append", dest="items", help="Only sync these item ids")
+
+    def handle(self, *args, **opts):
+        concurrency = int(opts["concurrency"])
+        per_user = int(opts["per_user"])
+        if concurrency < 1 or per_user < 1:
+            raise CommandError("--concurrency and --per-user must be >= 1")
+        throttle = RateLimiter(opts["rate"]).acquire if opts["rate"] > 0 else None
+
+        qs = PlaidItem.objects.exclude(access_token__isnull=True).exclude(access_token="")
+        if opts.get("items"):
+            qs = qs.filter(item_id__in=opts["items"])
+        pairs = qs.values_list("user_id", "item_id").order_by("user_id", "item_id")
+
+        # One queue per user; the scheduler round-robins over users so a tenant
+        # with many institutions cannot starve everybody else.
+        queues = {}
+        for user_id, item_id in pairs:
+            queues.setdefault(user_id, deque()).append(item_id)
+        total = sum(len(q) for q in queues.values())
+        if not total:
+            self.stdout.write("No linked Plaid items found.")
+            return
+
+        self.stdout.write(
+            f"Syncing {total} item(s) for {len(queues)} user(s): concurrency={concurrency}, "
+            f"per-user={per_user}, rate={opts['rate'] or 'unlimited'}/s"
+        )
+
+        in_flight_by_user = {u: 0 for u in queues}
+        owner = {}
+        users = deque(queues)
+        done = failed = busy = 0
+        tx_total = 0
+        started = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            pending = set()
+            while users or pending:
+                # Fill free slots, one item per eligible user per pass.
+                progressed = True
+                while len(pending) < concurrency and users and progressed:
+                    progressed = False
+                    for _ in range(len(users)):
+                        if len(pending) >= concurrency:
+                            break
+                        user_id = users[0]
+                        users.rotate(-1)
+                        if in_flight_by_user[user_id] >= per_user or not queues[user_id]:
+                            continue
+                        item_id = queues[user_id].popleft()
+                        fut = pool.submit(_sync_one, item_id, throttle)
+                        owner[fut] = user_id
+                        in_flight_by_user[user_id] += 1
+                        pending.add(fut)
+                        progressed = True
+                    users = deque(u for u in users if queues[u])
+
+                if not pending:
+                    break
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    user_id = owner.pop(fut)
+                    in_flight_by_user[user_id] -= 1
+                    item_id, result, error, took = fut.result()
+                    done += 1
+                    prefix = f"[{done}/{total}] {item_id}"
+                    if error is None:
+                        tx = result["added"] + result["modified"] + result["removed"]
+                        tx_total += tx
+                        self.stdout.write(
+                            f"{prefix}: +{result['added']} ~{result['modified']} -{result['removed']} "
+                            f"({result['pages']} page(s), {took:.1f}s)"
+                        )
+                    elif isinstance(error, SyncLeaseUnavailable):
+                        busy += 1
+                        self.stdout.write(self.style.WARNING(f"{prefix}: skipped, already syncing elsewhere"))
+                    else:
+                        failed += 1
+                        self.stdout.write(self.style.ERROR(f"{prefix}: {error}"))
+
+        close_plaid_clients()
+        elapsed = max(time.monotonic() - started, 1e-9)
+        self.stdout.write(self.style.SUCCESS(
+            f"Done in {elapsed:.1f}s: {done - failed - busy} synced, {failed} failed, {busy} busy. "
+            f"{done / elapsed:.2f} items/s, {tx_total / elapsed:.1f} transactions/s ({tx_total} total)."
+        ))
@@ -0,0 +1,103 @@
+# Generated by Django 4.2.23 on 2026-10-17 02:12
+
+from django.db import migrations, models
+import django.utils.timezone
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finance", "0006_account_institution_name_account_mask_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="account",
+            name="plaid_transactions_cursor",
+            field=models.CharField(blank=True, max_length=1024, null=True),
+        ),
+        migrations.AddField(
+            model_name="category",
+            name="description",
+            field=models.CharField(blank=True, max_length=160, null=True),
+        ),
+        migrations.AlterField(
+            model_name="category",
+            name="name",
+            field=models.CharField(max_length=120),
+        ),
+        migrations.AlterField(
+            model_name="category",
+            name="slug",
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name="transactions",
+            name="id",
+            field=models.CharField(
+                default=uuid.uuid4,
+                editable=False,
+                max_length=64,
+                primary_key=True,
+                serialize=False,
+                unique=True,
+            ),
+        ),
+        migrations.CreateModel(
+            name="PlaidWebhookEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "item_id",
+                    models.CharField(
+                        blank=True, db_index=True, max_length=128, null=True
+                    ),
+                ),
+                (
+                    "webhook_type",
+                    models.CharField(
+                        blank=True, db_index=True, max_length=64, null=True
+                    ),
+                ),
+                (
+                    "webhook_code",
+                    models.CharField(blank=True, max_length=64, null=True),
+                ),
+                ("environment", models.CharField(blank=True, max_length=32, null=True)),
+                ("initial_update_complete", models.BooleanField(default=False)),
+                ("historical_update_complete", models.BooleanField(default=False)),
+                ("body", models.JSONField(blank=True, default=dict)),
+                (
+                    "received_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                ("processed_at", models.DateTimeField(blank=True, null=True)),
+                ("status", models.CharField(default="received", max_length=32)),
+                ("error", models.TextField(blank=True, null=True)),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                (
+                    "available_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                ("locked_at", models.DateTimeField(blank=True, null=True)),
+                ("locked_by", models.CharField(blank=True, max_length=128, null=True)),
+            ],
+            options={
+                "ordering": ["-received_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["status", "available_at"], name="plaidwebhook_queue_idx"
+                    )
+                ],
+            },
+        ),
+    ]
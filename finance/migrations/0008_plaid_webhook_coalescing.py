@@ -0,0 +1,25 @@
+# Generated by Django 4.2.23 on 2026-10-17 02:13
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finance", "0007_plaid_sync_queue"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="plaidwebhookevent",
+            name="covered_by",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="covered_events",
+                to="finance.plaidwebhookevent",
+            ),
+        ),
+    ]
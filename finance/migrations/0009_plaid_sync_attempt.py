@@ -0,0 +1,70 @@
+# Generated by Django 4.2.23 on 2026-10-17 02:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finance", "0008_plaid_webhook_coalescing"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PlaidSyncAttempt",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("item_id", models.CharField(db_index=True, max_length=128)),
+                ("status", models.CharField(default="running", max_length=32)),
+                ("worker", models.CharField(blank=True, max_length=128, null=True)),
+                (
+                    "start_cursor",
+                    models.CharField(blank=True, max_length=1024, null=True),
+                ),
+                (
+                    "last_cursor",
+                    models.CharField(blank=True, max_length=1024, null=True),
+                ),
+                ("pages_completed", models.PositiveIntegerField(default=0)),
+                ("added", models.PositiveIntegerField(default=0)),
+                ("modified", models.PositiveIntegerField(default=0)),
+                ("removed", models.PositiveIntegerField(default=0)),
+                ("rows_written", models.PositiveIntegerField(default=0)),
+                ("started_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("lease_expires_at", models.DateTimeField()),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                ("error", models.TextField(blank=True, null=True)),
+                (
+                    "resumed_from",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="finance.plaidsyncattempt",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-started_at"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="plaidsyncattempt",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("status", "running")),
+                fields=("item_id",),
+                name="plaidsync_one_running_per_item",
+            ),
+        ),
+    ]
@@ -0,0 +1,117 @@
+# Generated by Django 4.2.23 on 2026-10-17 02:18
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_plaid_items(apps, schema_editor):
+    """One PlaidItem per distinct Account.plaid_item_id; point those accounts at it."""
+    Account = apps.get_model("finance", "Account")
+    PlaidItem = apps.get_model("finance", "PlaidItem")
+
+    linked = (
+        Account.objects.exclude(plaid_item_id__isnull=True)
+        .exclude(plaid_item_id="")
+        .order_by("plaid_item_id", "id")
+    )
+    seen = {}
+    for acc in linked.iterator():
+        item = seen.get(acc.plaid_item_id)
+        if item is None:
+            item = PlaidItem.objects.create(
+                user_id=acc.user_id,
+                ownerId=acc.ownerId,
+                item_id=acc.plaid_item_id,
+                access_token=acc.plaid_access_token,
+                institution_name=acc.institution_name,
+                transactions_cursor=acc.plaid_transactions_cursor,
+            )
+            seen[acc.plaid_item_id] = item
+        else:
+            changed = []
+            if not item.access_token and acc.plaid_access_token:
+                item.access_token = acc.plaid_access_token
+                changed.append("access_token")
+            if not item.transactions_cursor and acc.plaid_transactions_cursor:
+                item.transactions_cursor = acc.plaid_transactions_cursor
+                changed.append("transactions_cursor")
+            if changed:
+                item.save(update_fields=changed)
+
+    for item_id, item in seen.items():
+        Account.objects.filter(plaid_item_id=item_id).update(plaidItem=item)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("finance", "0009_plaid_sync_attempt"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PlaidItem",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "ownerId",
+                    models.CharField(
+                        blank=True, db_index=True, max_length=64, null=True
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("item_id", models.CharField(max_length=128, unique=True)),
+                (
+                    "access_token",
+                    models.CharField(blank=True, max_length=255, null=True),
+                ),
+                (
+                    "institution_name",
+                    models.CharField(blank=True, max_length=255, null=True),
+                ),
+                (
+                    "transactions_cursor",
+                    models.CharField(blank=True, max_length=1024, null=True),
+                ),
+                ("sync_status", models.CharField(default="idle", max_length=32)),
+                ("last_sync_started_at", models.DateTimeField(blank=True, null=True)),
+                ("last_sync_finished_at", models.DateTimeField(blank=True, null=True)),
+                ("last_synced_at", models.DateTimeField(blank=True, null=True)),
+                ("last_sync_error", models.TextField(blank=True, null=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="%(class)ss",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+        migrations.AddField(
+            model_name="account",
+            name="plaidItem",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="accounts",
+                to="finance.plaiditem",
+            ),
+        ),
+        migrations.RunPython(backfill_plaid_items, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 4.2.23 on 2026-10-17 02:26
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def merge_duplicate_linked_accounts(apps, schema_editor):
+    """
+    The old exchange flow could link the same Plaid account twice for a user.
+    Keep the lowest id of each (user, accountId) group, move the other rows'
+    dependents onto it and delete them. Blank accountIds are manual accounts:
+    they become NULL, which the constraint lets repeat.
+    """
+    Account = apps.get_model("finance", "Account")
+    Account.objects.filter(accountId="").update(accountId=None)
+
+    relations = [rel for rel in Account._meta.related_objects if not rel.many_to_many]
+    groups = (
+        Account.objects.filter(accountId__isnull=False)
+        .values("user_id", "accountId")
+        .annotate(n=Count("id"), keep=Min("id"))
+        .filter(n__gt=1)
+    )
+    for group in groups:
+        keep = group["keep"]
+        extra = list(
+            Account.objects.filter(
+                user_id=group["user_id"], accountId=group["accountId"]
+            )
+            .exclude(id=keep)
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+        for rel in relations:
+            model, field = rel.related_model, rel.field.name
+            rows = model.objects.filter(**{f"{field}__in": extra})
+            if rel.one_to_one:
+                # Only one row may point at the kept account; the rest are unlinked by the delete.
+                first = rows.order_by("pk").values_list("pk", flat=True).first()
+                if first is None or model.objects.filter(**{field: keep}).exists():
+                    continue
+                rows = model.objects.filter(pk=first)
+            rows.update(**{field: keep})
+        Account.objects.filter(id__in=extra).delete()
+
+
+class Migration(migrations.Migration):
+    # Commit the merge before adding the constraint: on Postgres the deferred foreign-key
+    # checks it queues would otherwise block ALTER TABLE in the same transaction.
+    atomic = False
+
+    dependencies = [
+        ("finance", "0010_plaid_item"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            merge_duplicate_linked_accounts, migrations.RunPython.noop, atomic=True
+        ),
+        migrations.AddConstraint(
+            model_name="account",
+            constraint=models.UniqueConstraint(
+                fields=("user", "accountId"), name="account_user_accountid_uniq"
+            ),
+        ),
+    ]
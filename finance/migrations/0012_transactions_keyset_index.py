@@ -0,0 +1,34 @@
+# Generated by Django 4.2.23 on 2026-10-17 02:28
+
+import datetime
+from django.db import migrations, models
+import django.db.models.functions.comparison
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finance", "0011_account_user_accountid_unique"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="transactions",
+            index=models.Index(
+                models.F("user"),
+                models.OrderBy(
+                    django.db.models.functions.comparison.Coalesce(
+                        "transactionDate",
+                        models.Value(
+                            datetime.datetime(
+                                1, 1, 1, 0, 0, tzinfo=datetime.timezone.utc
+                            )
+                        ),
+                    ),
+                    descending=True,
+                ),
+                models.OrderBy(models.F("id"), descending=True),
+                name="tx_user_date_id_keyset_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.23 on 2026-10-17 02:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finance", "0012_transactions_keyset_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="bills",
+            index=models.Index(fields=["user", "dueDate"], name="bills_user_due_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="transactions",
+            index=models.Index(
+                fields=["user", "transactionDate"], name="tx_user_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transactions",
+            index=models.Index(
+                fields=["user", "account", "transactionDate"],
+                name="tx_user_account_date_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transactions",
+            index=models.Index(
+                fields=["user", "category", "transactionDate"],
+                name="tx_user_category_date_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Trigram indexes for TransactionSearchFilter (finance/search.py).
+# Postgres only: SQLite dev databases keep plain substring scans. So does a
+# Postgres server without pg_trgm (or without the right to create it): the
+# indexes are skipped and search falls back to unranked icontains.
+
+import logging
+
+from django.db import DatabaseError, migrations, transaction
+
+logger = logging.getLogger(__name__)
+
+TRGM_INDEXES = (
+    ("tx_name_trgm_idx", "name"),
+    ("tx_merchant_trgm_idx", "merchantName"),
+)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    # Needs CREATE privilege on the database (or the extension already installed by a superuser).
+    # The savepoint keeps a failure from aborting the rest of the migration.
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    except DatabaseError as e:
+        logger.warning("pg_trgm unavailable, skipping trigram search indexes: %s", e)
+        return
+    for name, column in TRGM_INDEXES:
+        # UPPER(col) matches what `icontains` compiles to: UPPER(col::text) LIKE UPPER(%s)
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON finance_transactions USING gin (UPPER("{column}") gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, _ in TRGM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finance", "0013_owner_scoped_list_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
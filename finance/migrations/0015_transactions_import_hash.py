@@ -0,0 +1,26 @@
+# Generated by Django 4.2.23 on 2026-10-17 02:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finance", "0014_transactions_trigram_search"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="transactions",
+            name="importHash",
+            field=models.CharField(
+                blank=True, editable=False, max_length=64, null=True
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="transactions",
+            constraint=models.UniqueConstraint(
+                fields=("account", "importHash"), name="tx_account_import_hash_uniq"
+            ),
+        ),
+    ]
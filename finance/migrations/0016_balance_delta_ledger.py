@@ -0,0 +1,39 @@
+# Generated by Django 4.2.23 on 2026-10-17 02:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finance", "0015_transactions_import_hash"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BalanceDelta",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("amount", models.DecimalField(decimal_places=6, max_digits=20)),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "account",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="balance_deltas",
+                        to="finance.account",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["account", "id"], name="balancedelta_account_id_idx"
+                    )
+                ],
+            },
+        ),
+    ]
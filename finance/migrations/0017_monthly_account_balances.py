@@ -0,0 +1,52 @@
+# Generated by Django 4.2.23 on 2026-10-17 02:48
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finance", "0016_balance_delta_ledger"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="balancedelta",
+            name="expense",
+            field=models.DecimalField(decimal_places=6, default=0, max_digits=20),
+        ),
+        migrations.AddField(
+            model_name="balancedelta",
+            name="income",
+            field=models.DecimalField(decimal_places=6, default=0, max_digits=20),
+        ),
+        migrations.AddField(
+            model_name="balancedelta",
+            name="month",
+            field=models.CharField(blank=True, max_length=7, null=True),
+        ),
+        migrations.AlterField(
+            model_name="accountbalances",
+            name="account",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="monthly_balances",
+                to="finance.account",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="balancedelta",
+            name="amount",
+            field=models.DecimalField(decimal_places=6, default=0, max_digits=20),
+        ),
+        migrations.AddConstraint(
+            model_name="accountbalances",
+            constraint=models.UniqueConstraint(
+                fields=("account", "balanceMonth"),
+                name="accountbalances_account_month_uniq",
+            ),
+        ),
+    ]
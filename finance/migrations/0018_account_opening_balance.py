@@ -0,0 +1,59 @@
+# Generated by Django 4.2.23 on 2026-10-17 02:50
+
+from django.db import migrations, models
+from django.db.models import Case, F, FloatField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce
+
+
+def backfill_opening_balance(apps, schema_editor):
+    """
+    openingBalance = today's balance (stored + pending ledger deltas) minus the
+    net of the account's transactions, so every account reconciles as of now.
+    """
+    Account = apps.get_model("finance", "Account")
+    Transactions = apps.get_model("finance", "Transactions")
+    BalanceDelta = apps.get_model("finance", "BalanceDelta")
+
+    net = (
+        Transactions.objects.filter(account=OuterRef("pk"))
+        .order_by()
+        .values("account")
+        .annotate(
+            total=Sum(
+                Case(
+                    When(isIncome=True, then=F("amount")),
+                    default=-F("amount"),
+                    output_field=FloatField(),
+                )
+            )
+        )
+        .values("total")
+    )
+    pending = (
+        BalanceDelta.objects.filter(account=OuterRef("pk"))
+        .order_by()
+        .values("account")
+        .annotate(total=Sum("amount"))
+        .values("total")
+    )
+    Account.objects.update(
+        openingBalance=Coalesce(F("currentBalance"), Value(0.0))
+        + Coalesce(Cast(Subquery(pending), FloatField()), Value(0.0))
+        - Coalesce(Subquery(net), Value(0.0))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finance", "0017_monthly_account_balances"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="account",
+            name="openingBalance",
+            field=models.FloatField(blank=True, default=0, null=True),
+        ),
+        migrations.RunPython(backfill_opening_balance, migrations.RunPython.noop),
+    ]
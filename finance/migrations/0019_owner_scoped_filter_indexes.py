@@ -0,0 +1,29 @@
+# Generated by Django 4.2.23 on 2026-10-17 03:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finance", "0018_account_opening_balance"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="budget",
+            index=models.Index(fields=["user", "type"], name="budget_user_type_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="devices",
+            index=models.Index(
+                fields=["user", "deviceId"], name="devices_user_device_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="recursivetransactions",
+            index=models.Index(
+                fields=["user", "sourceId"], name="recursivetx_user_source_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.23 on 2026-10-17 03:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finance", "0019_owner_scoped_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="transactions",
+            name="tx_user_date_idx",
+        ),
+        migrations.AddIndex(
+            model_name="transactions",
+            index=models.Index(
+                fields=["user", "transactionDate", "id"], name="tx_user_date_idx"
+            ),
+        ),
+    ]
@@ -1,5 +1,67 @@
 from __future__ import annotations
 
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_PARAM = "fields"
+EXCLUDE_PARAM = "exclude"
+
+
+def sparse_fieldset(request) -> tuple[set[str] | None, set[str]]:
+    """``?fields=a,b`` / ``?exclude=c`` of a read request as (only or None, exclude)."""
+    if request is None or request.method not in SAFE_METHODS:
+        return None, set()
+    params = getattr(request, "query_params", request.GET)
+
+    def names(param):
+        return {n.strip() for n in params.get(param, "").split(",") if n.strip()}
+
+    return names(FIELDS_PARAM) or None, names(EXCLUDE_PARAM)
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Drop serializer fields not asked for with ``?fields=`` or listed in ``?exclude=``.
+    Only on GET/HEAD/OPTIONS, so writes always validate the full field set.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        only, exclude = sparse_fieldset(self.context.get("request"))
+        if only is None and not exclude:
+            return
+        for name in list(self.fields):
+            if (only is not None and name not in only) or name in exclude:
+                self.fields.pop(name)
+
+
+class SparseFieldsetQuerysetMixin:
+    """
+    Viewset side of sparse fieldsets: defer the model columns that no remaining
+    serializer field reads, so ``?fields=`` also shrinks the SELECT list.
+    """
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        only, exclude = sparse_fieldset(self.request)
+        if only is None and not exclude:
+            return queryset
+
+        serializer = self.get_serializer()
+        serializer = getattr(serializer, "child", serializer)
+        sources = set()
+        for field in serializer.fields.values():
+            if field.source == "*":  # SerializerMethodField & co. may read anything
+                return queryset
+            sources.add(field.source.split(".")[0])
+
+        opts = queryset.model._meta
+        keep = sources | {opts.pk.name, getattr(self, "owner_field", "user")}  # IsOwner reads user_id
+        select_related = queryset.query.select_related
+        if select_related is True:
+            keep |= {f.name for f in opts.concrete_fields if f.is_relation}
+        elif select_related:
+            keep |= set(select_related)
+        deferred = [f.name for f in opts.concrete_fields if f.name not in keep]
+        return queryset.defer(*deferred) if deferred else queryset
+
 
 class OwnedQuerysetMixin:
     owner_field = "user"           # set to "owner" if your other models use that
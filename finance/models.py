@@ -1,7 +1,9 @@
 import uuid
+from datetime import datetime, timezone
 
 from django.conf import settings
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.utils.text import slugify
 from django.utils.timezone import now
 
@@ -37,6 +39,11 @@ class Bills(OwnedModel):
     lastPaidDate = models.DateTimeField(blank=True, null=True)
     lastPaidDueDate = models.DateTimeField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "dueDate"], name="bills_user_due_idx"),
+        ]
+
 class PaidMonths(OwnedModel):
     paidMonth = models.DateTimeField(blank=True, null=True)
     accountId = models.CharField(max_length=64, blank=True, null=True)
@@ -48,6 +55,11 @@ class RecursiveTransactions(OwnedModel):
     repeat = models.CharField(max_length=32, choices=RepeatTransaction.choices, blank=True, null=True)
     recursiveUpdatedDate = models.DateTimeField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "sourceId"], name="recursivetx_user_source_idx"),
+        ]
+
 class Goal(OwnedModel):
     goalName = models.CharField(max_length=120, blank=True, null=True)
     goalDesc = models.TextField(blank=True, null=True)
@@ -78,6 +90,31 @@ class Budget(OwnedModel):
     amount = models.FloatField(blank=True, null=True)
     note = models.TextField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "type"], name="budget_user_type_idx"),
+        ]
+
+class PlaidItem(OwnedModel):
+    """
+    One linked Plaid Item (a login at an institution). Owns the item-level state
+    that used to be copied onto every Account row: access token, sync cursor
+    and sync status.
+    """
+    item_id = models.CharField(max_length=128, unique=True)
+    access_token = models.CharField(max_length=255, blank=True, null=True)  # store securely in real prod
+    institution_name = models.CharField(max_length=255, blank=True, null=True)
+    transactions_cursor = models.CharField(max_length=1024, blank=True, null=True)
+    sync_status = models.CharField(max_length=32, default="idle")  # idle|running|error
+    last_sync_started_at = models.DateTimeField(blank=True, null=True)
+    last_sync_finished_at = models.DateTimeField(blank=True, null=True)
+    last_synced_at = models.DateTimeField(blank=True, null=True)  # last successful sync
+    last_sync_error = models.TextField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.institution_name or 'Plaid item'} ({self.item_id})"
+
 class Account(OwnedModel):
     isInternalAccount = models.BooleanField(default=False)
     accountId = models.CharField(max_length=64, blank=True, null=True, db_index=True)
@@ -88,6 +125,9 @@ class Account(OwnedModel):
     officialAccountName = models.CharField(max_length=255, blank=True, null=True)
     availableBalance = models.FloatField(blank=True, null=True, default=0)
     currentBalance = models.FloatField(blank=True, null=True, default=0)
+    # Balance before the first recorded transaction: currentBalance should equal this plus the
+    # net of the account's transactions (checked by ``manage.py reconcile_balances``).
+    openingBalance = models.FloatField(blank=True, null=True, default=0)
     createdDate = models.DateTimeField(blank=True, null=True)
     updatedDate = models.DateTimeField(blank=True, null=True)
     transactionsUpdatedDate = models.DateTimeField(blank=True, null=True)
@@ -104,7 +144,14 @@ class Account(OwnedModel):
     plaid_item_id = models.CharField(max_length=128, blank=True, null=True)
     institution_name = models.CharField(max_length=255, blank=True, null=True)
     mask = models.CharField(max_length=8, blank=True, null=True)                   # last4 etc.
-    plaid_transactions_cursor = models.CharField(max_length=1024, null=True, blank=True)
+    plaid_transactions_cursor = models.CharField(max_length=1024, null=True, blank=True)  # legacy, see PlaidItem
+    plaidItem = models.ForeignKey(PlaidItem, on_delete=models.SET_NULL, blank=True, null=True, related_name="accounts")
+
+    class Meta:
+        constraints = [
+            # Upsert key for linked accounts; manual accounts have accountId NULL and never collide.
+            models.UniqueConstraint(fields=["user", "accountId"], name="account_user_accountid_uniq"),
+        ]
 
 
 class Category(models.Model):
@@ -123,6 +170,33 @@ class Category(models.Model):
     def __str__(self):
         return self.description or self.name
 
+# Undated transactions sort after every dated one (newest-first lists).
+TRANSACTION_DATE_FLOOR = datetime(1, 1, 1, tzinfo=timezone.utc)
+
+
+class InlineValue(models.Value):
+    """
+    A Value written into the SQL as a literal, the way index DDL writes it.
+    SQLite only uses an expression index when the query repeats the indexed
+    expression, and a bound parameter never matches the DDL's literal.
+    """
+
+    def as_sql(self, compiler, connection):
+        sql, params = super().as_sql(compiler, connection)
+        quote = connection.schema_editor().quote_value
+        return sql % tuple(quote(param) for param in params), ()
+
+
+def transaction_sort_date(inline: bool = True):
+    """
+    transactionDate with NULLs folded to a floor; the keyset pagination / index
+    key. Queries inline the floor; the index definition passes ``inline=False``
+    (its DDL is written with the literal either way).
+    """
+    floor = InlineValue if inline else models.Value
+    return Coalesce("transactionDate", floor(TRANSACTION_DATE_FLOOR))
+
+
 class Transactions(OwnedModel):
     id = models.CharField(
         primary_key=True,
@@ -157,14 +231,48 @@ class Transactions(OwnedModel):
     account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='transactions', db_index=True)
     isCashAccount = models.BooleanField(default=False)
     canDelete = models.BooleanField(default=True)
+    # Content hash of an imported statement line (finance.importers); re-imports skip rows already present.
+    importHash = models.CharField(max_length=64, blank=True, null=True, editable=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["account", "importHash"], name="tx_account_import_hash_uniq"),
+        ]
+        indexes = [
+            # Owner-scoped list endpoints: WHERE user_id = ? [AND account/category = ?] ORDER BY transactionDate
+            # (id breaks ties in the default "-transactionDate, -id" order, so that needs no sort either).
+            models.Index(fields=["user", "transactionDate", "id"], name="tx_user_date_idx"),
+            models.Index(fields=["user", "account", "transactionDate"], name="tx_user_account_date_idx"),
+            models.Index(fields=["user", "category", "transactionDate"], name="tx_user_category_date_idx"),
+            # Serves the newest-first keyset walk: WHERE user_id = ? AND (date, id) < (?, ?) ORDER BY date DESC, id DESC
+            models.Index(
+                models.F("user"), transaction_sort_date(inline=False).desc(), models.F("id").desc(),
+                name="tx_user_date_id_keyset_idx",
+            ),
+        ]
 
 class AccountBalances(OwnedModel):
+    """
+    Per-account, per-month rollup: money in, money out and the closing balance
+    (the account's openingBalance plus the net of its transactions up to the
+    end of the month).
+    balanceMonth is "YYYY-MM". Maintained by services.rollup_balance_deltas and
+    rebuilt from scratch by ``manage.py rebuild_account_balances``.
+    """
     income = models.FloatField(blank=True, null=True, default=0)
     expanses = models.FloatField(blank=True, null=True, default=0)
     balance = models.FloatField(blank=True, null=True, default=0)
     balanceMonth = models.CharField(max_length=32)
     balancedUpdatedDate = models.DateTimeField(blank=True, null=True)
-    account = models.OneToOneField(Account, on_delete=models.SET_NULL, null=True, blank=True)
+    account = models.ForeignKey(
+        Account, on_delete=models.SET_NULL, null=True, blank=True, related_name="monthly_balances",
+    )
+
+    class Meta:
+        constraints = [
+            # Also serves "WHERE account_id = ? AND balanceMonth >= ?" when a month's net shifts later closings.
+            models.UniqueConstraint(fields=["account", "balanceMonth"], name="accountbalances_account_month_uniq"),
+        ]
 
 class Balances(OwnedModel):
     accountId = models.CharField(max_length=64, blank=True, null=True)
@@ -231,6 +339,11 @@ class Devices(OwnedModel):
     isBiometricAuthEnabled = models.BooleanField(default=False)
     deviceId = models.CharField(max_length=120, blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "deviceId"], name="devices_user_device_idx"),
+        ]
+
 class LoginInformation(OwnedModel):
     address = models.CharField(max_length=255, blank=True, null=True)
     latitude = models.CharField(max_length=64, blank=True, null=True)
@@ -263,11 +376,88 @@ class PlaidWebhookEvent(models.Model):
     body = models.JSONField(default=dict, blank=True)   # raw payload
     received_at = models.DateTimeField(default=now)
     processed_at = models.DateTimeField(blank=True, null=True)
-    status = models.CharField(max_length=32, default="received")  # received|processing|done|error
+    status = models.CharField(max_length=32, default="received")  # received|processing|done|error|coalesced
     error = models.TextField(blank=True, null=True)
 
+    # Sync-queue bookkeeping (see finance.sync_queue)
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(default=now)        # not claimable before this (retry backoff)
+    locked_at = models.DateTimeField(blank=True, null=True)
+    locked_by = models.CharField(max_length=128, blank=True, null=True)
+    covered_by = models.ForeignKey(                          # sync job that absorbed this event
+        "self", on_delete=models.SET_NULL, blank=True, null=True, related_name="covered_events",
+    )
+
     class Meta:
         ordering = ["-received_at"]
+        indexes = [
+            models.Index(fields=["status", "available_at"], name="plaidwebhook_queue_idx"),
+        ]
 
     def __str__(self):
         return f"{self.webhook_type}:{self.webhook_code} ({self.item_id})"
+
+
+class PlaidSyncAttempt(models.Model):
+    """
+    One run of sync_plaid_item_transactions for an item.
+    A row in status "running" is also the item's sync lease: the partial unique
+    constraint below allows only one per item, and it must be renewed (each
+    committed page pushes lease_expires_at forward) or another worker may take over.
+    """
+    item_id = models.CharField(max_length=128, db_index=True)
+    status = models.CharField(max_length=32, default="running")  # running|done|error|abandoned
+    worker = models.CharField(max_length=128, blank=True, null=True)
+    resumed_from = models.ForeignKey("self", on_delete=models.SET_NULL, blank=True, null=True, related_name="+")
+    start_cursor = models.CharField(max_length=1024, blank=True, null=True)  # cursor the pagination run began from
+    last_cursor = models.CharField(max_length=1024, blank=True, null=True)   # committed with the last finished page
+    pages_completed = models.PositiveIntegerField(default=0)
+    added = models.PositiveIntegerField(default=0)
+    modified = models.PositiveIntegerField(default=0)
+    removed = models.PositiveIntegerField(default=0)
+    rows_written = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(default=now)
+    lease_expires_at = models.DateTimeField()
+    finished_at = models.DateTimeField(blank=True, null=True)
+    error = models.TextField(blank=True, null=True)
+
+    class Meta:
+        ordering = ["-started_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["item_id"], condition=models.Q(status="running"), name="plaidsync_one_running_per_item",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.item_id} [{self.status}] pages={self.pages_completed}"
+
+
+class BalanceDelta(models.Model):
+    """
+    Append-only log of pending ``Account.currentBalance`` changes and of
+    monthly income/expense flows (``AccountBalances``).
+
+    Transaction writes insert a row here instead of locking and updating the
+    Account row, so concurrent writers to one account never wait on each other.
+    ``services.rollup_balance_deltas`` periodically folds the rows into
+    ``currentBalance`` / ``AccountBalances`` and deletes them; until then readers
+    add the pending sums (``services.with_pending_balance``,
+    ``services.pending_monthly_flows``).
+    """
+    id = models.BigAutoField(primary_key=True)
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name="balance_deltas", db_index=False)
+    amount = models.DecimalField(max_digits=20, decimal_places=6, default=0)  # currentBalance change
+    month = models.CharField(max_length=7, blank=True, null=True)  # "YYYY-MM" the flows below belong to
+    income = models.DecimalField(max_digits=20, decimal_places=6, default=0)
+    expense = models.DecimalField(max_digits=20, decimal_places=6, default=0)
+    created_at = models.DateTimeField(default=now)
+
+    class Meta:
+        indexes = [
+            # Pending sum per account on reads: WHERE account_id = ?
+            models.Index(fields=["account", "id"], name="balancedelta_account_id_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.account_id} {self.amount:+}"
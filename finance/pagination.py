@@ -0,0 +1,169 @@
+"""
+Pagination for the transactions API.
+
+``PageNumberPagination`` runs COUNT(*) over the user's whole history and an
+OFFSET scan that grows with the page number. ``TransactionKeysetPagination``
+instead remembers the last row it returned, (sort date, id), and asks for
+the rows after it, walking ``tx_user_date_id_keyset_idx`` so every page
+costs the same however deep the client scrolls.
+
+``TransactionsPagination`` keeps page numbers as the default (the web UI
+uses ``?page=``) and switches to keyset mode on ``?cursor=...`` or
+``?pagination=keyset``.
+"""
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.db.models import F, Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .models import transaction_sort_date
+
+
+class TransactionKeysetPagination(BasePagination):
+    """
+    Newest-first keyset pagination on (transactionDate, id).
+
+    Query params: ``cursor`` (opaque, from ``next``/``previous``), ``page_size``
+    and ``count=true`` to also return the total (one extra COUNT query).
+    Any ``ordering`` param is ignored: the keyset order is fixed.
+    """
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    count_query_param = "count"
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = 500
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+        self.count = None
+        if request.query_params.get(self.count_query_param, "").lower() in ("1", "true", "yes"):
+            self.count = queryset.order_by().count()
+
+        backwards = bool(position and position["r"])
+        qs = self.keyset_queryset(queryset, position)
+
+        # One extra row tells us whether another page exists without counting.
+        rows = list(qs[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if backwards:
+            rows.reverse()
+
+        self.page = rows
+        if backwards:
+            self.has_next = bool(rows)
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None and bool(rows)
+        return rows
+
+    @staticmethod
+    def keyset_queryset(queryset, position):
+        """``queryset`` in keyset order, from the row after (or before, for a reverse cursor) ``position``."""
+        qs = queryset.annotate(_sort_date=transaction_sort_date())
+        backwards = bool(position and position["r"])
+        if position:
+            date, pk = position["d"], position["i"]
+            # "date <= d" bounds the index range; the OR only skips ties on the same date.
+            if backwards:
+                qs = qs.filter(Q(_sort_date__gt=date) | Q(_sort_date=date, id__gt=pk), _sort_date__gte=date)
+            else:
+                qs = qs.filter(Q(_sort_date__lt=date) | Q(_sort_date=date, id__lt=pk), _sort_date__lte=date)
+        if backwards:
+            return qs.order_by(F("_sort_date").asc(), F("id").asc())
+        return qs.order_by(F("_sort_date").desc(), F("id").desc())
+
+    def get_paginated_response(self, data):
+        body = OrderedDict()
+        if self.count is not None:
+            body["count"] = self.count
+        body["next"] = self.get_next_link()
+        body["previous"] = self.get_previous_link()
+        body["results"] = data
+        return Response(body)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "count": {"type": "integer", "example": 123, "description": "Only with ?count=true"},
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param], strict=True, cutoff=self.max_page_size,
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, row, reverse: bool) -> str:
+        payload = {"d": row._sort_date.isoformat(), "i": row.pk, "r": 1 if reverse else 0}
+        token = base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode()
+        url = remove_query_param(self.base_url, "page")
+        return replace_query_param(url, self.cursor_query_param, token.rstrip("="))
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            payload = json.loads(raw)
+            date = parse_datetime(payload["d"])
+            if date is None:
+                raise ValueError(payload["d"])
+            return {"d": date, "i": str(payload["i"]), "r": bool(payload.get("r"))}
+        except (binascii.Error, ValueError, KeyError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+
+
+class TransactionsPagination(PageNumberPagination):
+    """Page numbers by default; keyset pages for ``?cursor=`` or ``?pagination=keyset``."""
+    keyset_class = TransactionKeysetPagination
+    mode_query_param = "pagination"
+    _keyset = None
+
+    def use_keyset(self, request) -> bool:
+        return (
+            self.keyset_class.cursor_query_param in request.query_params
+            or request.query_params.get(self.mode_query_param) == "keyset"
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_keyset(request):
+            self._keyset = self.keyset_class()
+            return self._keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self._keyset is not None:
+            return self._keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
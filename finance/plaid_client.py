@@ -1,23 +1,92 @@
+import atexit
+import os
+import threading
+
 from django.conf import settings
 from plaid.api import plaid_api
 from plaid.configuration import Configuration
 from plaid import ApiClient
 
-def get_plaid_client():
-    # Map env string to Plaid base URL
-    env_map = {
-        "sandbox": "https://sandbox.plaid.com",
-        "development": "https://development.plaid.com",
-        "production": "https://production.plaid.com",
-    }
-    base_url = env_map.get(settings.PLAID_ENV, "https://sandbox.plaid.com")
+# Map env string to Plaid base URL
+PLAID_HOSTS = {
+    "sandbox": "https://sandbox.plaid.com",
+    "development": "https://development.plaid.com",
+    "production": "https://production.plaid.com",
+}
+
+# One PlaidApi per environment per process. urllib3 pools are not fork-safe,
+# so the pid that built the registry is recorded and a child starts empty.
+_clients = {}
+_clients_pid = os.getpid()
+_clients_lock = threading.Lock()
+
+
+def _with_default_timeout(request, timeout):
+    """Apply ``timeout`` to every call that does not pass its own ``_request_timeout``."""
+    def wrapped(*args, _request_timeout=None, **kwargs):
+        return request(*args, _request_timeout=_request_timeout or timeout, **kwargs)
+    return wrapped
 
+
+def _build_client(env: str) -> plaid_api.PlaidApi:
+    if env == "local":
+        host = settings.PLAID_LOCAL_URL  # finance.fake_plaid stand-in
+    else:
+        host = PLAID_HOSTS.get(env, PLAID_HOSTS["sandbox"])
     config = Configuration(
-        host=base_url,
+        host=host,
         api_key={
             "clientId": settings.PLAID_CLIENT_ID,
             "secret": settings.PLAID_SECRET,
         },
     )
+    # Keep-alive pool: up to this many sockets per host are reused across calls and threads.
+    config.connection_pool_maxsize = getattr(settings, "PLAID_POOL_MAXSIZE", 10)
+    config.retries = getattr(settings, "PLAID_RETRIES", None)
+
     api_client = ApiClient(config)
+    timeout = (
+        getattr(settings, "PLAID_CONNECT_TIMEOUT", 5),
+        getattr(settings, "PLAID_READ_TIMEOUT", 60),
+    )
+    rest = api_client.rest_client
+    rest.request = _with_default_timeout(rest.request, timeout)
     return plaid_api.PlaidApi(api_client)
+
+
+def get_plaid_client(env: str = None) -> plaid_api.PlaidApi:
+    """Shared, pooled PlaidApi for ``env`` (defaults to settings.PLAID_ENV)."""
+    env = env or settings.PLAID_ENV
+    if _clients_pid != os.getpid():
+        _reset_after_fork()
+    client = _clients.get(env)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(env)
+            if client is None:
+                client = _clients[env] = _build_client(env)
+    return client
+
+
+def _reset_after_fork():
+    """Forget (without closing) clients inherited from the parent process."""
+    global _clients, _clients_pid, _clients_lock
+    _clients = {}
+    _clients_pid = os.getpid()
+    _clients_lock = threading.Lock()
+
+
+def close_plaid_clients() -> None:
+    """Close pooled connections and worker threads for every cached client."""
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        api_client = client.api_client
+        api_client.close()
+        api_client.rest_client.pool_manager.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+atexit.register(close_plaid_clients)
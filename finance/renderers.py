@@ -0,0 +1,25 @@
+from rest_framework.renderers import BaseRenderer
+
+
+class PassthroughRenderer(BaseRenderer):
+    """
+    Lets content negotiation pick a format (``?format=csv``, ``Accept: text/csv``)
+    for views that stream their own body instead of returning rendered data.
+    Only error responses (dicts) ever reach ``render``.
+    """
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, (bytes, str)):
+            return data
+        return str(data).encode(self.charset)
+
+
+class CSVStreamRenderer(PassthroughRenderer):
+    media_type = "text/csv"
+    format = "csv"
+
+
+class NDJSONStreamRenderer(PassthroughRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
@@ -1,12 +1,15 @@
+from copy import copy
+from decimal import Decimal
 
 from rest_framework import serializers
 from . import models
 from django.db import transaction as db_tx
+from .mixins import SparseFieldsetSerializerMixin
 from .models import Transactions, Category
-from .services import delta_for, apply_delta_to_account
+from .services import TransactionLedger, discard_pending_deltas, reset_opening_balance, to_decimal
 
 
-class OwnedSerializer(serializers.ModelSerializer):
+class OwnedSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     def create(self, validated):
         request = self.context.get("request")
         if request and request.user.is_authenticated:
@@ -25,7 +28,7 @@ class PaidMonthsSerializer(OwnedSerializer):
 class RecursiveTransactionsSerializer(OwnedSerializer):
     class Meta: model = models.RecursiveTransactions; fields = '__all__'
 
-class TransactionsSerializer(serializers.ModelSerializer):
+class TransactionsSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     category = serializers.PrimaryKeyRelatedField(
         queryset=Category.objects.all(), required=False, allow_null=True
     )
@@ -61,39 +64,70 @@ class TransactionsSerializer(serializers.ModelSerializer):
 
         with db_tx.atomic():
             obj = super().create(validated_data)
-            # +amount for income, -amount for expense
-            d = delta_for(obj.amount, obj.isIncome)
-            apply_delta_to_account(obj.account_id, d)
+            # +amount for income, -amount for expense; also this month's income/expense
+            ledger = TransactionLedger()
+            ledger.add(obj)
+            ledger.save()
             return obj
 
     def update(self, instance, validated_data):
-        old_account_id = instance.account_id
-        old_delta = delta_for(instance.amount, instance.isIncome)
-
-        # new values (default to old if not provided)
-        new_amount = validated_data.get("amount", instance.amount)
-        new_is_income = validated_data.get("isIncome", instance.isIncome)
-        new_account = validated_data.get("account", instance.account)
-        new_account_id = getattr(new_account, "id", None) or instance.account_id
-        new_delta = delta_for(new_amount, new_is_income)
+        old = copy(instance)  # account, amount, isIncome and date before the write
 
         with db_tx.atomic():
             obj = super().update(instance, validated_data)
 
-            # Reverse old effect, then apply new effect.
-            if old_account_id == new_account_id:
-                net = new_delta - old_delta
-                if net:
-                    apply_delta_to_account(new_account_id, net)
-            else:
-                # moved to a different account:
-                if old_delta:
-                    apply_delta_to_account(old_account_id, -old_delta)
-                if new_delta:
-                    apply_delta_to_account(new_account_id, new_delta)
+            # Reverse old effect, then apply new effect (nets out when nothing relevant changed).
+            ledger = TransactionLedger()
+            ledger.remove(old)
+            ledger.add(obj)
+            ledger.save()
 
             return obj
 
+class TransactionsListSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    """
+    Read-only shape of TransactionsSerializer for list responses. No writable
+    relation fields (no Category queryset per field), and it reads only the
+    columns TransactionsViewSet.list_only_fields loads.
+    """
+    category_display = serializers.CharField(source="category.name", read_only=True, default=None)
+
+    class Meta:
+        model = Transactions
+        fields = (
+            "id", "amount", "name", "merchantName", "currencyCode", "checkNumber",
+            "note", "createdDate", "transactionDate", "location", "latitude",
+            "longitude", "path", "isIncome", "repeat", "account", "isCashAccount",
+            "canDelete", "category", "category_display",
+        )
+        read_only_fields = fields
+
+
+class BatchPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Resolves pks from ``context["related"][field_name]`` (a pk -> instance dict
+    loaded once per batch) instead of one query per row. Pks missing from the
+    dict are reported as not found, which also keeps rows off other users' accounts.
+    """
+    def to_internal_value(self, data):
+        related = self.context.get("related", {}).get(self.field_name)
+        if related is None:
+            return super().to_internal_value(data)
+        try:
+            obj = related.get(self.pk_field.to_internal_value(data) if self.pk_field else int(data))
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        if obj is None:
+            self.fail("does_not_exist", pk_value=data)
+        return obj
+
+
+class TransactionsBulkSerializer(TransactionsSerializer):
+    """Row serializer for /transactions/bulk/: validation only, writes happen in the view."""
+    account = BatchPrimaryKeyRelatedField(queryset=models.Account.objects.all())
+    category = BatchPrimaryKeyRelatedField(queryset=Category.objects.all(), required=False, allow_null=True)
+
+
 class GoalSerializer(OwnedSerializer):
     class Meta: model = models.Goal; fields = '__all__'
 class AchievedSerializer(OwnedSerializer):
@@ -104,10 +138,70 @@ class AccountSerializer(OwnedSerializer):
     class Meta:
         model = models.Account
         fields = '__all__'
-        read_only_fields = ("user",)
+        read_only_fields = ("user", "openingBalance")
+        # The generated (user, accountId) validator would make accountId required, but manual
+        # accounts have none; validate() checks uniqueness only when one is given.
+        validators = []
+
+    def validate(self, attrs):
+        account_id = attrs.get("accountId")
+        if "accountId" in attrs and not (account_id or "").strip():
+            # A blank id is a manual account: store NULL, which the constraint lets repeat.
+            attrs["accountId"] = account_id = None
+        request = self.context.get("request")
+        if account_id and request is not None:
+            clash = models.Account.objects.filter(user=request.user, accountId=account_id)
+            if self.instance is not None:
+                clash = clash.exclude(pk=self.instance.pk)
+            if clash.exists():
+                raise serializers.ValidationError({"accountId": ["You already have an account with this accountId."]})
+        return super().validate(attrs)
+
+    def create(self, validated):
+        # No transactions yet: whatever balance the account starts with is its opening balance.
+        validated["openingBalance"] = validated.get("currentBalance") or 0
+        return super().create(validated)
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # AccountViewSet annotates deltas not yet folded in by rollup_balance_deltas.
+        pending = getattr(instance, "pendingBalance", None)
+        if pending and "currentBalance" in data:
+            data["currentBalance"] = float(to_decimal(data["currentBalance"]) + pending)
+        return data
+
+    def update(self, instance, validated_data):
+        with db_tx.atomic():
+            obj = super().update(instance, validated_data)
+            if "currentBalance" in validated_data:
+                # The client sent an absolute balance; it supersedes what was pending.
+                discard_pending_deltas([obj.id])
+                reset_opening_balance([obj.id])
+                obj.refresh_from_db(fields=["openingBalance"])
+                obj.pendingBalance = Decimal("0")
+            return obj
 
 class AccountBalancesSerializer(OwnedSerializer):
     class Meta: model = models.AccountBalances; fields = '__all__'
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # AccountBalancesViewSet passes ledger flows not yet folded in by rollup_balance_deltas.
+        pending = self.context.get("pending_flows", {}).get(instance.account_id)
+        if pending:
+            net = Decimal("0")
+            for month, income, expense in pending:
+                if month > instance.balanceMonth:
+                    break
+                net += income - expense
+                if month == instance.balanceMonth:
+                    if "income" in data:
+                        data["income"] = float(to_decimal(data["income"]) + income)
+                    if "expanses" in data:
+                        data["expanses"] = float(to_decimal(data["expanses"]) + expense)
+            if net and "balance" in data:
+                data["balance"] = float(to_decimal(data["balance"]) + net)
+        return data
 class BalancesSerializer(OwnedSerializer):
     class Meta: model = models.Balances; fields = '__all__'
 class AssetSerializer(OwnedSerializer):
@@ -121,7 +215,7 @@ class LoginInformationSerializer(OwnedSerializer):
 class FeedBackSerializer(OwnedSerializer):
     class Meta: model = models.FeedBack; fields = '__all__'
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ("id", "name","description", "slug")
@@ -1,17 +1,27 @@
+import json
+import queue
+import threading
+import uuid
+from datetime import datetime, timedelta
 from decimal import Decimal
-from django.db.models import F, Value
-from django.db.models.functions import Coalesce
-from django.db import transaction
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache
+from django.db.models import Case, F, FloatField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Abs, Coalesce
+from django.db import IntegrityError, transaction
 
 from . import plaid_client
-from .models import Account, Category
-from typing import Dict, Optional
+from .category_index import category_index
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from django.db import transaction as db_transaction
 from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from django.core.exceptions import ObjectDoesNotExist
 
-from .models import Account, Transactions
+from .models import (
+    TRANSACTION_DATE_FLOOR, Account, AccountBalances, BalanceDelta, PlaidItem, PlaidSyncAttempt, Transactions,
+)
 from .plaid_client import get_plaid_client
 from plaid.model.transactions_sync_request import TransactionsSyncRequest
 from plaid.api_client import ApiException
@@ -29,41 +39,385 @@ def delta_for(amount, is_income: bool) -> Decimal:
     amt = to_decimal(amount)
     return amt if is_income else (amt * Decimal("-1"))
 
-@transaction.atomic
 def apply_delta_to_account(account_id, delta: Decimal):
-    # Coalesce to 0 to avoid None math
-    Account.objects.select_for_update().filter(id=account_id).update(
-        currentBalance=Coalesce(F("currentBalance"), Value(0)) + delta
+    """
+    Record a balance change for an account. Appends to the BalanceDelta ledger
+    instead of updating the Account row, so it takes no lock and concurrent
+    writers to the same account do not serialize; rollup_balance_deltas()
+    folds it into currentBalance later. Transaction writes should go through
+    TransactionLedger, which also records the monthly flows.
+    """
+    if account_id is None or not delta:
+        return
+    BalanceDelta.objects.create(account_id=account_id, amount=delta)
+    invalidate_balance_history([account_id])
+
+
+def apply_deltas_to_accounts(deltas: Dict[int, Decimal]) -> int:
+    """
+    Record many balance deltas: one ledger row per account (not per
+    transaction), inserted with a single bulk_create. Returns the number of
+    accounts touched.
+    """
+    rows = [
+        BalanceDelta(account_id=account_id, amount=delta)
+        for account_id, delta in sorted((a, d) for a, d in deltas.items() if a is not None and d)
+    ]
+    BalanceDelta.objects.bulk_create(rows)
+    invalidate_balance_history(row.account_id for row in rows)
+    return len(rows)
+
+
+def month_key(when) -> str:
+    """The transaction's month as YYYY-MM in the current time zone (undated rows use the sort floor)."""
+    if isinstance(when, str):  # Plaid payloads before the model has parsed them
+        when = parse_datetime(when) or parse_date(when)
+    when = when or TRANSACTION_DATE_FLOOR
+    if isinstance(when, datetime) and timezone.is_aware(when):
+        when = timezone.localtime(when)
+    return f"{when.year:04d}-{when.month:02d}"
+
+
+def flows_for(amount, is_income: bool) -> Tuple[Decimal, Decimal]:
+    """(income, expense) of one transaction. Plaid rows carry signed amounts, hence abs()."""
+    amt = abs(to_decimal(amount))
+    return (amt, Decimal("0")) if is_income else (Decimal("0"), amt)
+
+
+BALANCE_HISTORY_VERSION_KEY = "balance-history-version:{}"
+SPENDING_ANALYTICS_VERSION_KEY = "spending-analytics-version:{}"
+# Backends that live inside one process: a token dropped there is still current in every other worker.
+PER_PROCESS_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def shared_cache() -> bool:
+    """
+    Whether the default cache is shared by all workers. Version-token
+    invalidation is only sound then, so callers skip caching otherwise.
+    """
+    return settings.CACHES.get(DEFAULT_CACHE_ALIAS, {}).get("BACKEND") not in PER_PROCESS_CACHES
+
+
+def cache_version(key: str) -> str:
+    """
+    The current version token stored under ``key``, created on first use.
+    Cached results embed it in their own keys, so deleting the token makes
+    all of them unreachable at once (and an evicted token does the same).
+    """
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(key, version, None):
+            version = cache.get(key) or version
+    return version
+
+
+def invalidate_cache_versions(keys: Iterable[str]) -> None:
+    """
+    Drop version tokens once the current DB transaction commits: a reader that
+    still sees the old rows until then cannot cache them under a new token.
+    """
+    keys = list(keys)
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def invalidate_balance_history(account_ids: Iterable[int]) -> None:
+    """Forget the cached balance-history series of these accounts (their balance or transactions changed)."""
+    invalidate_cache_versions(
+        BALANCE_HISTORY_VERSION_KEY.format(account_id) for account_id in set(account_ids) if account_id is not None
+    )
+
+
+def invalidate_spending_analytics(user_ids: Iterable[int]) -> None:
+    """Forget the cached /analytics/spending/ results of these users (their transactions changed)."""
+    invalidate_cache_versions(
+        SPENDING_ANALYTICS_VERSION_KEY.format(user_id) for user_id in set(user_ids) if user_id is not None
+    )
+
+
+class TransactionLedger:
+    """
+    Collect the effects of a set of transaction writes and record them as
+    BalanceDelta rows, one per (account, month):
+
+        ledger = TransactionLedger()
+        ledger.remove(old_row)   # before an update/delete
+        ledger.add(new_row)      # after a create/update
+        ledger.save()            # inside the same DB transaction
+
+    ``affects_balance=False`` records only the monthly flows (Plaid-synced
+    rows, whose account balance comes from Plaid itself). Saving also
+    invalidates the cached balance histories and spending analytics of the
+    accounts and users involved.
+    """
+
+    def __init__(self, affects_balance: bool = True):
+        self.affects_balance = affects_balance
+        self._sums: Dict[Tuple[int, str], List[Decimal]] = {}
+        self._users: set = set()
+
+    def add(self, tx, sign: int = 1) -> None:
+        """``tx``: a Transactions row, or anything with user_id, account_id, amount, isIncome and transactionDate."""
+        self._users.add(tx.user_id)
+        if tx.account_id is None:
+            return
+        income, expense = flows_for(tx.amount, tx.isIncome)
+        balance = delta_for(tx.amount, tx.isIncome) if self.affects_balance else Decimal("0")
+        sums = self._sums.setdefault((tx.account_id, month_key(tx.transactionDate)), [Decimal("0")] * 3)
+        sums[0] += sign * balance
+        sums[1] += sign * income
+        sums[2] += sign * expense
+
+    def remove(self, tx) -> None:
+        self.add(tx, -1)
+
+    def balance_deltas(self) -> Dict[int, Decimal]:
+        out: Dict[int, Decimal] = {}
+        for (account_id, _), (balance, _, _) in self._sums.items():
+            out[account_id] = out.get(account_id, Decimal("0")) + balance
+        return out
+
+    def save(self) -> int:
+        rows = [
+            BalanceDelta(account_id=account_id, month=month, amount=balance, income=income, expense=expense)
+            for (account_id, month), (balance, income, expense) in sorted(self._sums.items())
+            if balance or income or expense
+        ]
+        BalanceDelta.objects.bulk_create(rows)
+        invalidate_balance_history(account_id for account_id, _ in self._sums)
+        invalidate_spending_analytics(self._users)
+        return len(rows)
+
+
+def with_pending_balance(queryset):
+    """Annotate an Account queryset with ``pendingBalance``: the sum of its not yet rolled-up deltas."""
+    pending = (
+        BalanceDelta.objects.filter(account=OuterRef("pk"))
+        .order_by().values("account").annotate(total=Sum("amount")).values("total")
+    )
+    return queryset.annotate(pendingBalance=Coalesce(Subquery(pending), Value(Decimal("0"))))
+
+
+def signed_amount():
+    """A transaction's effect on its account balance (delta_for() in SQL): +amount for income, -amount otherwise."""
+    return Case(When(isIncome=True, then=F("amount")), default=-F("amount"), output_field=FloatField())
+
+
+def signed_flow():
+    """
+    A transaction's direction in SQL, as flows_for() records it: +abs(amount)
+    for income, -abs(amount) otherwise. Unlike signed_amount() it is right
+    for Plaid rows too, which keep Plaid's sign (negative for money in).
+    """
+    return Case(When(isIncome=True, then=Abs("amount")), default=-Abs("amount"), output_field=FloatField())
+
+
+def transactions_net(account_ref=OuterRef("pk")):
+    """Subquery: the net of an account's transactions."""
+    return Subquery(
+        Transactions.objects.filter(account=account_ref).order_by().values("account")
+        .annotate(total=Sum(signed_amount())).values("total")
+    )
+
+
+def reset_opening_balance(account_ids: Iterable[int]) -> None:
+    """
+    Make the accounts' current balances the reference point: after a client
+    (or Plaid) sets currentBalance directly, openingBalance is re-derived from
+    it so reconcile_balances keeps agreeing, and the monthly closing balances
+    move by the same amount. Call inside the same transaction as the write.
+    """
+    accounts = Account.objects.filter(id__in=list(account_ids))
+    before = dict(accounts.select_for_update(no_key=True).order_by("id").values_list("id", "openingBalance"))
+    accounts.update(
+        openingBalance=Coalesce(F("currentBalance"), Value(0.0)) - Coalesce(transactions_net(), Value(0.0))
+    )
+    for account_id, opening in accounts.values_list("id", "openingBalance"):
+        shift = (opening or 0.0) - (before.get(account_id) or 0.0)
+        if shift:
+            AccountBalances.objects.filter(account_id=account_id).update(
+                balance=Coalesce(F("balance"), Value(0.0)) + shift
+            )
+
+
+def account_balance(account_id) -> Decimal:
+    """currentBalance plus pending deltas, read in one statement."""
+    row = with_pending_balance(Account.objects.filter(id=account_id)).values_list(
+        "currentBalance", "pendingBalance"
+    ).first()
+    if row is None:
+        return Decimal("0")
+    return to_decimal(row[0]) + to_decimal(row[1])
+
+
+def pending_monthly_flows(account_ids) -> Dict[int, List[Tuple[str, Decimal, Decimal]]]:
+    """
+    Not yet rolled-up (month, income, expense) per account, months ascending.
+    ``account_ids`` may be a list or a values() subquery. The ledger only holds
+    what arrived since the last rollup, so this stays small.
+    """
+    out: Dict[int, List[Tuple[str, Decimal, Decimal]]] = {}
+    rows = (
+        BalanceDelta.objects.filter(account_id__in=account_ids, month__isnull=False)
+        .values("account_id", "month").annotate(income=Sum("income"), expense=Sum("expense"))
+        .order_by("account_id", "month")
+    )
+    for row in rows:
+        out.setdefault(row["account_id"], []).append((row["month"], row["income"], row["expense"]))
+    return out
+
+
+def discard_pending_deltas(account_ids: Iterable[int]) -> int:
+    """
+    Drop the pending currentBalance deltas of accounts whose balance was just
+    overwritten with an absolute value (Plaid balances, an edited account): the
+    new value already accounts for them. Monthly flows are kept. Call inside
+    the same transaction as the write.
+    """
+    account_ids = list(account_ids)
+    invalidate_balance_history(account_ids)
+    pending = BalanceDelta.objects.filter(account_id__in=account_ids)
+    deleted, _ = pending.filter(month__isnull=True).delete()
+    return deleted + pending.exclude(amount=0).update(amount=0)
+
+
+ROLLUP_BATCH_SIZE = 2000
+# income/expanses are floats; a month whose transactions all went away may keep a rounding residue.
+MONTH_EMPTY_EPSILON = 1e-6
+
+
+def rollup_balance_deltas(batch_size: int = ROLLUP_BATCH_SIZE, account_ids: Optional[Iterable[int]] = None) -> dict:
+    """
+    Fold pending BalanceDelta rows into Account.currentBalance and the
+    monthly AccountBalances rows, oldest first.
+
+    Each batch is one transaction: read up to ``batch_size`` ledger rows, lock
+    the accounts they touch (in id order, so two rollups cannot deadlock or
+    interleave on one account), apply one UPDATE per account and per
+    (account, month), and delete exactly the rows that were read. Ledger rows
+    locked by a concurrent rollup are skipped on Postgres. Readers adding the
+    pending sums see the same totals before and after.
+    """
+    if account_ids is not None:
+        account_ids = list(account_ids)
+    folded = accounts = months = batches = 0
+    while True:
+        with transaction.atomic():
+            qs = BalanceDelta.objects.order_by("id")
+            if account_ids is not None:
+                qs = qs.filter(account_id__in=account_ids)
+            rows = list(
+                qs.select_for_update(skip_locked=True)
+                .values_list("id", "account_id", "amount", "month", "income", "expense")[:batch_size]
+            )
+            if not rows:
+                break
+            sums: Dict[int, Decimal] = {}
+            flows: Dict[Tuple[int, str], List[Decimal]] = {}
+            for _, account_id, amount, month, income, expense in rows:
+                sums[account_id] = sums.get(account_id, Decimal("0")) + amount
+                if month and (income or expense):
+                    pair = flows.setdefault((account_id, month), [Decimal("0"), Decimal("0")])
+                    pair[0] += income
+                    pair[1] += expense
+            # NO KEY UPDATE: writers' foreign-key checks (KEY SHARE) on these accounts are not blocked.
+            owners = {
+                account_id: (user_id, opening)
+                for account_id, user_id, opening in Account.objects.select_for_update(no_key=True)
+                .filter(id__in=sorted(sums)).order_by("id").values_list("id", "user_id", "openingBalance")
+            }
+            for account_id in sorted(sums):
+                if sums[account_id]:
+                    Account.objects.filter(id=account_id).update(
+                        currentBalance=Coalesce(F("currentBalance"), Value(0)) + sums[account_id]
+                    )
+            _fold_monthly_flows(flows, owners)
+            BalanceDelta.objects.filter(id__in=[row[0] for row in rows]).delete()
+        folded += len(rows)
+        accounts += len(sums)
+        months += len(flows)
+        batches += 1
+        if len(rows) < batch_size:
+            break
+    return {"deltas": folded, "accounts": accounts, "months": months, "batches": batches}
+
+
+def month_opening_balance(account_id, month: str, opening_balance: Optional[float]) -> float:
+    """Closing balance of the account's last stored month before ``month``, else its opening balance."""
+    previous = (
+        AccountBalances.objects.filter(account_id=account_id, balanceMonth__lt=month).order_by("-balanceMonth")
+        .values_list("balance", flat=True).first()
     )
+    return previous if previous is not None else (opening_balance or 0.0)
+
+
+def _fold_monthly_flows(
+    flows: Dict[Tuple[int, str], List[Decimal]], owners: Dict[int, Tuple[int, Optional[float]]]
+) -> None:
+    """
+    Add (income, expense) to each (account, month) row, creating it from the
+    previous month's closing balance (the opening balance before the first
+    month) when missing, then shift the closing balance of that month and
+    every later one by the month's net. ``owners`` maps account id to
+    (user id, openingBalance).
+    """
+    ts = timezone.now()
+    for account_id, month in sorted(flows):
+        if account_id not in owners:  # account deleted meanwhile
+            continue
+        user_id, opening_balance = owners[account_id]
+        income, expense = flows[(account_id, month)]
+        if not income and not expense:  # writes in this batch cancelled out
+            continue
+        monthly = AccountBalances.objects.filter(account_id=account_id)
+        if not monthly.filter(balanceMonth=month).exists():
+            AccountBalances.objects.create(
+                user_id=user_id, ownerId=str(user_id), account_id=account_id, balanceMonth=month,
+                income=0, expanses=0, balance=month_opening_balance(account_id, month, opening_balance),
+            )
+        monthly.filter(balanceMonth=month).update(
+            income=Coalesce(F("income"), Value(0.0)) + float(income),
+            expanses=Coalesce(F("expanses"), Value(0.0)) + float(expense),
+            balancedUpdatedDate=ts,
+        )
+        net = float(income - expense)
+        if net:
+            monthly.filter(balanceMonth__gte=month).update(balance=Coalesce(F("balance"), Value(0.0)) + net)
+        if income < 0 or expense < 0:
+            # Its transactions were moved or deleted: drop the month if nothing is left, as a rebuild would.
+            monthly.filter(
+                balanceMonth=month, income__range=(-MONTH_EMPTY_EPSILON, MONTH_EMPTY_EPSILON),
+                expanses__range=(-MONTH_EMPTY_EPSILON, MONTH_EMPTY_EPSILON),
+            ).delete()
 
 
 def _get_cursor(item_id: str) -> Optional[str]:
-    """Retrieve stored Plaid cursor from Account."""
+    """Retrieve stored Plaid cursor from PlaidItem."""
     return (
-        Account.objects
-        .filter(plaid_item_id=item_id)
-        .values_list("plaid_transactions_cursor", flat=True)
+        PlaidItem.objects
+        .filter(item_id=item_id)
+        .values_list("transactions_cursor", flat=True)
         .first()
     )
 
 
 def _set_cursor(item_id: str, cursor: Optional[str]) -> None:
-    """Save the next Plaid cursor for this item."""
-    Account.objects.filter(plaid_item_id=item_id).update(plaid_transactions_cursor=cursor)
+    """Save the next Plaid cursor for this item (one indexed row)."""
+    PlaidItem.objects.filter(item_id=item_id).update(transactions_cursor=cursor)
 
 
-def _build_account_map_for_item(item_id: str) -> Dict[str, Account]:
+def _build_account_map_for_item(item: PlaidItem) -> Dict[str, Account]:
     """Map Plaid 'account_id' → local Account using Accounts.accountId."""
-    accs = Account.objects.filter(plaid_item_id=item_id).only("id", "accountId", "plaid_item_id")
+    accs = Account.objects.filter(plaidItem=item).only("id", "accountId", "user_id").order_by("id")
     return {a.accountId: a for a in accs}
 
 def _resolve_category_id_from_pfc_detailed(detailed: Optional[str]) -> Optional[int]:
-    if not detailed:
-        return  Category.objects.filter(description__iexact="UNKNOWN").only("id").first()
-    obj = Category.objects.filter(description__iexact=detailed).only("id").first()
-    if obj:
-        return obj.id
-    return Category.objects.filter(description__iexact="UNKNOWN").only("id").first()
+    """PFC ``detailed`` -> Category id via the in-memory index; UNKNOWN's id when unmatched."""
+    return category_index.resolve(detailed)
 
 def _map_defaults_from_plaid(tx: dict, account_obj: Account, user_id: int) -> dict:
     """
@@ -112,67 +466,326 @@ def _map_defaults_from_plaid(tx: dict, account_obj: Account, user_id: int) -> di
     }
 
 
-def sync_plaid_item_transactions(item_id: str) -> dict:
+# Columns rewritten when Plaid re-sends a transaction we already hold.
+# ``created_at`` is deliberately left out so the first-seen timestamp survives.
+_PLAID_UPSERT_FIELDS = [
+    "account", "user", "amount", "name", "merchantName", "currencyCode",
+    "checkNumber", "note", "createdDate", "transactionDate", "location",
+    "latitude", "longitude", "isIncome", "isCashAccount", "canDelete",
+    "repeat", "path", "category",
+]
+
+
+def _bulk_upsert_plaid_transactions(txs, acct_map: Dict[str, Account], fallback_acc: Account) -> int:
     """
-    Full Plaid → finance_transactions sync loop.
-    Stores cursor in Account.plaid_transactions_cursor.
+    Write one transactions_sync page with a single INSERT ... ON CONFLICT (id) DO UPDATE.
+    Rows are keyed by the Plaid transaction_id; if Plaid repeats an id inside the
+    page the last version wins (Postgres refuses to touch a row twice per statement).
     """
-    any_acc = (
-        Account.objects
-        .filter(plaid_item_id=item_id)
-        .select_related("user")
-        .first()
+    rows: Dict[str, Transactions] = {}
+    for tx in txs:
+        plaid_txn_id = tx["transaction_id"]
+        tx_acc = acct_map.get(tx.get("account_id"), fallback_acc)
+        defaults = _map_defaults_from_plaid(tx, tx_acc, fallback_acc.user_id)
+        rows[plaid_txn_id] = Transactions(id=plaid_txn_id, **defaults)
+
+    if not rows:
+        return 0
+
+    # Monthly flows move by (new - old) for modified rows; the balance itself comes from Plaid.
+    ledger = TransactionLedger(affects_balance=False)
+    for old in Transactions.objects.filter(id__in=list(rows)).only(
+        "id", "user_id", "account_id", "amount", "isIncome", "transactionDate"
+    ):
+        ledger.remove(old)
+    for obj in rows.values():
+        ledger.add(obj)
+
+    Transactions.objects.bulk_create(
+        list(rows.values()),
+        update_conflicts=True,
+        unique_fields=["id"],
+        update_fields=_PLAID_UPSERT_FIELDS,
     )
-    if not any_acc or not any_acc.plaid_access_token:
-        raise ObjectDoesNotExist(f"No account with item_id={item_id} having a Plaid access token.")
+    ledger.save()
+    return len(rows)
 
-    access_token = any_acc.plaid_access_token
-    cursor = _get_cursor(item_id)
-    acct_map = _build_account_map_for_item(item_id)
 
-    added_total = modified_total = removed_total = 0
-    has_more = True
+def _bulk_delete_removed(removed, acct_map: Dict[str, Account]) -> int:
+    """
+    Delete every transaction in a page's ``removed`` list (only from this item's
+    accounts) and take its monthly flows back out; the balance comes from Plaid.
+    """
+    # Entries are RemovedTransaction models (or dicts); bare strings are accepted too.
+    ids = [tx if isinstance(tx, str) else tx["transaction_id"] for tx in removed]
+    ids = [i for i in ids if i]
+    if not ids:
+        return 0
+    rows = list(
+        Transactions.objects.filter(id__in=ids, account_id__in=[acc.id for acc in acct_map.values()])
+        .select_for_update()
+        .only("id", "user_id", "account_id", "amount", "isIncome", "transactionDate")
+    )
+    if not rows:
+        return 0
+    ledger = TransactionLedger(affects_balance=False)
+    for old in rows:
+        ledger.remove(old)
+    Transactions.objects.filter(pk__in=[old.pk for old in rows]).delete()
+    ledger.save()
+    return len(rows)
+
+
+class SyncLeaseUnavailable(Exception):
+    """Another worker holds the sync lease for this item."""
+
+
+SYNC_LEASE_SECONDS = getattr(settings, "PLAID_SYNC_LEASE_SECONDS", 900)
+MUTATION_DURING_PAGINATION = "TRANSACTIONS_SYNC_MUTATION_DURING_PAGINATION"
+_MAX_PAGINATION_RESTARTS = 3
+# Pages fetched ahead of the DB writer; 0 = fetch and write strictly in turn.
+SYNC_PREFETCH_PAGES = getattr(settings, "PLAID_SYNC_PREFETCH_PAGES", 2)
+
+
+def _acquire_sync_lease(item_id: str, worker: Optional[str], start_cursor: Optional[str],
+                        resumed_from: Optional[PlaidSyncAttempt]) -> PlaidSyncAttempt:
+    """Open a "running" attempt for the item; fails if a live one already exists."""
+    ts = timezone.now()
+    # Leases nobody renewed in time belong to dead workers.
+    PlaidSyncAttempt.objects.filter(item_id=item_id, status="running", lease_expires_at__lt=ts).update(
+        status="abandoned", finished_at=ts,
+    )
+    try:
+        with db_transaction.atomic():
+            return PlaidSyncAttempt.objects.create(
+                item_id=item_id,
+                worker=worker,
+                resumed_from=resumed_from,
+                start_cursor=start_cursor,
+                last_cursor=start_cursor,
+                lease_expires_at=ts + timedelta(seconds=SYNC_LEASE_SECONDS),
+            )
+    except IntegrityError:
+        raise SyncLeaseUnavailable(f"A sync for item_id={item_id} is already running.")
+
+
+def _checkpoint_page(attempt: PlaidSyncAttempt, item_id: str, cursor: Optional[str],
+                     added: int, modified: int, removed: int, rows: int) -> None:
+    """Commit the page's cursor and counters; must run inside the page's DB transaction."""
+    _set_cursor(item_id, cursor)
+    renewed = PlaidSyncAttempt.objects.filter(id=attempt.id, status="running").update(
+        last_cursor=cursor,
+        pages_completed=F("pages_completed") + 1,
+        added=F("added") + added,
+        modified=F("modified") + modified,
+        removed=F("removed") + removed,
+        rows_written=F("rows_written") + rows,
+        lease_expires_at=timezone.now() + timedelta(seconds=SYNC_LEASE_SECONDS),
+    )
+    if not renewed:
+        # Our lease expired and someone else took the item over: roll this page back.
+        raise SyncLeaseUnavailable(f"Lost the sync lease for item_id={item_id}.")
+
 
+def _finish_attempt(attempt: PlaidSyncAttempt, status: str, error: Optional[str] = None) -> None:
+    PlaidSyncAttempt.objects.filter(id=attempt.id, status="running").update(
+        status=status, error=error, finished_at=timezone.now(),
+    )
+
+
+def _plaid_error_code(exc: ApiException) -> Optional[str]:
     try:
-        while has_more:
-            req_kwargs = {"access_token": access_token , "count": 500}
-            if cursor:
-                req_kwargs["cursor"] = cursor
-            req = TransactionsSyncRequest(**req_kwargs)
+        return json.loads(exc.body or "{}").get("error_code")
+    except (TypeError, ValueError):
+        return None
+
+
+def _reset_attempt_counters(attempt: PlaidSyncAttempt) -> None:
+    """The run restarted from its first cursor: the pages it re-fetches must not be counted twice."""
+    PlaidSyncAttempt.objects.filter(id=attempt.id, status="running").update(
+        added=0, modified=0, removed=0, rows_written=0,
+    )
+
+
+# Yielded by _iter_sync_pages before the pages of a restarted pagination run.
+PAGINATION_RESTARTED = object()
+
+
+def _iter_sync_pages(access_token: str, cursor: Optional[str], start_cursor: Optional[str],
+                     throttle: Optional[Callable[[], None]] = None) -> Iterator:
+    """
+    Yield /transactions/sync responses page by page until has_more is false.
+    Each request only needs the previous response's next_cursor, never the DB.
+    After a MUTATION_DURING_PAGINATION restart, PAGINATION_RESTARTED is yielded
+    first so the consumer can drop the totals of the abandoned pass.
+    """
+    restarts = 0
+    while True:
+        req_kwargs = {"access_token": access_token, "count": 500}
+        if cursor:
+            req_kwargs["cursor"] = cursor
+        req = TransactionsSyncRequest(**req_kwargs)
+        if throttle is not None:
+            throttle()
+        try:
             resp = get_plaid_client().transactions_sync(req)
+        except ApiException as e:
+            # Plaid requires restarting the whole pagination run from its first cursor.
+            # Pages already written are upserted again, which is idempotent.
+            if _plaid_error_code(e) == MUTATION_DURING_PAGINATION and restarts < _MAX_PAGINATION_RESTARTS:
+                restarts += 1
+                cursor = start_cursor
+                yield PAGINATION_RESTARTED
+                continue
+            raise
+        yield resp
+        if not resp["has_more"]:
+            return
+        cursor = resp["next_cursor"]
+
+
+_PREFETCH_DONE = object()
+
+
+def _prefetch(pages: Iterable, depth: int) -> Iterator:
+    """
+    Run ``pages`` in a fetcher thread, keeping at most ``depth`` results queued
+    ahead of the consumer (backpressure). Items come out in production order; an
+    exception in the fetcher is re-raised in the consumer. If the consumer stops
+    early (error or close), the fetcher is told to stop and is not waited on
+    beyond its in-flight request.
+    """
+    buf = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def _put(item) -> bool:
+        while not stop.is_set():
+            try:
+                buf.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _fetch():
+        try:
+            for page in pages:
+                if not _put((page, None)):
+                    return
+        except BaseException as e:  # handed to the consumer, which re-raises it
+            _put((_PREFETCH_DONE, e))
+            return
+        _put((_PREFETCH_DONE, None))
+
+    fetcher = threading.Thread(target=_fetch, name="plaid-sync-prefetch", daemon=True)
+    fetcher.start()
+    try:
+        while True:
+            page, error = buf.get()
+            if page is _PREFETCH_DONE:
+                if error is not None:
+                    raise error
+                return
+            yield page
+    finally:
+        stop.set()
+        fetcher.join(timeout=1.0)
+
+
+def sync_plaid_item_transactions(item_id: str, resume: bool = True, worker: Optional[str] = None,
+                                 throttle: Optional[Callable[[], None]] = None,
+                                 prefetch: Optional[int] = None) -> dict:
+    """
+    Full Plaid → finance_transactions sync loop.
+
+    Every page is written together with its next cursor (PlaidItem.transactions_cursor)
+    and a PlaidSyncAttempt checkpoint in one DB transaction, so a failure on page N
+    loses at most that page. The attempt row is also a per-item lease: a second
+    caller gets SyncLeaseUnavailable instead of syncing the same item concurrently.
 
+    resume=True continues an interrupted run from its last committed page;
+    resume=False restarts that pagination run from the cursor it began with.
+    ``throttle`` (optional) is called before every Plaid request, e.g. a rate limiter.
+
+    ``prefetch`` pages (default PLAID_SYNC_PREFETCH_PAGES) are fetched by a background
+    thread while this thread writes the current one, so Plaid and DB latency overlap.
+    Pages and their cursors are still committed strictly in order, by this thread only.
+    ``prefetch=0`` fetches and writes in turn.
+    """
+    item = PlaidItem.objects.filter(item_id=item_id).first()
+    if not item or not item.access_token:
+        raise ObjectDoesNotExist(f"No PlaidItem with item_id={item_id} having a Plaid access token.")
+    acct_map = _build_account_map_for_item(item)
+    if not acct_map:
+        raise ObjectDoesNotExist(f"No accounts linked to item_id={item_id}.")
+    # Rows for accounts we have not imported land on the item's first account.
+    any_acc = next(iter(acct_map.values()))
+
+    access_token = item.access_token
+    cursor = item.transactions_cursor
+
+    # An interrupted run left its checkpoint as the stored cursor.
+    previous = PlaidSyncAttempt.objects.filter(item_id=item_id).exclude(status="running").first()
+    interrupted = (
+        previous is not None
+        and previous.status in ("error", "abandoned")
+        and previous.pages_completed > 0
+        and previous.last_cursor == cursor
+    )
+    start_cursor = cursor
+    if interrupted:
+        start_cursor = previous.start_cursor
+        if not resume:
+            cursor = start_cursor
+
+    attempt = _acquire_sync_lease(item_id, worker, start_cursor, previous if interrupted else None)
+    PlaidItem.objects.filter(id=item.id).update(sync_status="running", last_sync_started_at=timezone.now())
+
+    added_total = modified_total = removed_total = 0
+    pages = rows_total = 0
+    depth = SYNC_PREFETCH_PAGES if prefetch is None else prefetch
+    responses = _iter_sync_pages(access_token, cursor, start_cursor, throttle)
+    if depth > 0:
+        responses = _prefetch(responses, depth)
+
+    try:
+        for resp in responses:
+            if resp is PAGINATION_RESTARTED:
+                # Every page from start_cursor comes again; count each change once.
+                added_total = modified_total = removed_total = rows_total = 0
+                _reset_attempt_counters(attempt)
+                continue
             added = resp["added"]
             modified = resp["modified"]
             removed = resp["removed"]
+            next_cursor = resp["next_cursor"]
 
             with db_transaction.atomic():
-                for tx in list(added) + list(modified):
-                    plaid_txn_id = tx["transaction_id"]
-                    tx_acc = acct_map.get(tx.get("account_id"), any_acc)
-                    defaults = _map_defaults_from_plaid(tx, tx_acc, any_acc.user_id)
-
-                    Transactions.objects.update_or_create(
-                        id=plaid_txn_id,
-                        defaults=defaults,
-                    )
-
-                for tx in removed:
-                    plaid_txn_id = tx.get("transaction_id") if isinstance(tx, dict) else tx
-                    Transactions.objects.filter(id=plaid_txn_id).update(canDelete=False)
+                rows = _bulk_upsert_plaid_transactions(list(added) + list(modified), acct_map, any_acc)
+                rows += _bulk_delete_removed(removed, acct_map)
+                _checkpoint_page(attempt, item_id, next_cursor, len(added), len(modified), len(removed), rows)
 
             added_total += len(added)
             modified_total += len(modified)
             removed_total += len(removed)
-
-            has_more = resp["has_more"]
-            cursor = resp["next_cursor"]
-
-        _set_cursor(item_id, cursor)
-
-    except ApiException as e:
-        # Log or raise
+            rows_total += rows
+            pages += 1
+            cursor = next_cursor
+
+    except Exception as e:
+        responses.close()  # stops the prefetch thread, if any
+        _finish_attempt(attempt, "error", str(e))
+        PlaidItem.objects.filter(id=item.id).update(
+            sync_status="error", last_sync_error=str(e), last_sync_finished_at=timezone.now(),
+        )
         raise
 
+    _finish_attempt(attempt, "done")
+    finished = timezone.now()
+    PlaidItem.objects.filter(id=item.id).update(
+        sync_status="idle", last_sync_error=None, last_sync_finished_at=finished, last_synced_at=finished,
+    )
+
     return {
         "item_id": item_id,
         "added": added_total,
@@ -180,4 +793,8 @@ def sync_plaid_item_transactions(item_id: str) -> dict:
         "removed": removed_total,
         "next_cursor": cursor,
         "synced_at": timezone.now(),
+        "attempt_id": attempt.id,
+        "pages": pages,
+        "rows_written": rows_total,
+        "resumed": interrupted and resume,
     }
@@ -0,0 +1,241 @@
+"""
+DB-backed queue for Plaid transactions syncs.
+
+Jobs are ``PlaidWebhookEvent`` rows: the webhook (or ManualSyncView) stores the
+event as ``received`` and returns; ``run_sync_workers`` claims rows with
+SELECT ... FOR UPDATE SKIP LOCKED, moves them to ``processing`` and finishes
+them as ``done``/``error``. Failed jobs go back to ``received`` with an
+exponential backoff on ``available_at`` until ``max_attempts`` is reached.
+
+Bursts for one item are coalesced: a new event is folded into a job that is
+still waiting for that item (``status="coalesced"``, ``covered_by`` set), and
+a claimed job absorbs every other waiting event for its item. New jobs wait
+``PLAID_SYNC_DEBOUNCE_SECONDS`` before they are claimable so a burst lands on
+one sync; events arriving while a sync runs become its single follow-up.
+"""
+import logging
+import random
+from datetime import timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import connection, transaction
+from django.utils.timezone import now
+
+from .models import PlaidWebhookEvent
+from .services import SyncLeaseUnavailable, sync_plaid_item_transactions
+
+logger = logging.getLogger(__name__)
+
+STATUS_RECEIVED = "received"
+STATUS_PROCESSING = "processing"
+STATUS_DONE = "done"
+STATUS_ERROR = "error"
+STATUS_COALESCED = "coalesced"
+
+SYNC_WEBHOOK_TYPE = "TRANSACTIONS"
+SYNC_WEBHOOK_CODES = ("SYNC_UPDATES_AVAILABLE", "DEFAULT_UPDATE", "HISTORICAL_UPDATE")
+MANUAL_SYNC_CODE = "MANUAL_SYNC"
+JOB_CODES = SYNC_WEBHOOK_CODES + (MANUAL_SYNC_CODE,)
+
+DEFAULT_MAX_ATTEMPTS = getattr(settings, "PLAID_SYNC_MAX_ATTEMPTS", 5)
+DEFAULT_BACKOFF_SECONDS = getattr(settings, "PLAID_SYNC_BACKOFF_SECONDS", 30)
+DEFAULT_BACKOFF_MAX_SECONDS = getattr(settings, "PLAID_SYNC_BACKOFF_MAX_SECONDS", 3600)
+DEFAULT_LEASE_SECONDS = getattr(settings, "PLAID_SYNC_LEASE_SECONDS", 900)
+DEBOUNCE_SECONDS = getattr(settings, "PLAID_SYNC_DEBOUNCE_SECONDS", 5)
+
+# Process-local counters; sync_savings() gives the durable, cross-process view.
+coalesce_stats = {"on_receipt": 0, "on_claim": 0}
+
+
+def is_sync_job(webhook_type: Optional[str], webhook_code: Optional[str]) -> bool:
+    return webhook_type == SYNC_WEBHOOK_TYPE and webhook_code in JOB_CODES
+
+
+def job_queryset():
+    return PlaidWebhookEvent.objects.filter(webhook_type=SYNC_WEBHOOK_TYPE, webhook_code__in=JOB_CODES)
+
+
+def enqueue_item_sync(item_id: str, webhook_code: str = MANUAL_SYNC_CODE, body: Optional[dict] = None,
+                      delay: float = 0) -> PlaidWebhookEvent:
+    """Record a sync request for ``item_id``; a worker will pick it up (or an already waiting job covers it)."""
+    evt = PlaidWebhookEvent.objects.create(
+        item_id=item_id,
+        webhook_type=SYNC_WEBHOOK_TYPE,
+        webhook_code=webhook_code,
+        body=body or {},
+        status=STATUS_RECEIVED,
+        available_at=now() + timedelta(seconds=delay),
+    )
+    coalesce_into_pending(evt)
+    return evt
+
+
+def coalesce_into_pending(evt: PlaidWebhookEvent) -> Optional[PlaidWebhookEvent]:
+    """
+    Fold ``evt`` into an older job for the same item that has not been claimed yet.
+    Returns the covering job, or None when ``evt`` has to run on its own
+    (nothing waiting, or the only other job is already processing).
+    """
+    if not evt.item_id:
+        return None
+    with transaction.atomic():
+        pending = (
+            job_queryset()
+            .select_for_update()
+            .filter(item_id=evt.item_id, status=STATUS_RECEIVED, id__lt=evt.id)
+            .order_by("id")
+            .first()
+        )
+        if pending is None:
+            return None
+        PlaidWebhookEvent.objects.filter(id=evt.id, status=STATUS_RECEIVED).update(
+            status=STATUS_COALESCED, covered_by=pending,
+        )
+    evt.status = STATUS_COALESCED
+    evt.covered_by = pending
+    coalesce_stats["on_receipt"] += 1
+    return pending
+
+
+def sync_savings() -> dict:
+    """How many sync requests were absorbed by another job instead of running their own sync."""
+    qs = job_queryset()
+    requested = qs.count()
+    coalesced = qs.filter(covered_by__isnull=False).count()
+    return {
+        "requested": requested,
+        "coalesced": coalesced,
+        "syncs": requested - coalesced,
+        "process": dict(coalesce_stats),
+    }
+
+
+def backoff_delay(attempts: int, base: float = DEFAULT_BACKOFF_SECONDS, cap: float = DEFAULT_BACKOFF_MAX_SECONDS) -> float:
+    """Exponential backoff with +/-20% jitter: base, 2*base, 4*base, ... capped at ``cap``."""
+    delay = min(cap, base * (2 ** max(0, attempts - 1)))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def claim_next_job(worker_id: str) -> Optional[PlaidWebhookEvent]:
+    """Atomically move the oldest due job to ``processing`` and return it (or None)."""
+    with transaction.atomic():
+        # NOT IN (...) matches nothing once the subquery holds a NULL, so leave item-less jobs out of it.
+        running_items = job_queryset().filter(status=STATUS_PROCESSING, item_id__isnull=False).values("item_id")
+        evt = (
+            job_queryset()
+            .select_for_update(skip_locked=True)
+            .filter(status=STATUS_RECEIVED, available_at__lte=now())
+            .exclude(item_id__in=running_items)
+            .order_by("available_at", "id")
+            .first()
+        )
+        if evt is None:
+            return None
+        evt.status = STATUS_PROCESSING
+        evt.attempts += 1
+        evt.locked_at = now()
+        evt.locked_by = worker_id
+        evt.save(update_fields=["status", "attempts", "locked_at", "locked_by"])
+
+        # Everything already waiting for this item is covered by the sync we are about to run.
+        # skip_locked: never block on a row another worker is claiming.
+        if evt.item_id:
+            absorbed = list(
+                job_queryset()
+                .select_for_update(skip_locked=True)
+                .filter(item_id=evt.item_id, status=STATUS_RECEIVED)
+                .exclude(id=evt.id)
+                .values_list("id", flat=True)
+            )
+            if absorbed:
+                PlaidWebhookEvent.objects.filter(id__in=absorbed).update(status=STATUS_COALESCED, covered_by=evt)
+                PlaidWebhookEvent.objects.filter(covered_by_id__in=absorbed).update(covered_by=evt)
+                coalesce_stats["on_claim"] += len(absorbed)
+    return evt
+
+
+def requeue_stale_jobs(lease_seconds: float = DEFAULT_LEASE_SECONDS) -> int:
+    """Hand jobs whose worker died mid-sync back to the queue."""
+    cutoff = now() - timedelta(seconds=lease_seconds)
+    return job_queryset().filter(status=STATUS_PROCESSING, locked_at__lt=cutoff).update(
+        status=STATUS_RECEIVED, locked_at=None, locked_by=None, available_at=now(),
+    )
+
+
+def run_job(
+    evt: PlaidWebhookEvent,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    backoff: float = DEFAULT_BACKOFF_SECONDS,
+    backoff_max: float = DEFAULT_BACKOFF_MAX_SECONDS,
+) -> Optional[dict]:
+    """Run one claimed job and record its outcome on the event row."""
+    try:
+        result = sync_plaid_item_transactions(evt.item_id, worker=evt.locked_by)
+    except SyncLeaseUnavailable as e:
+        # Someone else is syncing this item right now; try again shortly without burning an attempt.
+        evt.status = STATUS_RECEIVED
+        evt.error = str(e)
+        evt.attempts = max(0, evt.attempts - 1)
+        evt.available_at = now() + timedelta(seconds=backoff_delay(1, backoff, backoff_max))
+        evt.locked_at = None
+        evt.locked_by = None
+        evt.save(update_fields=["status", "error", "attempts", "available_at", "locked_at", "locked_by"])
+        return None
+    except ObjectDoesNotExist as e:
+        # No linked account for this item: retrying will not help.
+        _finish(evt, STATUS_ERROR, str(e))
+        return None
+    except Exception as e:
+        logger.exception("Plaid sync failed for item %s (attempt %s)", evt.item_id, evt.attempts)
+        if evt.attempts >= max_attempts:
+            _finish(evt, STATUS_ERROR, str(e))
+        else:
+            evt.status = STATUS_RECEIVED
+            evt.error = str(e)
+            evt.available_at = now() + timedelta(seconds=backoff_delay(evt.attempts, backoff, backoff_max))
+            evt.locked_at = None
+            evt.locked_by = None
+            evt.save(update_fields=["status", "error", "available_at", "locked_at", "locked_by"])
+        return None
+
+    _finish(evt, STATUS_DONE, None)
+    return result
+
+
+def _finish(evt: PlaidWebhookEvent, status: str, error: Optional[str]) -> None:
+    evt.status = status
+    evt.error = error
+    evt.processed_at = now()
+    evt.locked_at = None
+    evt.locked_by = None
+    evt.save(update_fields=["status", "error", "processed_at", "locked_at", "locked_by"])
+    # Events folded into this job share its outcome.
+    PlaidWebhookEvent.objects.filter(covered_by=evt, status=STATUS_COALESCED).update(
+        status=status, error=error, processed_at=evt.processed_at,
+    )
+
+
+def worker_loop(worker_id: str, stop, poll_interval: float = 2.0, once: bool = False,
+                lease_seconds: float = DEFAULT_LEASE_SECONDS, **job_opts) -> int:
+    """
+    Claim and run jobs until ``stop`` (a threading/multiprocessing Event) is set.
+    With ``once=True`` the loop exits as soon as the queue is empty.
+    Returns the number of jobs this worker processed.
+    """
+    processed = 0
+    try:
+        while not stop.is_set():
+            evt = claim_next_job(worker_id)
+            if evt is None:
+                requeue_stale_jobs(lease_seconds)
+                if once:
+                    break
+                stop.wait(poll_interval)
+                continue
+            run_job(evt, **job_opts)
+            processed += 1
+    finally:
+        connection.close()
+    return processed
@@ -0,0 +1,68 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from rest_framework.test import APITestCase
+
+from finance.models import AccountBalances
+from finance.services import rollup_balance_deltas
+
+
+class MonthlyClosingBalanceTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user("monthly")
+        self.client.force_authenticate(self.user)
+        response = self.client.post("/api/accounts/", {"accountName": "Cash", "currentBalance": 100}, format="json")
+        self.assertEqual(response.status_code, 201, response.data)
+        self.account = response.data["id"]
+        self.post_transaction("2024-01-15T12:00:00Z", 10, False)
+        self.post_transaction("2024-02-10T12:00:00Z", 30, True)
+
+    def post_transaction(self, when, amount, is_income):
+        response = self.client.post("/api/transactions/", {
+            "account": self.account, "amount": amount, "isIncome": is_income, "name": "Row",
+            "transactionDate": when,
+        }, format="json")
+        self.assertEqual(response.status_code, 201, response.data)
+
+    def months(self, **params):
+        response = self.client.get("/api/account-balances/", {"account": self.account, **params})
+        self.assertEqual(response.status_code, 200, response.data)
+        return [(row["balanceMonth"], row["income"], row["expanses"], row["balance"])
+                for row in response.data["results"]]
+
+    def history(self):
+        response = self.client.get(f"/api/accounts/{self.account}/balance-history/",
+                                   {"interval": "month", "from": "2024-01-01", "to": "2024-02-29"})
+        self.assertEqual(response.status_code, 200, response.data)
+        return [point["balance"] for point in response.data["results"]]
+
+    def test_months_only_in_the_ledger_are_listed_from_the_opening_balance(self):
+        self.assertFalse(AccountBalances.objects.exists())
+        expected = [("2024-01", 0, 10, 90), ("2024-02", 30, 0, 120)]
+        self.assertEqual(self.months(), expected)
+        self.assertEqual([balance for *_, balance in expected], self.history())
+        self.assertEqual(self.months(balanceMonth__gte="2024-02"), expected[1:])
+        self.assertEqual(self.months(ordering="-balanceMonth"), expected[::-1])
+
+    def test_rollup_and_rebuild_store_the_same_closing_balances(self):
+        expected = [("2024-01", 0, 10, 90), ("2024-02", 30, 0, 120)]
+        rollup_balance_deltas()
+        self.assertEqual(self.months(), expected)
+        # A later month folded on top of stored ones opens from the last closing balance.
+        self.post_transaction("2024-04-02T12:00:00Z", 5, False)
+        self.assertEqual(self.months()[-1], ("2024-04", 0, 5, 115))
+        rollup_balance_deltas()
+        expected.append(("2024-04", 0, 5, 115))
+        self.assertEqual(self.months(), expected)
+        call_command("rebuild_account_balances", stdout=StringIO())
+        self.assertEqual(self.months(), expected)
+
+    def test_overwriting_the_balance_moves_every_closing_balance(self):
+        rollup_balance_deltas()
+        response = self.client.patch(f"/api/accounts/{self.account}/", {"currentBalance": 200}, format="json")
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual([balance for *_, balance in self.months()], [170, 200])
+        self.assertEqual(self.history(), [170, 200])
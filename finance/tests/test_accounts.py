@@ -0,0 +1,33 @@
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+
+from finance import models
+
+
+class AccountIdTests(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("accounts")
+        self.client.force_authenticate(self.user)
+
+    def create(self, **data):
+        return self.client.post("/api/accounts/", {"accountName": "Cash", **data}, format="json")
+
+    def test_blank_account_ids_are_stored_as_null(self):
+        for value in ("", "  ", None):
+            response = self.create(accountId=value)
+            self.assertEqual(response.status_code, 201, response.data)
+            self.assertIsNone(response.data["accountId"])
+        self.assertEqual(models.Account.objects.filter(user=self.user, accountId__isnull=True).count(), 3)
+
+    def test_duplicate_account_id_is_rejected(self):
+        self.assertEqual(self.create(accountId="acc-1").status_code, 201)
+        response = self.create(accountId="acc-1")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("accountId", response.data)
+
+    def test_clearing_account_id_on_update(self):
+        pk = self.create(accountId="acc-1").data["id"]
+        self.create(accountId="")
+        response = self.client.patch(f"/api/accounts/{pk}/", {"accountId": ""}, format="json")
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertIsNone(models.Account.objects.get(pk=pk).accountId)
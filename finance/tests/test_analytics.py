@@ -0,0 +1,65 @@
+from datetime import datetime
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from finance.models import Account, Transactions
+
+RANGE = {"from": "2024-05-01", "to": "2024-05-31", "group_by": "account"}
+
+
+def shared_cache(location):
+    return override_settings(CACHES={"default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": location,
+    }})
+
+
+class SpendingAnalyticsCacheTests(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("analytics")
+        self.client.force_authenticate(self.user)
+        self.account = Account.objects.create(user=self.user, accountId="plaid-acc", accountName="Checking")
+        self.spend(20)
+
+    def spend(self, amount):
+        # Created directly, as another worker's write would look from here: no invalidation in this process.
+        Transactions.objects.create(user=self.user, account=self.account, amount=amount, isIncome=False,
+                                    transactionDate=timezone.make_aware(datetime(2024, 5, 10, 12)))
+
+    def results(self):
+        response = self.client.get("/api/analytics/spending/", RANGE)
+        self.assertEqual(response.status_code, 200, response.data)
+        return [(row["accountName"], row["spend"]) for row in response.data["results"]]
+
+    def test_per_process_cache_is_not_used(self):
+        self.assertEqual(self.results(), [("Checking", 20)])
+        self.spend(5)
+        self.assertEqual(self.results(), [("Checking", 25)])
+
+    def test_shared_cache_serves_repeats(self):
+        with TemporaryDirectory() as location, shared_cache(location):
+            self.assertEqual(self.results(), [("Checking", 20)])
+            self.spend(5)
+            # Cached: nothing dropped this user's version.
+            self.assertEqual(self.results(), [("Checking", 20)])
+
+    def test_plaid_account_upsert_invalidates(self):
+        plaid = mock.Mock()
+        plaid.item_public_token_exchange.return_value.to_dict.return_value = {
+            "access_token": "access-1", "item_id": "item-1",
+        }
+        plaid.accounts_get.return_value.to_dict.return_value = {"accounts": [{
+            "account_id": "plaid-acc", "name": "Everyday", "balances": {"current": 100},
+        }]}
+        with TemporaryDirectory() as location, shared_cache(location), \
+                mock.patch("finance.views_plaid.get_plaid_client", return_value=plaid), \
+                mock.patch("finance.views_plaid._kick_off_transactions_sync", return_value=mock.Mock(id=1)):
+            self.assertEqual(self.results(), [("Checking", 20)])
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post("/api/plaid/exchange-public-token/", {"public_token": "public-1"})
+            self.assertEqual(response.status_code, 200, response.data)
+            self.assertEqual(self.results(), [("Everyday", 20)])
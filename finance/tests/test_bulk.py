@@ -0,0 +1,90 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+
+from finance.models import Account, Transactions
+from finance.services import account_balance
+
+URL = "/api/transactions/bulk/"
+
+
+class BulkTransactionsTests(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("bulk")
+        self.client.force_authenticate(self.user)
+        self.account = Account.objects.create(user=self.user, accountName="Checking", currentBalance=100)
+
+    def balance(self):
+        return account_balance(self.account.id)
+
+    def create(self, rows):
+        return self.client.post(URL, rows, format="json")
+
+    def test_create(self):
+        response = self.create([
+            {"account": self.account.id, "amount": 30, "isIncome": False, "transactionDate": "2024-03-01T00:00:00Z"},
+            {"account": self.account.id, "amount": 50, "isIncome": True, "transactionDate": "2024-03-02T00:00:00Z"},
+        ])
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(Transactions.objects.filter(account=self.account).count(), 2)
+        self.assertEqual(self.balance(), Decimal("120"))
+
+    def test_create_rolls_back_when_a_row_is_invalid(self):
+        response = self.create([
+            {"account": self.account.id, "amount": 30},
+            {"account": 999999, "amount": 10},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([e["index"] for e in response.data["errors"]], [1])
+        self.assertFalse(Transactions.objects.exists())
+        self.assertEqual(self.balance(), Decimal("100"))
+
+    def test_update(self):
+        ids = [row["id"] for row in self.create([
+            {"account": self.account.id, "amount": 10, "isIncome": False},
+            {"account": self.account.id, "amount": 20, "isIncome": False},
+        ]).data["results"]]
+        response = self.client.patch(URL, [{"id": ids[0], "amount": 15}, {"id": ids[1], "isIncome": True}],
+                                     format="json")
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data["updated"], 2)
+        self.assertEqual(self.balance(), Decimal("105"))  # 100 - 15 + 20
+
+    def test_update_rolls_back_when_a_row_is_invalid(self):
+        ids = [row["id"] for row in self.create([{"account": self.account.id, "amount": 10}]).data["results"]]
+        response = self.client.patch(URL, [{"id": ids[0], "amount": 99}, {"id": "missing", "amount": 1}],
+                                     format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Transactions.objects.get(id=ids[0]).amount, 10)
+        self.assertEqual(self.balance(), Decimal("90"))
+
+    def test_delete(self):
+        ids = [row["id"] for row in self.create([
+            {"account": self.account.id, "amount": 10},
+            {"account": self.account.id, "amount": 20},
+        ]).data["results"]]
+        response = self.client.delete(URL, {"ids": ids}, format="json")
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data["deleted"], 2)
+        self.assertFalse(Transactions.objects.exists())
+        self.assertEqual(self.balance(), Decimal("100"))
+
+    def test_delete_rolls_back_when_an_id_is_unknown(self):
+        ids = [row["id"] for row in self.create([{"account": self.account.id, "amount": 10}]).data["results"]]
+        response = self.client.delete(URL, {"ids": [ids[0], "missing"]}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Transactions.objects.count(), 1)
+
+    def test_delete_expects_an_ids_object(self):
+        response = self.client.delete(URL, ["a", "b"], format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("ids", response.data["detail"])
+
+    def test_other_users_rows_are_not_found(self):
+        other = get_user_model().objects.create_user("other")
+        tx = Transactions.objects.create(user=other, account=Account.objects.create(user=other), amount=1)
+        response = self.client.delete(URL, {"ids": [str(tx.id)]}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(Transactions.objects.filter(id=tx.id).exists())
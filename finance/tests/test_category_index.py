@@ -0,0 +1,17 @@
+from django.test import TestCase
+
+from finance.category_index import category_index
+from finance.models import Category
+
+
+class CategoryIndexTests(TestCase):
+    def test_duplicate_descriptions_resolve_like_first(self):
+        Category.objects.create(name="ZETA", description="SHARED_DETAIL")
+        alpha = Category.objects.create(name="ALPHA", description="shared_detail")
+        expected = Category.objects.filter(description__iexact="SHARED_DETAIL").first()
+        self.assertEqual(expected, alpha)
+        self.assertEqual(category_index.resolve("SHARED_DETAIL"), alpha.id)
+
+    def test_unknown_fallback(self):
+        unknown = Category.objects.create(name="OTHER", description="UNKNOWN")
+        self.assertEqual(category_index.resolve("NOT_A_DETAIL"), unknown.id)
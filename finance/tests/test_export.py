@@ -0,0 +1,66 @@
+import csv
+import io
+import json
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from finance.models import Account, Transactions
+from finance.views import TransactionsViewSet
+
+URL = "/api/transactions/export/"
+
+
+class TransactionExportTests(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("export")
+        self.client.force_authenticate(self.user)
+        account = Account.objects.create(user=self.user, accountName="Checking")
+        Transactions.objects.bulk_create([
+            Transactions(user=self.user, account=account, name=f"tx {i}", amount=i) for i in range(5)
+        ])
+
+    def stream(self, fmt, **params):
+        """(chunks, queries run before the first one) of a streamed export."""
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(URL, {"format": fmt, **params})
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.streaming)
+            content = iter(response.streaming_content)
+            chunks = [next(content, b"")]
+            queries_before_first = len(ctx)
+        chunks.extend(content)
+        return chunks, queries_before_first
+
+    def test_csv_header_precedes_the_query(self):
+        chunks, queries = self.stream("csv")
+        self.assertEqual(queries, 0)
+        self.assertTrue(chunks[0].startswith(b"id,transactionDate,name"))
+        rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode())))
+        self.assertEqual(sorted(row["name"] for row in rows), [f"tx {i}" for i in range(5)])
+
+    def test_ndjson_is_one_record_per_line(self):
+        chunks, _ = self.stream("ndjson")
+        body = b"".join(chunks).decode()
+        self.assertEqual(body, body.lstrip())
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(sorted(row["name"] for row in rows), [f"tx {i}" for i in range(5)])
+
+    def test_empty_ndjson_export_has_an_empty_body(self):
+        Transactions.objects.all().delete()
+        chunks, _ = self.stream("ndjson")
+        self.assertEqual(b"".join(chunks), b"")
+
+    def test_rows_stream_in_chunks(self):
+        chunk_size = TransactionsViewSet.export_chunk_size
+        TransactionsViewSet.export_chunk_size = 2
+        try:
+            chunks, _ = self.stream("ndjson", fields="name,amount")
+        finally:
+            TransactionsViewSet.export_chunk_size = chunk_size
+        # One chunk per record, not one buffered body.
+        self.assertEqual(len(chunks), 5)
+        rows = [json.loads(chunk) for chunk in chunks]
+        self.assertEqual(set(rows[0]), {"name", "amount"})
@@ -0,0 +1,37 @@
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+
+from finance import models
+
+
+class OwnedListFilterTests(APITestCase):
+    """Each viewset without its own date/FK filters still filters on its allowlisted field."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("filters")
+        self.client.force_authenticate(self.user)
+
+    def assertFilters(self, url, query, model, matching, other):
+        model.objects.create(user=self.user, **matching)
+        model.objects.create(user=self.user, **other)
+        response = self.client.get(url, query)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 1, url)
+
+    def test_allowlisted_filters(self):
+        self.assertFilters("/api/recursive-transactions/", {"sourceId": "s1"}, models.RecursiveTransactions,
+                           {"sourceId": "s1"}, {"sourceId": "s2"})
+        self.assertFilters("/api/goals/", {"isCompleted": "true"}, models.Goal,
+                           {"isCompleted": True}, {"isCompleted": False})
+        self.assertFilters("/api/budgets/", {"type": 2}, models.Budget, {"type": 2}, {"type": 3})
+        self.assertFilters("/api/assets/", {"addRevenueToAccount": "true"}, models.Asset,
+                           {"addRevenueToAccount": True}, {"addRevenueToAccount": False})
+        self.assertFilters("/api/premium/", {"isActive": "true"}, models.Premium,
+                           {"isActive": True}, {"isActive": False})
+        self.assertFilters("/api/devices/", {"deviceId": "d1"}, models.Devices,
+                           {"deviceId": "d1"}, {"deviceId": "d2"})
+
+    def test_unlisted_fields_are_ignored(self):
+        models.Goal.objects.create(user=self.user, goalType="a")
+        models.Goal.objects.create(user=self.user, goalType="b")
+        self.assertEqual(self.client.get("/api/goals/", {"goalType": "a"}).data["count"], 2)
@@ -0,0 +1,102 @@
+from datetime import date, datetime, time, timedelta
+from tempfile import TemporaryDirectory
+
+from django.contrib.auth import get_user_model
+from django.core import checks
+from django.core.cache import cache
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from finance import history
+from finance.models import Account, Transactions
+
+
+class BalanceHistoryTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user("history")
+        self.client.force_authenticate(self.user)
+        # A linked account: Plaid sets the balance, and its rows keep Plaid's sign (negative = money in).
+        self.account = Account.objects.create(user=self.user, accountId="plaid-acc", currentBalance=1000)
+        self.rows = [
+            (date(2024, 1, 3), 25.0, False),
+            (date(2024, 1, 3), -300.0, True),
+            (date(2024, 1, 20), 12.5, False),
+            (date(2024, 2, 1), -40.0, True),
+            (date(2024, 2, 14), 99.99, False),
+            (date(2024, 3, 31), 7.0, False),
+        ]
+        for day, amount, is_income in self.rows:
+            Transactions.objects.create(
+                user=self.user, account=self.account, amount=amount, isIncome=is_income,
+                transactionDate=timezone.make_aware(datetime.combine(day, time(12))),
+            )
+
+    def brute_force(self, day):
+        """Current balance minus the direction-signed size of every row after ``day``."""
+        later = sum(abs(amount) if is_income else -abs(amount)
+                    for when, amount, is_income in self.rows if when > day)
+        return round(1000 - later, 2)
+
+    def test_series_matches_brute_force_sum_on_plaid_rows(self):
+        start, end = date(2023, 12, 25), date(2024, 4, 5)
+        for interval in history.INTERVALS:
+            with self.subTest(interval):
+                response = self.client.get(f"/api/accounts/{self.account.pk}/balance-history/",
+                                           {"interval": interval, "from": start, "to": end})
+                self.assertEqual(response.status_code, 200, response.data)
+                points = response.data["results"]
+                self.assertEqual(len(points), history.count_buckets(start, end, interval))
+                for point in points:
+                    bucket = date.fromisoformat(point["date"])
+                    last_day = bucket + history.bucket_step(interval) - timedelta(days=1)
+                    self.assertAlmostEqual(point["balance"], self.brute_force(last_day), places=2, msg=point)
+
+    def test_opening_balance_before_first_row(self):
+        points = history.balance_history(self.account, date(2023, 12, 1), date(2023, 12, 1), "day")
+        self.assertAlmostEqual(points[0]["balance"], 1000 - 300 - 40 + 25 + 12.5 + 99.99 + 7, places=2)
+
+
+class BalanceHistoryCacheTests(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("history-cache")
+        self.client.force_authenticate(self.user)
+        self.account = Account.objects.create(user=self.user, accountName="Cash", currentBalance=50)
+        self.day = date(2024, 5, 1)
+
+    def closing(self):
+        return history.balance_history(self.account, self.day, self.day, "day")[0]["balance"]
+
+    def post_transaction(self):
+        response = self.client.post("/api/transactions/", {
+            "account": self.account.pk, "amount": 10, "isIncome": False, "name": "Lunch",
+            "transactionDate": "2024-04-30T12:00:00Z",
+        }, format="json")
+        self.assertEqual(response.status_code, 201, response.data)
+
+    def test_shared_cache_is_invalidated_by_writes(self):
+        with TemporaryDirectory() as location, override_settings(CACHES={"default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": location,
+        }}):
+            self.assertEqual(self.closing(), 50)
+            with self.assertNumQueries(0):
+                self.assertEqual(self.closing(), 50)
+            with self.captureOnCommitCallbacks(execute=True):
+                self.post_transaction()
+            self.assertEqual(self.closing(), 40)
+
+    def test_per_process_cache_is_not_used(self):
+        self.assertEqual(self.closing(), 50)
+        # A write whose invalidation never runs (as in another worker) is still seen.
+        Transactions.objects.create(user=self.user, account=self.account, amount=5, isIncome=True,
+                                    transactionDate=timezone.make_aware(datetime(2024, 5, 3, 12)))
+        self.assertEqual(self.closing(), 45)
+
+    def test_deploy_check_warns_about_per_process_cache(self):
+        ids = [message.id for message in checks.run_checks(include_deployment_checks=True)]
+        self.assertIn("finance.W001", ids)
+        with override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache",
+                                                   "LOCATION": "redis://localhost:6379"}}):
+            ids = [message.id for message in checks.run_checks(include_deployment_checks=True)]
+        self.assertNotIn("finance.W001", ids)
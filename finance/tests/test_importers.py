@@ -0,0 +1,128 @@
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from rest_framework.test import APITestCase
+
+from finance.importers import StatementFormatError, StatementImporter, detect_format, iter_statement
+from finance.models import Account, Transactions
+from finance.services import account_balance
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def parse(name, **kwargs):
+    path = FIXTURES / name
+    with path.open("rb") as fh:
+        return list(iter_statement(fh, detect_format(path.name, fh), **kwargs))
+
+
+def summary(lines):
+    """(date, amount, name) of each parsed line, or the error."""
+    return [line.error or (line.date.date(), line.amount, line.name) for line in lines]
+
+
+class StatementParserTests(TestCase):
+    def test_csv_with_debit_and_credit_columns(self):
+        lines = parse("statement.csv")
+        self.assertEqual(summary(lines), [
+            (date(2024, 1, 2), Decimal("-4.50"), "Blue Bottle Coffee"),
+            (date(2024, 1, 2), Decimal("-4.50"), "Blue Bottle Coffee"),
+            (date(2024, 1, 5), Decimal("1250.00"), "Payroll ACME"),
+            (date(2024, 1, 9), Decimal("-2.00"), "Bank fee"),
+            "invalid date 'not a date'",
+        ])
+        self.assertEqual([line.ref for line in lines[:2]], ["T-1", "T-2"])
+        self.assertEqual(lines[0].category, "Food and drink")
+
+    def test_csv_dayfirst(self):
+        self.assertEqual(parse("statement.csv", dayfirst=True)[2].date.date(), date(2024, 5, 1))
+
+    def test_ofx_sgml(self):
+        lines = parse("statement.ofx")
+        self.assertEqual(summary(lines), [
+            (date(2024, 2, 3), Decimal("-23.10"), "GROCERY MART"),
+            (date(2024, 2, 10), Decimal("-150.00"), "CHECK 1042"),
+            (date(2024, 2, 15), Decimal("500.00"), "TRANSFER IN"),
+        ])
+        self.assertEqual((lines[0].ref, lines[0].memo, lines[0].currency), ("20240203001", "Card 1234", "EUR"))
+        self.assertEqual(lines[1].check_number, "1042")
+
+    def test_qif_skips_category_lists_and_transfers(self):
+        lines = parse("statement.qif")
+        self.assertEqual(summary(lines), [
+            (date(2024, 3, 1), Decimal("-42.17"), "Corner Store"),
+            (date(2024, 3, 1), Decimal("-42.17"), "Corner Store"),
+            (date(2024, 3, 4), Decimal("-60.00"), "Electric Co"),
+            (date(2024, 3, 15), Decimal("1000.00"), "Salary"),
+            (date(2024, 3, 20), Decimal("-200.00"), "To savings"),
+        ])
+        self.assertEqual([line.category for line in lines], ["Groceries", "Groceries", "Electric", None, None])
+        self.assertEqual((lines[2].memo, lines[2].check_number), ("March bill", "301"))
+
+    def test_format_detection_without_extension(self):
+        for name, fmt in (("statement.csv", "csv"), ("statement.ofx", "ofx"), ("statement.qif", "qif")):
+            with (FIXTURES / name).open("rb") as fh:
+                self.assertEqual(detect_format("upload", fh), fmt)
+                self.assertEqual(fh.tell(), 0)
+
+    def test_csv_without_amount_column_is_rejected(self):
+        with self.assertRaises(StatementFormatError):
+            list(iter_statement(SimpleUploadedFile("x.csv", b"Date,Description\n2024-01-01,x\n"), "csv"))
+
+
+class StatementImportTests(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("importer")
+        self.client.force_authenticate(self.user)
+        self.account = Account.objects.create(user=self.user, accountName="Checking", currentBalance=100)
+
+    def upload(self, name):
+        content = (FIXTURES / name).read_bytes()
+        return self.client.post("/api/transactions/import/", {
+            "file": SimpleUploadedFile(name, content), "account": self.account.id,
+        }, format="multipart")
+
+    def test_import_and_reimport_each_format(self):
+        expected = {"statement.csv": (4, Decimal("1239.00")), "statement.ofx": (3, Decimal("326.90")),
+                    "statement.qif": (5, Decimal("655.66"))}
+        total = Decimal("100")
+        for name, (created, delta) in expected.items():
+            with self.subTest(name):
+                response = self.upload(name)
+                self.assertEqual(response.status_code, 201, response.data)
+                self.assertEqual((response.data["created"], response.data["duplicates"]), (created, 0))
+                self.assertEqual(response.data["balanceDelta"], delta)
+                total += delta
+
+                again = self.upload(name)
+                self.assertEqual(again.status_code, 201, again.data)
+                self.assertEqual((again.data["created"], again.data["duplicates"]), (0, created))
+                self.assertEqual(again.data["balanceDelta"], 0)
+        self.assertEqual(Transactions.objects.filter(account=self.account).count(), 12)
+        self.assertEqual(account_balance(self.account.id), total)
+
+    def test_invalid_lines_are_reported(self):
+        response = self.upload("statement.csv")
+        self.assertEqual(response.data["invalid"], 1)
+        self.assertEqual(response.data["errors"][0]["line"], 6)
+
+    def test_overlapping_statement_imports_only_new_lines(self):
+        first = b"Date,Description,Amount\n2024-04-01,Coffee,-3.00\n2024-04-01,Coffee,-3.00\n"
+        longer = first + b"2024-04-01,Coffee,-3.00\n2024-04-02,Lunch,-9.00\n"
+        importer = StatementImporter(self.account)
+        self.assertEqual(importer.run(iter_statement(SimpleUploadedFile("a.csv", first), "csv"))["created"], 2)
+        result = StatementImporter(self.account).run(iter_statement(SimpleUploadedFile("b.csv", longer), "csv"))
+        # The two repeats already imported are skipped; the third identical coffee is new.
+        self.assertEqual((result["created"], result["duplicates"]), (2, 2))
+
+    def test_other_users_account_is_rejected(self):
+        other = Account.objects.create(user=get_user_model().objects.create_user("other"))
+        response = self.client.post("/api/transactions/import/", {
+            "file": SimpleUploadedFile("s.csv", (FIXTURES / "statement.csv").read_bytes()), "account": other.id,
+        }, format="multipart")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Transactions.objects.exists())
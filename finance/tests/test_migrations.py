@@ -0,0 +1,64 @@
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+
+class MigrationTestCase(TransactionTestCase):
+    """Migrate to ``migrate_from``, let setUpBeforeMigration() write rows, then apply ``migrate_to``."""
+    migrate_from = None
+    migrate_to = None
+
+    def setUp(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate([("finance", self.migrate_from)])
+        self.setUpBeforeMigration(executor.loader.project_state([("finance", self.migrate_from)]).apps)
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate([("finance", self.migrate_to)])
+        self.apps = executor.loader.project_state([("finance", self.migrate_to)]).apps
+
+    def tearDown(self):
+        # Leave the schema fully migrated for the tests that follow.
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(executor.loader.graph.leaf_nodes("finance"))
+
+    def setUpBeforeMigration(self, apps):
+        pass
+
+
+class MergeDuplicateLinkedAccountsTests(MigrationTestCase):
+    migrate_from = "0010_plaid_item"
+    migrate_to = "0011_account_user_accountid_unique"
+
+    def setUpBeforeMigration(self, apps):
+        User = apps.get_model("auth", "User")
+        Account = apps.get_model("finance", "Account")
+        AccountBalances = apps.get_model("finance", "AccountBalances")
+        Transactions = apps.get_model("finance", "Transactions")
+        alice = User.objects.create(username="alice")
+        bob = User.objects.create(username="bob")
+
+        self.keep = Account.objects.create(user=alice, accountId="plaid-1")
+        dupe = Account.objects.create(user=alice, accountId="plaid-1")
+        dupe2 = Account.objects.create(user=alice, accountId="plaid-1")
+        self.other_user = Account.objects.create(user=bob, accountId="plaid-1").id
+        self.manual = [Account.objects.create(user=alice, accountId="").id for _ in range(2)]
+        for acc in (self.keep, dupe, dupe2):
+            Transactions.objects.create(user=alice, account=acc, amount=1)
+        AccountBalances.objects.create(user=alice, account=dupe)
+        AccountBalances.objects.create(user=alice, account=dupe2)
+        self.dupes = [dupe.id, dupe2.id]
+
+    def test_duplicates_merged_into_lowest_id(self):
+        Account = self.apps.get_model("finance", "Account")
+        AccountBalances = self.apps.get_model("finance", "AccountBalances")
+        Transactions = self.apps.get_model("finance", "Transactions")
+
+        self.assertFalse(Account.objects.filter(id__in=self.dupes).exists())
+        self.assertEqual(Transactions.objects.filter(account_id=self.keep.id).count(), 3)
+        self.assertEqual(AccountBalances.objects.filter(account_id=self.keep.id).count(), 1)
+        self.assertEqual(AccountBalances.objects.count(), 2)  # the second one is unlinked, not lost
+        self.assertTrue(Account.objects.filter(id=self.other_user).exists())
+        self.assertEqual(list(Account.objects.filter(id__in=self.manual).values_list("accountId", flat=True)),
+                         [None, None])
@@ -0,0 +1,93 @@
+from datetime import datetime, timezone
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+
+from finance import views
+from finance.management.commands.explain_list_queries import Command, _keyset_queryset, _list_queryset
+from finance.models import Account, Bills, Category, Transactions
+from finance.pagination import TransactionKeysetPagination
+
+
+class ListQueryPlanTests(TestCase):
+    """Each owner-scoped list query must be served by its own index, in index order when it is ordered."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("plans")
+        other = get_user_model().objects.create_user("other")
+        cls.account = Account.objects.create(user=cls.user, accountName="Checking")
+        other_account = Account.objects.create(user=other, accountName="Other")
+        cls.category = Category.objects.order_by("id").first() or Category.objects.create(name="Food", slug="food")
+        rows = []
+        for i in range(40):
+            for owner, account in ((cls.user, cls.account), (other, other_account)):
+                rows.append(Transactions(
+                    user=owner, account=account, category=cls.category if i % 2 else None,
+                    name=f"coffee {i}", amount=i, transactionDate=datetime(2024, 1, 1 + i % 28, tzinfo=timezone.utc),
+                ))
+        Transactions.objects.bulk_create(rows)
+        Bills.objects.create(user=cls.user, title="Rent", dueDate=datetime(2024, 2, 1, tzinfo=timezone.utc))
+
+    def setUp(self):
+        if connection.vendor == "postgresql":
+            # Test tables are tiny, so a seq scan is always cheapest; ask whether the index *can* serve the query.
+            with connection.cursor() as cur:
+                cur.execute("SET LOCAL enable_seqscan = off")
+
+    def assertServedBy(self, qs, table, *indexes, ordered=True):
+        plan = qs[:50].explain()
+        problem = Command.plan_problem(plan, table, indexes, ordered)
+        self.assertIsNone(problem, f"{problem}:\n{plan}")
+
+    def test_transaction_list_queries_use_their_index(self):
+        tx = "finance_transactions"
+        cases = {
+            "default": ("", "tx_user_date_idx"),
+            "by date": ("ordering=-transactionDate", "tx_user_date_idx"),
+            "date range": ("transactionDate__gte=2024-01-01T00:00:00Z&transactionDate__lt=2024-02-01T00:00:00Z",
+                           "tx_user_date_idx"),
+            "by account": (f"account={self.account.id}&ordering=-transactionDate", "tx_user_account_date_idx"),
+            "by category": (f"category={self.category.id}&ordering=-transactionDate", "tx_user_category_date_idx"),
+        }
+        for label, (query, index) in cases.items():
+            with self.subTest(label):
+                self.assertServedBy(_list_queryset(views.TransactionsViewSet, self.user, query), tx, index)
+        with self.subTest("search"):
+            self.assertServedBy(_list_queryset(views.TransactionsViewSet, self.user, "search=coffee"), tx,
+                                "tx_user_date_idx", "tx_name_trgm_idx", "tx_merchant_trgm_idx", ordered=False)
+        with self.subTest("keyset page"):
+            self.assertServedBy(_keyset_queryset(self.user), tx, "tx_user_date_id_keyset_idx")
+
+    def test_keyset_plan_comes_from_the_paginator(self):
+        qs = _keyset_queryset(self.user)
+        expected = TransactionKeysetPagination.keyset_queryset(
+            _list_queryset(views.TransactionsViewSet, self.user, "pagination=keyset"), None,
+        )
+        self.assertEqual(len(qs), 39)
+        self.assertEqual([tx.id for tx in qs], [tx.id for tx in expected][1:])
+
+    def test_bills_by_due_date_use_their_index(self):
+        self.assertServedBy(_list_queryset(views.BillsViewSet, self.user, "ordering=dueDate"), "finance_bills",
+                            "bills_user_due_idx")
+
+    def test_plan_problems(self):
+        problem = Command.plan_problem
+        self.assertIn("FULL SCAN", problem("SCAN finance_bills", "finance_bills", ("bills_user_due_idx",), True))
+        self.assertIn("FULL SCAN", problem("Seq Scan on finance_bills  (cost=0.00..1.01 rows=1)", "finance_bills",
+                                           ("bills_user_due_idx",), True))
+        # Another index (the user_id FK one) plus a sort: both the missing index and the sort are caught.
+        fallback = ("SEARCH finance_transactions USING INDEX finance_transactions_user_id_6a1b (user_id=?)\n"
+                    "USE TEMP B-TREE FOR ORDER BY")
+        self.assertIn("NOT USING", problem(fallback, "finance_transactions", ("tx_user_date_idx",), True))
+        sorted_plan = ("Limit  (cost=9.1..9.2 rows=50)\n  ->  Sort  (cost=9.1..9.2 rows=40)\n"
+                       "        Sort Key: \"transactionDate\" DESC\n"
+                       "        ->  Index Scan using tx_user_date_idx on finance_transactions")
+        self.assertIn("SORT", problem(sorted_plan, "finance_transactions", ("tx_user_date_idx",), True))
+        self.assertIsNone(problem(sorted_plan, "finance_transactions", ("tx_user_date_idx",), False))
+        self.assertIn("SORT", problem(
+            "SEARCH finance_transactions USING INDEX tx_user_date_idx (user_id=?)\n"
+            "USE TEMP B-TREE FOR RIGHT PART OF ORDER BY", "finance_transactions", ("tx_user_date_idx",), True))
+        self.assertIsNone(problem("SEARCH finance_bills USING INDEX bills_user_due_idx (user_id=?)",
+                                  "finance_bills", ("bills_user_due_idx",), True))
@@ -0,0 +1,63 @@
+from importlib import import_module
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, connection
+from django.test import TestCase
+from rest_framework.test import APITestCase
+
+from finance import search
+from finance.models import Account, Category, Transactions
+
+trigram_migration = import_module("finance.migrations.0014_transactions_trigram_search")
+
+
+class TransactionSearchTests(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("search")
+        self.client.force_authenticate(self.user)
+        account = Account.objects.create(user=self.user, accountName="Checking")
+        groceries = Category.objects.create(name="Zqgroceries", slug="zqgroceries", description="Supermarkets")
+        rows = {
+            "name": dict(name="Blue Bottle Coffee"),
+            "merchant": dict(name="POS 1234", merchantName="Corner Coffee"),
+            "category": dict(name="Weekly shop", category=groceries),
+            "other": dict(name="Rent"),
+        }
+        self.ids = {
+            key: str(Transactions.objects.create(user=self.user, account=account, amount=1, **fields).id)
+            for key, fields in rows.items()
+        }
+
+    def search(self, term):
+        response = self.client.get("/api/transactions/", {"search": term})
+        self.assertEqual(response.status_code, 200)
+        return {str(row["id"]) for row in response.data["results"]}
+
+    def test_matches_name_and_merchant(self):
+        self.assertEqual(self.search("coffee"), {self.ids["name"], self.ids["merchant"]})
+
+    def test_matches_category_name_and_description(self):
+        self.assertEqual(self.search("zqgrocer"), {self.ids["category"]})
+        self.assertEqual(self.search("supermarket"), {self.ids["category"]})
+
+    def test_every_term_must_match(self):
+        self.assertEqual(self.search("corner coffee"), {self.ids["merchant"]})
+
+    def test_postgres_without_pg_trgm_is_not_ranked(self):
+        with mock.patch.object(connection, "vendor", "postgresql"), \
+                mock.patch.dict(search._trigram_installed, {connection.settings_dict["NAME"]: False}), \
+                mock.patch.object(search.TransactionSearchFilter, "_rank") as rank:
+            self.assertEqual(self.search("coffee"), {self.ids["name"], self.ids["merchant"]})
+        rank.assert_not_called()
+
+
+class TrigramMigrationTests(TestCase):
+    def test_missing_pg_trgm_skips_the_indexes(self):
+        schema_editor = mock.Mock()
+        schema_editor.connection.vendor = "postgresql"
+        schema_editor.connection.alias = connection.alias
+        schema_editor.execute.side_effect = DatabaseError('extension "pg_trgm" is not available')
+        with self.assertLogs(trigram_migration.logger, "WARNING"):
+            trigram_migration.create_trigram_indexes(None, schema_editor)
+        schema_editor.execute.assert_called_once_with("CREATE EXTENSION IF NOT EXISTS pg_trgm")
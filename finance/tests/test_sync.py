@@ -0,0 +1,90 @@
+import json
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from plaid.api_client import ApiException
+
+from finance.models import Account, PlaidItem, PlaidSyncAttempt, Transactions
+from finance.services import (
+    MUTATION_DURING_PAGINATION, account_balance, pending_monthly_flows, sync_plaid_item_transactions,
+)
+
+
+def _tx(tx_id, amount=10.0):
+    return {"transaction_id": tx_id, "account_id": "plaid-acc", "amount": amount, "name": tx_id, "date": "2024-05-01"}
+
+
+def _page(added, next_cursor, has_more, removed=()):
+    return {"added": added, "modified": [], "removed": list(removed), "next_cursor": next_cursor,
+            "has_more": has_more}
+
+
+def _mutation_error():
+    error = ApiException(status=400, reason="Bad Request")
+    error.body = json.dumps({"error_code": MUTATION_DURING_PAGINATION})
+    return error
+
+
+class PaginationRestartTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user("sync")
+        self.item = PlaidItem.objects.create(user=user, item_id="item-1", access_token="access-1")
+        Account.objects.create(user=user, accountId="plaid-acc", plaidItem=self.item, plaid_access_token="access-1")
+
+    def _sync(self, prefetch):
+        # Page 1, then Plaid reports a mutation on page 2: the run starts over and page 1 comes back.
+        responses = [
+            _page([_tx("a"), _tx("b")], "c1", True),
+            _mutation_error(),
+            _page([_tx("a"), _tx("b")], "c1", True),
+            _page([_tx("c")], "c2", False),
+        ]
+        client = mock.Mock()
+        client.transactions_sync.side_effect = responses
+        with mock.patch("finance.services.get_plaid_client", return_value=client):
+            return sync_plaid_item_transactions(self.item.item_id, prefetch=prefetch)
+
+    def _assert_counted_once(self, result):
+        self.assertEqual(result["added"], 3)
+        self.assertEqual(result["rows_written"], 3)
+        self.assertEqual(result["next_cursor"], "c2")
+        attempt = PlaidSyncAttempt.objects.get(id=result["attempt_id"])
+        self.assertEqual((attempt.status, attempt.added, attempt.rows_written), ("done", 3, 3))
+        self.assertEqual(Transactions.objects.filter(account__plaidItem=self.item).count(), 3)
+
+    def test_restart_does_not_double_count(self):
+        self._assert_counted_once(self._sync(prefetch=0))
+
+    def test_restart_does_not_double_count_with_prefetch(self):
+        self._assert_counted_once(self._sync(prefetch=2))
+
+
+class RemovedTransactionTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("removed")
+        self.item = PlaidItem.objects.create(user=self.user, item_id="item-1", access_token="access-1")
+        self.account = Account.objects.create(user=self.user, accountId="plaid-acc", plaidItem=self.item,
+                                              plaid_access_token="access-1", currentBalance=500)
+        # A row outside this item's accounts: a removal naming it must not reach it.
+        other = get_user_model().objects.create_user("bystander")
+        Transactions.objects.create(id="m", user=other, account=Account.objects.create(user=other), amount=1)
+
+    def _sync(self, *pages):
+        client = mock.Mock()
+        client.transactions_sync.side_effect = list(pages)
+        with mock.patch("finance.services.get_plaid_client", return_value=client):
+            return sync_plaid_item_transactions(self.item.item_id, prefetch=0)
+
+    def test_removed_transactions_are_deleted_and_leave_the_monthly_flows(self):
+        self._sync(_page([_tx("a", 10.0), _tx("b", 25.0), _tx("c", -40.0)], "c1", False))
+        result = self._sync(_page([], "c2", False, removed=[{"transaction_id": "b"}, {"transaction_id": "m"}]))
+
+        self.assertEqual((result["removed"], result["rows_written"]), (2, 1))
+        self.assertEqual(
+            set(Transactions.objects.filter(account=self.account).values_list("id", flat=True)), {"a", "c"},
+        )
+        self.assertTrue(Transactions.objects.filter(id="m").exists())
+        # Income 40 (c), expense 10 (a): b's 25 is gone; Plaid still owns the balance.
+        self.assertEqual(pending_monthly_flows([self.account.id]), {self.account.id: [("2024-05", 40, 10)]})
+        self.assertEqual(account_balance(self.account.id), 500)
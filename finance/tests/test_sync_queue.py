@@ -0,0 +1,47 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APITestCase
+
+from finance import sync_queue
+from finance.models import PlaidItem, PlaidWebhookEvent
+
+
+def job(item_id, status=sync_queue.STATUS_RECEIVED):
+    return PlaidWebhookEvent.objects.create(item_id=item_id, webhook_type=sync_queue.SYNC_WEBHOOK_TYPE,
+                                            webhook_code=sync_queue.MANUAL_SYNC_CODE, status=status)
+
+
+class ClaimTests(TestCase):
+    def test_processing_job_without_item_does_not_stall_the_queue(self):
+        job(None, sync_queue.STATUS_PROCESSING)
+        waiting = job("item-1")
+        self.assertEqual(sync_queue.claim_next_job("w1"), waiting)
+
+    def test_item_already_processing_is_skipped(self):
+        job("item-1", sync_queue.STATUS_PROCESSING)
+        job("item-1")
+        other = job("item-2")
+        self.assertEqual(sync_queue.claim_next_job("w1"), other)
+
+
+class ManualSyncViewTests(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("manual-sync")
+        self.client.force_authenticate(self.user)
+        PlaidItem.objects.create(user=self.user, item_id="item-1", access_token="access-1")
+
+    def test_other_users_item_is_not_found(self):
+        PlaidItem.objects.create(user=get_user_model().objects.create_user("other"), item_id="item-2",
+                                 access_token="access-2")
+        for item_id in ("item-2", "missing"):
+            response = self.client.post("/api/plaid/transactions/sync/", {"item_id": item_id})
+            self.assertEqual(response.status_code, 404)
+        self.assertFalse(PlaidWebhookEvent.objects.exists())
+
+    def test_reports_coalesced_requests(self):
+        first = self.client.post("/api/plaid/transactions/sync/", {"item_id": "item-1"})
+        self.assertEqual(first.status_code, 202)
+        self.assertEqual((first.data["queued"], first.data["coalesced"], first.data["covered_by"]), (True, False, None))
+        second = self.client.post("/api/plaid/transactions/sync/", {"item_id": "item-1"})
+        self.assertEqual((second.data["queued"], second.data["coalesced"], second.data["covered_by"]),
+                         (False, True, first.data["id"]))
@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta, timezone
+
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+
+from finance.models import Account, Category, Transactions
+
+URL = "/api/transactions/"
+
+
+class TransactionsListQueryCountTests(APITestCase):
+    """Listing transactions costs a fixed number of queries, whatever the number of rows, accounts and categories."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("list")
+        self.client.force_authenticate(self.user)
+        self.added = 0
+
+    def add_rows(self, n):
+        rows = []
+        for i in range(n):
+            self.added += 1
+            category = Category.objects.create(name=f"Cat {self.added}", slug=f"cat-{self.added}")
+            account = Account.objects.create(user=self.user, accountName=f"Account {self.added}")
+            rows.append(Transactions(
+                user=self.user, account=account, category=category, name=f"tx {self.added}", amount=self.added,
+                transactionDate=datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(hours=self.added),
+            ))
+        Transactions.objects.bulk_create(rows)
+
+    def assertListQueries(self, expected, query):
+        for n in (3, 30):
+            self.add_rows(n)
+            with self.assertNumQueries(expected):
+                response = self.client.get(URL, {**query, "page_size": 100})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.data["results"]), self.added)
+            self.assertTrue(all(row["category"] for row in response.data["results"]))
+
+    def test_page_number_list(self):
+        self.assertListQueries(2, {})  # COUNT + one page with the category join
+
+    def test_keyset_list(self):
+        self.assertListQueries(1, {"pagination": "keyset"})
@@ -4,6 +4,7 @@ from rest_framework.routers import DefaultRouter
 from . import views
 from .swagger import schema_view
 from .views import CategoryViewSet
+from .views_analytics import SpendingAnalyticsView
 from .views_plaid import CreatePlaidLinkTokenView, ExchangePublicTokenView, ManualSyncView
 from .views_webhook import PlaidWebhookView
 
@@ -30,6 +31,7 @@ urlpatterns = [ path('', include(router.urls)),
                      name="plaid-exchange-public-token"),
                 path("plaid/webhook/", PlaidWebhookView.as_view(), name="plaid-webhook"),
                 path("plaid/transactions/sync/", ManualSyncView.as_view(), name="plaid-transactions-sync"),
+                path("analytics/spending/", SpendingAnalyticsView.as_view(), name="analytics-spending"),
 path('swagger/', schema_view.with_ui('swagger',
                                          cache_timeout=0), name='schema-swagger-ui'),
 
@@ -1,75 +1,483 @@
 
-from rest_framework import viewsets, permissions
+import csv
+import json
+import operator
+
+from dateutil.relativedelta import relativedelta
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_date
+from django.utils.timezone import localdate, now
+
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import filters, status, viewsets, permissions
+from rest_framework.decorators import action
+from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from django.db.models import QuerySet
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.viewsets import ModelViewSet
 
-from . import models, serializers
-from django.db import transaction as db_tx
+from . import history, models, serializers
+from django.db import IntegrityError, transaction as db_tx
+from .importers import FORMATS, StatementFormatError, StatementImporter, detect_format, iter_statement
+from .mixins import SparseFieldsetQuerysetMixin, sparse_fieldset
 from .models import Transactions, Category
-from .serializers import TransactionsSerializer, CategorySerializer
-from .services import delta_for, apply_delta_to_account
+from .pagination import TransactionsPagination
+from .renderers import CSVStreamRenderer, NDJSONStreamRenderer
+from .search import TransactionSearchFilter
+from .serializers import (
+    CategorySerializer, TransactionsBulkSerializer, TransactionsListSerializer, TransactionsSerializer,
+)
+from .services import TransactionLedger, month_opening_balance, pending_monthly_flows, with_pending_balance
 
 class IsOwner(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         return getattr(obj, 'user_id', None) == request.user.id
 
-class BaseOwnedViewSet(viewsets.ModelViewSet):
+class BaseOwnedViewSet(SparseFieldsetQuerysetMixin, viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated, IsOwner]
     search_fields = ('id',)
-    ordering_fields = '__all__'
-    filterset_fields = '__all__'
+    # Ordering/filtering allowlists stick to indexed columns (see the Meta.indexes of each model);
+    # '__all__' let clients sort a user's whole history by any unindexed column. Every viewset
+    # that should filter lists its own fields: (user, field)-indexed ones, or boolean flags that
+    # only narrow the owner's rows the user_id index already found.
+    ordering_fields = ('id',)
+    filterset_fields = ()
     def get_queryset(self) -> QuerySet:
         return self.queryset.filter(user=self.request.user)
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
-class BillsViewSet(BaseOwnedViewSet): queryset = models.Bills.objects.all(); serializer_class = serializers.BillsSerializer; search_fields=('title','category')
-class PaidMonthsViewSet(BaseOwnedViewSet): queryset = models.PaidMonths.objects.select_related('bills').all(); serializer_class = serializers.PaidMonthsSerializer; search_fields=('accountId',)
-class RecursiveTransactionsViewSet(BaseOwnedViewSet): queryset = models.RecursiveTransactions.objects.all(); serializer_class = serializers.RecursiveTransactionsSerializer; search_fields=('tableName',)
+class BillsViewSet(BaseOwnedViewSet):
+    queryset = models.Bills.objects.all()
+    serializer_class = serializers.BillsSerializer
+    search_fields=('title','category')
+    ordering = ("dueDate", "id")
+    ordering_fields = ("dueDate", "id")                 # bills_user_due_idx
+    filterset_fields = {"dueDate": ["exact", "gte", "lte", "gt", "lt"]}
+
+class PaidMonthsViewSet(BaseOwnedViewSet): queryset = models.PaidMonths.objects.select_related('bills').all(); serializer_class = serializers.PaidMonthsSerializer; search_fields=('accountId',); filterset_fields=('bills',)
+class RecursiveTransactionsViewSet(BaseOwnedViewSet): queryset = models.RecursiveTransactions.objects.all(); serializer_class = serializers.RecursiveTransactionsSerializer; search_fields=('tableName',); filterset_fields=('sourceId',)  # recursivetx_user_source_idx
 class TransactionsViewSet(BaseOwnedViewSet):
-    queryset = models.Transactions.objects.select_related('account').all()
+    queryset = models.Transactions.objects.select_related('category').all()
     serializer_class = TransactionsSerializer
-    search_fields=('name','merchantName','category','currencyCode')
+    # Read by TransactionSearchFilter: local fields use the trigram indexes (0014), category via a subquery.
+    search_fields = ("name", "merchantName", "category__name", "category__description")
+    # Search runs last so its relevance order wins unless ?ordering= is given.
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, TransactionSearchFilter]
+    pagination_class = TransactionsPagination
+    ordering = ("-transactionDate", "-id")
+    ordering_fields = ("transactionDate", "id")         # tx_user_date_idx
+    filterset_fields = {
+        "account": ["exact"],                           # tx_user_account_date_idx
+        "category": ["exact", "isnull"],                # tx_user_category_date_idx
+        "transactionDate": ["exact", "gte", "lte", "gt", "lt"],
+    }
+
+    # Columns TransactionsListSerializer reads; category name comes from the join.
+    list_only_fields = TransactionsListSerializer.Meta.fields[:-1] + ("category__name",)
 
     def get_queryset(self):
-        qs = super().get_queryset()
-        if self.request.user.is_authenticated:
-            qs = qs.filter(user=self.request.user)
+        qs = super().get_queryset()  # already scoped to request.user
+        if self.action == "list":
+            qs = qs.only(*self.list_only_fields)
         return qs
 
+    def get_serializer_class(self):
+        if self.action == "list":
+            return TransactionsListSerializer
+        return super().get_serializer_class()
+
     def perform_destroy(self, instance: Transactions):
         # deleting a tx should undo its effect
         with db_tx.atomic():
-            d = delta_for(instance.amount, instance.isIncome)
-            apply_delta_to_account(instance.account_id, -d)
+            ledger = TransactionLedger()
+            ledger.remove(instance)
+            ledger.save()
             super().perform_destroy(instance)
 
-class GoalViewSet(BaseOwnedViewSet): queryset = models.Goal.objects.all(); serializer_class = serializers.GoalSerializer; search_fields=('goalName','goalType','goalCategory')
-class AchievedViewSet(BaseOwnedViewSet): queryset = models.Achieved.objects.select_related('goal').all(); serializer_class = serializers.AchievedSerializer; search_fields=('owner_id',)
-class BudgetViewSet(BaseOwnedViewSet): queryset = models.Budget.objects.all(); serializer_class = serializers.BudgetSerializer; search_fields=('title',)
+    # ---- /transactions/export/ ----------------------------------------------
+    # GET ?format=csv|ndjson plus the usual list filters (account, category,
+    # transactionDate__gte/__lt, search, ordering) and ?fields=/?exclude=. Rows are read with a
+    # server-side cursor and written out chunk by chunk, so memory stays flat
+    # and the CSV header goes out before the query runs; NDJSON starts with
+    # its first record.
+    export_chunk_size = 2000
+    export_columns = (
+        ("id", "id"),
+        ("transactionDate", "transactionDate"),
+        ("name", "name"),
+        ("merchantName", "merchantName"),
+        ("amount", "amount"),
+        ("isIncome", "isIncome"),
+        ("currencyCode", "currencyCode"),
+        ("account", "account_id"),
+        ("category", "category__name"),
+        ("note", "note"),
+    )
+
+    @action(detail=False, methods=["get"], url_path="export",
+            renderer_classes=[CSVStreamRenderer, NDJSONStreamRenderer])
+    def export(self, request):
+        fmt = request.accepted_renderer.format
+        only, exclude = sparse_fieldset(request)
+        columns = [
+            (name, src) for name, src in self.export_columns
+            if (only is None or name in only) and name not in exclude
+        ] or list(self.export_columns)
+        qs = self.filter_queryset(self.get_queryset())
+        rows = qs.values_list(*(src for _, src in columns)).iterator(chunk_size=self.export_chunk_size)
+        headers = [name for name, _ in columns]
+        stream = _export_csv(headers, rows) if fmt == "csv" else _export_ndjson(headers, rows)
+
+        response = StreamingHttpResponse(stream, content_type=request.accepted_renderer.media_type)
+        stamp = now().strftime("%Y%m%d")
+        response["Content-Disposition"] = f'attachment; filename="transactions-{stamp}.{fmt}"'
+        response["X-Accel-Buffering"] = "no"  # let nginx pass chunks through
+        return response
+
+    # ---- /transactions/bulk/ ------------------------------------------------
+    # POST   [{...}, ...]                  create rows
+    # PATCH  [{"id": ..., ...}, ...]       partial update of existing rows
+    # DELETE {"ids": [...]}                delete rows
+    # All rows are validated first; if any fails nothing is written and the
+    # response lists the errors by row index. Otherwise every row is written in
+    # one transaction with bulk_create/bulk_update/delete and balance/monthly
+    # deltas are summed per (account, month) into one ledger row each.
+    bulk_max_rows = 1000
+
+    @action(detail=False, methods=["post", "patch", "delete"], url_path="bulk")
+    def bulk(self, request):
+        if request.method == "DELETE":
+            if not isinstance(request.data, dict):
+                return Response({"detail": 'Expected {"ids": [...]}.'}, status=status.HTTP_400_BAD_REQUEST)
+            rows = request.data.get("ids")
+        else:
+            rows = request.data
+            if isinstance(rows, dict):
+                rows = rows.get("transactions")
+        if not isinstance(rows, list) or not rows:
+            return Response({"detail": "Expected a non-empty list."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(rows) > self.bulk_max_rows:
+            return Response({"detail": f"At most {self.bulk_max_rows} rows per request."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        if request.method == "POST":
+            return self._bulk_create(request, rows)
+        if request.method == "PATCH":
+            return self._bulk_update(request, rows)
+        return self._bulk_delete(request, rows)
+
+    def _bulk_context(self, request, rows):
+        """Serializer context with every referenced account/category loaded in one query each."""
+        def ids(key):
+            out = set()
+            for row in rows:
+                try:
+                    out.add(int(row[key]))
+                except (KeyError, TypeError, ValueError):
+                    pass
+            return out
+        related = {
+            "account": models.Account.objects.filter(user=request.user).in_bulk(ids("account")),
+            "category": Category.objects.in_bulk(ids("category")),
+        }
+        return {**self.get_serializer_context(), "related": related}
+
+    @staticmethod
+    def _bulk_pk(value):
+        return str(value) if isinstance(value, (str, int)) and value != "" else None
+
+    @staticmethod
+    def _bulk_errors(errors):
+        return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+    def _bulk_create(self, request, rows):
+        context = self._bulk_context(request, rows)
+        objs, errors = [], []
+        for i, row in enumerate(rows):
+            ser = TransactionsBulkSerializer(data=row, context=context)
+            if not ser.is_valid():
+                errors.append({"index": i, "errors": ser.errors})
+                continue
+            objs.append(Transactions(**ser.validated_data, user=request.user, ownerId=str(request.user.id)))
+        if errors:
+            return self._bulk_errors(errors)
+
+        ledger = TransactionLedger()
+        for obj in objs:
+            ledger.add(obj)
+        with db_tx.atomic():
+            Transactions.objects.bulk_create(objs)
+            ledger.save()
+        return Response({"created": len(objs), "results": TransactionsSerializer(objs, many=True).data},
+                        status=status.HTTP_201_CREATED)
+
+    def _bulk_update(self, request, rows):
+        context = self._bulk_context(request, rows)
+        with db_tx.atomic():
+            keys = [self._bulk_pk(row.get("id")) if isinstance(row, dict) else None for row in rows]
+            instances = (
+                self.get_queryset().select_related("category").select_for_update(of=("self",))
+                .in_bulk([k for k in keys if k])
+            )
+            objs, fields, errors = [], set(), []
+            ledger = TransactionLedger()
+            seen = set()
+            for i, (row, key) in enumerate(zip(rows, keys)):
+                instance = instances.get(key)
+                if instance is None:
+                    errors.append({"index": i, "errors": {"id": ["Not found."]}})
+                    continue
+                if instance.pk in seen:
+                    errors.append({"index": i, "errors": {"id": ["Duplicate id in this batch."]}})
+                    continue
+                seen.add(instance.pk)
+                ser = TransactionsBulkSerializer(instance, data=row, partial=True, context=context)
+                if not ser.is_valid():
+                    errors.append({"index": i, "id": instance.pk, "errors": ser.errors})
+                    continue
+                ledger.remove(instance)
+                for attr, value in ser.validated_data.items():
+                    setattr(instance, attr, value)
+                    fields.add(attr)
+                ledger.add(instance)
+                objs.append(instance)
+            if errors:
+                db_tx.set_rollback(True)
+                return self._bulk_errors(errors)
+            if fields:
+                Transactions.objects.bulk_update(objs, sorted(fields), batch_size=500)
+            ledger.save()
+        return Response({"updated": len(objs), "results": TransactionsSerializer(objs, many=True).data})
+
+    def _bulk_delete(self, request, ids):
+        keys = [self._bulk_pk(pk) for pk in ids]
+        with db_tx.atomic():
+            instances = self.get_queryset().select_for_update(of=("self",)).in_bulk([k for k in keys if k])
+            errors = [
+                {"index": i, "errors": {"id": ["Not found."]}}
+                for i, key in enumerate(keys) if key not in instances
+            ]
+            if errors:
+                return self._bulk_errors(errors)
+            ledger = TransactionLedger()
+            for obj in instances.values():
+                ledger.remove(obj)
+            Transactions.objects.filter(pk__in=list(instances)).delete()
+            ledger.save()
+        return Response({"deleted": len(instances)})
+
+    # ---- /transactions/import/ ----------------------------------------------
+    # POST multipart: file=<statement>, account=<id>, optional format=csv|ofx|qif
+    # (default: from the file name/contents), dayfirst=true for 31/01 dates and
+    # columns={"date": "Booking date", ...} to map CSV headers the aliases miss.
+    # The upload is parsed as a stream and written in bulk_create batches; lines
+    # already imported (same content hash) are skipped. See finance.importers.
+    @action(detail=False, methods=["post"], url_path="import", parser_classes=[MultiPartParser, FormParser])
+    def import_statement(self, request):
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response({"file": ["This field is required."]}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            account = models.Account.objects.filter(user=request.user, pk=int(request.data.get("account"))).first()
+        except (TypeError, ValueError):
+            account = None
+        if account is None:
+            return Response({"account": ["Not found."]}, status=status.HTTP_400_BAD_REQUEST)
+        fmt = (request.data.get("format") or "").lower() or detect_format(upload.name, upload)
+        if fmt not in FORMATS:
+            return Response({"format": [f"Expected one of {', '.join(FORMATS)}."]}, status=status.HTTP_400_BAD_REQUEST)
+        columns = request.data.get("columns") or None
+        if columns:
+            try:
+                columns = json.loads(columns)
+            except ValueError:
+                columns = None
+            if not isinstance(columns, dict):
+                return Response({"columns": ["Expected a JSON object of field -> header."]},
+                                status=status.HTTP_400_BAD_REQUEST)
+        dayfirst = str(request.data.get("dayfirst", "")).lower() in ("1", "true", "yes")
+
+        lines = iter_statement(upload.file, fmt, columns=columns, dayfirst=dayfirst)
+        try:
+            result = StatementImporter(account).run(lines)
+        except StatementFormatError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except IntegrityError:
+            # Another import of the same lines committed first.
+            return Response({"detail": "This statement is already being imported; retry to skip the rows it added."},
+                            status=status.HTTP_409_CONFLICT)
+        return Response({"format": fmt, **result}, status=status.HTTP_201_CREATED)
+
+class _Echo:
+    """csv.writer target that hands each formatted line straight back."""
+    def write(self, value):
+        return value
+
+
+def _export_csv(headers, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(headers)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def _export_ndjson(headers, rows):
+    # NDJSON has no header line: the body starts with the first record, and an empty export is empty.
+    for row in rows:
+        yield json.dumps(dict(zip(headers, row)), cls=DjangoJSONEncoder) + "\n"
+
+
+class GoalViewSet(BaseOwnedViewSet): queryset = models.Goal.objects.all(); serializer_class = serializers.GoalSerializer; search_fields=('goalName','goalType','goalCategory'); filterset_fields=('isCompleted',)  # flag on the owner's rows (user_id index)
+class AchievedViewSet(BaseOwnedViewSet): queryset = models.Achieved.objects.select_related('goal').all(); serializer_class = serializers.AchievedSerializer; search_fields=('owner_id',); filterset_fields=('goal',)
+class BudgetViewSet(BaseOwnedViewSet): queryset = models.Budget.objects.all(); serializer_class = serializers.BudgetSerializer; search_fields=('title',); filterset_fields=('type',)  # budget_user_type_idx
 class AccountViewSet(BaseOwnedViewSet):
     queryset = models.Account.objects.all()
     serializer_class = serializers.AccountSerializer
     search_fields=('accountName','officialAccountName','accountNumber','accountType')
     ordering = ("accountName", "id")
     ordering_fields = ("accountName", "updatedDate", "createdDate", "id")
+    filterset_fields = ("plaidItem",)
+
+    def get_queryset(self):
+        # currentBalance is served as rolled-up value + pending ledger deltas.
+        return with_pending_balance(super().get_queryset())
+
+    # ---- /accounts/{id}/balance-history/ ------------------------------------
+    # GET ?interval=day|week|month (default day), ?from= / ?to= (YYYY-MM-DD,
+    # default: the year up to today). Closing balance per bucket, derived from
+    # the current balance and the account's transactions; see finance.history.
+    @action(detail=True, methods=["get"], url_path="balance-history")
+    def balance_history(self, request, pk=None):
+        account = self.get_object()
+        interval = request.query_params.get("interval") or "day"
+        if interval not in history.INTERVALS:
+            return Response({"interval": [f"Expected one of {', '.join(history.INTERVALS)}."]},
+                            status=status.HTTP_400_BAD_REQUEST)
+        bounds = {}
+        for param in ("from", "to"):
+            raw = request.query_params.get(param)
+            try:
+                bounds[param] = parse_date(raw) if raw else None
+            except ValueError:
+                bounds[param] = None
+            if raw and bounds[param] is None:
+                return Response({param: ["Expected a date, YYYY-MM-DD."]}, status=status.HTTP_400_BAD_REQUEST)
+        end = bounds["to"] or localdate()
+        start = bounds["from"] or end - relativedelta(years=1)
+        if start > end:
+            return Response({"from": ["Must not be after 'to'."]}, status=status.HTTP_400_BAD_REQUEST)
+        if history.count_buckets(start, end, interval) > history.MAX_POINTS:
+            return Response({"detail": f"At most {history.MAX_POINTS} points per request; narrow the range or "
+                                       f"use a longer interval."}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            "account": account.pk,
+            "interval": interval,
+            "from": start,
+            "to": end,
+            "currency": account.isoCurrencyCode or account.unofficialCurrencyCode,
+            "results": history.balance_history(account, start, end, interval),
+        })
+
+class AccountBalancesViewSet(BaseOwnedViewSet):
+    queryset = models.AccountBalances.objects.select_related('account').all()
+    serializer_class = serializers.AccountBalancesSerializer
+    ordering = ("account", "balanceMonth")
+    ordering_fields = ("balanceMonth", "id")
+    filterset_fields = {
+        "account": ["exact"],                           # accountbalances_account_month_uniq
+        "balanceMonth": ["exact", "gte", "lte"],
+    }
+
+    # Filter lookups a month synthesized from the ledger is checked against, as the database would.
+    PENDING_LOOKUPS = {"exact": operator.eq, "gte": operator.ge, "lte": operator.le}
+
+    def pending_flows(self):
+        """Flows written since the last rollup, read once per request."""
+        if not hasattr(self, "_pending_flows"):
+            owned = models.Account.objects.filter(user=self.request.user).values("id")
+            self._pending_flows = pending_monthly_flows(owned)
+        return self._pending_flows
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.request is not None and self.request.method == "GET":
+            # The serializer adds these to the stored rows.
+            context["pending_flows"] = self.pending_flows()
+        return context
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = queryset
+        synthesized = self.pending_only_months(queryset)
+        if synthesized:
+            rows = list(queryset) + synthesized
+            for field in reversed(filters.OrderingFilter().get_ordering(request, queryset, self) or ()):
+                name = field.lstrip("-")
+                rows.sort(key=lambda row: (row.serializable_value(name) is None, row.serializable_value(name)),
+                          reverse=field.startswith("-"))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(rows, many=True).data)
 
-class AccountBalancesViewSet(BaseOwnedViewSet): queryset = models.AccountBalances.objects.select_related('account').all(); serializer_class = serializers.AccountBalancesSerializer
-class BalancesViewSet(BaseOwnedViewSet): queryset = models.Balances.objects.select_related('accountBalances').all(); serializer_class = serializers.BalancesSerializer
-class AssetViewSet(BaseOwnedViewSet): queryset = models.Asset.objects.all(); serializer_class = serializers.AssetSerializer; search_fields=('name','location')
-class PremiumViewSet(BaseOwnedViewSet): queryset = models.Premium.objects.all(); serializer_class = serializers.PremiumSerializer
-class DevicesViewSet(BaseOwnedViewSet): queryset = models.Devices.objects.all(); serializer_class = serializers.DevicesSerializer; search_fields=('deviceName','model','brand')
-class LoginInformationViewSet(BaseOwnedViewSet): queryset = models.LoginInformation.objects.select_related('devices').all(); serializer_class = serializers.LoginInformationSerializer
-class FeedBackViewSet(BaseOwnedViewSet): queryset = models.FeedBack.objects.all(); serializer_class = serializers.FeedBackSerializer; search_fields=('package','user')
+    def pending_only_months(self, queryset):
+        """
+        Unsaved rows (id null) for the months that so far only exist in the
+        ledger, opened from the previous month's closing balance as the next
+        rollup will create them, and kept only if they pass the request's filters.
+        """
+        pending = self.pending_flows()
+        if not pending or self.request.query_params.get(api_settings.SEARCH_PARAM):  # ?search= matches ids
+            return []
+        stored = set(
+            models.AccountBalances.objects.filter(account_id__in=list(pending))
+            .values_list("account_id", "balanceMonth")
+        )
+        missing = [
+            (account_id, month) for account_id, flows in pending.items() for month, income, expense in flows
+            if (income or expense) and (account_id, month) not in stored  # writes that cancelled out add no month
+        ]
+        if not missing:
+            return []
+        filterset = DjangoFilterBackend().get_filterset(self.request, queryset, self)
+        filterset.is_valid()  # filter_queryset already rejected invalid params
+        checks = [
+            (filterset.filters[name].field_name, self.PENDING_LOOKUPS[filterset.filters[name].lookup_expr],
+             getattr(value, "pk", value))
+            for name, value in filterset.form.cleaned_data.items() if value not in (None, "")
+        ]
+        openings = dict(
+            models.Account.objects.filter(id__in={account_id for account_id, _ in missing})
+            .values_list("id", "openingBalance")
+        )
+        rows = []
+        for account_id, month in missing:
+            row = models.AccountBalances(
+                user=self.request.user, ownerId=str(self.request.user.pk), account_id=account_id,
+                balanceMonth=month, income=0, expanses=0,
+            )
+            if all(compare(row.serializable_value(field), value) for field, compare, value in checks):
+                row.balance = month_opening_balance(account_id, month, openings.get(account_id))
+                rows.append(row)
+        return rows
+class BalancesViewSet(BaseOwnedViewSet): queryset = models.Balances.objects.select_related('accountBalances').all(); serializer_class = serializers.BalancesSerializer; filterset_fields=('accountBalances',)
+class AssetViewSet(BaseOwnedViewSet): queryset = models.Asset.objects.all(); serializer_class = serializers.AssetSerializer; search_fields=('name','location'); filterset_fields=('addRevenueToAccount',)  # flag on the owner's rows (user_id index)
+class PremiumViewSet(BaseOwnedViewSet): queryset = models.Premium.objects.all(); serializer_class = serializers.PremiumSerializer; filterset_fields=('isActive',)  # flag on the owner's rows (user_id index)
+class DevicesViewSet(BaseOwnedViewSet): queryset = models.Devices.objects.all(); serializer_class = serializers.DevicesSerializer; search_fields=('deviceName','model','brand'); filterset_fields=('deviceId',)  # devices_user_device_idx
+class LoginInformationViewSet(BaseOwnedViewSet): queryset = models.LoginInformation.objects.select_related('devices').all(); serializer_class = serializers.LoginInformationSerializer; filterset_fields=('devices',)
+class FeedBackViewSet(BaseOwnedViewSet): queryset = models.FeedBack.objects.all(); serializer_class = serializers.FeedBackSerializer; search_fields=('package','user'); filterset_fields={'createdDate': ['exact', 'gte', 'lte']}
 
 
 class CategoryPagination(PageNumberPagination):
     page_size = 100  # default page size
     max_page_size = 1000  # allow clients to override up to this via ?page_size=
 
-class CategoryViewSet(ModelViewSet):
+class CategoryViewSet(SparseFieldsetQuerysetMixin, ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [IsAuthenticated]
@@ -0,0 +1,64 @@
+from dateutil.relativedelta import relativedelta
+from django.utils.dateparse import parse_date
+from django.utils.timezone import localdate
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .analytics import DIMENSIONS, INTERVALS, spending_breakdown
+
+
+class SpendingAnalyticsView(APIView):
+    """
+    GET /analytics/spending/ — money out and money in of the user's transactions,
+    grouped in the database.
+
+    ?group_by=category,merchant,account (any subset, in that order of nesting; default
+    category, empty for plain totals), ?interval=day|week|month to also split by period,
+    ?from= / ?to= (YYYY-MM-DD, inclusive; default the year up to today) and
+    ?account=<id> (repeatable) to narrow the accounts. Undated transactions are left out.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        params = request.query_params
+        raw_group_by = params.get("group_by", "category")
+        group_by = [name.strip() for name in raw_group_by.split(",") if name.strip()]
+        unknown = [name for name in group_by if name not in DIMENSIONS]
+        if unknown or len(set(group_by)) != len(group_by):
+            return Response({"group_by": [f"Expected distinct values out of {', '.join(DIMENSIONS)}."]},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        interval = params.get("interval") or None
+        if interval is not None and interval not in INTERVALS:
+            return Response({"interval": [f"Expected one of {', '.join(INTERVALS)}."]},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        bounds = {}
+        for param in ("from", "to"):
+            raw = params.get(param)
+            try:
+                bounds[param] = parse_date(raw) if raw else None
+            except ValueError:
+                bounds[param] = None
+            if raw and bounds[param] is None:
+                return Response({param: ["Expected a date, YYYY-MM-DD."]}, status=status.HTTP_400_BAD_REQUEST)
+        end = bounds["to"] or localdate()
+        start = bounds["from"] or end - relativedelta(years=1)
+        if start > end:
+            return Response({"from": ["Must not be after 'to'."]}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            accounts = [int(pk) for value in params.getlist("account") for pk in value.split(",") if pk.strip()]
+        except ValueError:
+            return Response({"account": ["Expected account ids."]}, status=status.HTTP_400_BAD_REQUEST)
+
+        result = spending_breakdown(request.user.id, start, end, group_by, interval, accounts)
+        return Response({
+            "from": start,
+            "to": end,
+            "group_by": group_by,
+            "interval": interval,
+            **result,
+        })
@@ -1,8 +1,14 @@
+import hashlib
+from typing import Optional
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
 from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Min
+from django.utils.dateparse import parse_datetime
 
 from .plaid_client import get_plaid_client
 from plaid.model.link_token_create_request import LinkTokenCreateRequest
@@ -26,7 +32,8 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
 
 from .plaid_client import get_plaid_client
-from .models import Account
+from .models import Account, PlaidItem
+from .services import discard_pending_deltas, invalidate_spending_analytics, reset_opening_balance
 
 # Plaid imports
 from plaid.model.item_public_token_exchange_request import ItemPublicTokenExchangeRequest
@@ -35,6 +42,46 @@ from plaid.model.accounts_get_request import AccountsGetRequest
 from .views_webhook import _kick_off_transactions_sync
 
 
+def _link_token_cache_key(user_id) -> str:
+    return f"plaid:link_token:{user_id}"
+
+
+def _token_fingerprint(access_token) -> str:
+    # Never put the access token itself into the cache.
+    return hashlib.sha256(access_token.encode()).hexdigest()[:16] if access_token else ""
+
+
+def _get_cached_link_token(user_id, mode: str, access_token) -> Optional[dict]:
+    """A still-valid link token issued for this user in the same mode (and item, in update mode)."""
+    entry = cache.get(_link_token_cache_key(user_id))
+    if not entry or entry["mode"] != mode or entry["item"] != _token_fingerprint(access_token):
+        return None
+    return entry
+
+
+def _cache_link_token(user_id, mode: str, access_token, link_token, expiration) -> None:
+    """Keep ``link_token`` until shortly before its Plaid ``expiration``."""
+    if not link_token or not expiration:
+        return
+    if isinstance(expiration, str):
+        expiration = parse_datetime(expiration)
+        if expiration is None:
+            return
+    ttl = (expiration - now()).total_seconds() - getattr(settings, "PLAID_LINK_TOKEN_CACHE_MARGIN", 300)
+    if ttl <= 0:
+        return
+    cache.set(
+        _link_token_cache_key(user_id),
+        {"mode": mode, "item": _token_fingerprint(access_token), "link_token": link_token, "expiration": expiration},
+        timeout=int(ttl),
+    )
+
+
+def invalidate_link_token_cache(user_id) -> None:
+    """Forget the user's cached link token (their linked items changed)."""
+    cache.delete(_link_token_cache_key(user_id))
+
+
 class CreatePlaidLinkTokenView(APIView):
     """
     POST /api/plaid/link-token/
@@ -44,18 +91,34 @@ class CreatePlaidLinkTokenView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        client = get_plaid_client()
-
         phone_number = self.request.user.username  # optional
         client_user_id = str(self.request.user.id)
 
-        qs = Account.objects.filter(user=self.request.user).exclude(plaid_access_token__isnull=True).exclude(plaid_access_token="")
-        already_linked = qs.exists()
-        linked_accounts = qs.count()
+        # Link state in one round trip: how many linked accounts, and a token for update mode.
+        state = (
+            Account.objects
+            .filter(user=self.request.user, plaidItem__access_token__gt="")
+            .aggregate(linked_accounts=Count("id"), access_token=Min("plaidItem__access_token"))
+        )
+        linked_accounts = state["linked_accounts"]
+        already_linked = linked_accounts > 0
+        access_token_for_update = state["access_token"]
+        resolved_mode = "update" if access_token_for_update else "add"
+
+        cached = _get_cached_link_token(request.user.id, resolved_mode, access_token_for_update)
+        if cached:
+            return Response(
+                {
+                    "link_token": cached["link_token"],
+                    "expiration": cached["expiration"],
+                    "already_linked": already_linked,
+                    "linked_accounts": linked_accounts,
+                    "mode": resolved_mode,
+                },
+                status=status.HTTP_200_OK,
+            )
 
-        access_token_for_update = None
-        if already_linked:
-            access_token_for_update = qs.values_list("plaid_access_token", flat=True).first()
+        client = get_plaid_client()
 
         # Build the request user object
         user = LinkTokenCreateRequestUser(
@@ -94,7 +157,6 @@ class CreatePlaidLinkTokenView(APIView):
                 account_filters=filters,
                 access_token=access_token_for_update,
             )
-            resolved_mode = "update"
         else:
             req = LinkTokenCreateRequest(
                 user=user,
@@ -105,11 +167,12 @@ class CreatePlaidLinkTokenView(APIView):
                 language="en",
                 account_filters=filters,
             )
-            resolved_mode = "add"
 
         try:
             res = client.link_token_create(req)
             data = res.to_dict() if hasattr(res, "to_dict") else dict(res)
+            _cache_link_token(request.user.id, resolved_mode, access_token_for_update,
+                              data.get("link_token"), data.get("expiration"))
             return Response(
                 {
                     "link_token": data.get("link_token"),
@@ -161,7 +224,13 @@ class ExchangePublicTokenView(APIView):
     """
     permission_classes = [IsAuthenticated]
 
-    @transaction.atomic
+    # Written on every (re-)link; everything else about an existing account is left alone.
+    UPSERT_FIELDS = [
+        "isInternalAccount", "accountName", "officialAccountName", "accountType", "subAccountType",
+        "accountNumber", "currentBalance", "availableBalance", "isoCurrencyCode",
+        "public_token", "plaid_access_token", "plaid_item_id", "plaidItem", "institution_name", "mask", "updatedDate",
+    ]
+
     def post(self, request):
         user = request.user
         public_token = request.data.get("public_token")
@@ -172,6 +241,9 @@ class ExchangePublicTokenView(APIView):
 
         client = get_plaid_client()
 
+        # Both Plaid calls happen before any DB transaction is opened, so a slow
+        # Plaid response never holds a connection idle in transaction.
+
         # 1) Exchange public_token -> access_token, item_id
         try:
             exch_req = ItemPublicTokenExchangeRequest(public_token=public_token)
@@ -195,75 +267,59 @@ class ExchangePublicTokenView(APIView):
             msg = getattr(e, "body", None) or str(e)
             return Response({"detail": f"Plaid accounts error: {msg}"}, status=400)
 
-        # 3) Upsert each account for this user
-        imported = []
-        for a in plaid_accounts:
-            acct_id = a.get("account_id")
-            name = a.get("name") or ""
-            official_name = a.get("official_name") or ""
-            mask = a.get("mask") or ""
-            t = a.get("type")
-            st = a.get("subtype")
-            balances = a.get("balances") or {}
-
-            accountType, subAccountType = _map_plaid_type_subtype(t, st)
-
-            # Most reliable balances:
-            current = balances.get("current")
-            available = balances.get("available")
-            iso_code = balances.get("iso_currency_code") or balances.get("unofficial_currency_code")
-
-            # Mask as ****1234 if present
-            masked_number = f"****{mask}" if mask else None
-
-            # Account upsert key: (user, external account_id)
-            obj, created = Account.objects.get_or_create(
-                user=user,
-                accountId=acct_id,
+        # 3) Upsert the item and all of its accounts in one short transaction
+        ts = now()
+        acct_ids = [a.get("account_id") for a in plaid_accounts if a.get("account_id")]
+        with transaction.atomic():
+            item, _ = PlaidItem.objects.update_or_create(
+                item_id=item_id,
                 defaults=dict(
-                    isInternalAccount=False,
-                    accountName=name or official_name or "Linked account",
-                    officialAccountName=official_name or name,
-                    accountType=accountType,
-                    subAccountType=subAccountType,
-                    accountNumber=masked_number,
-                    currentBalance=current,
-                    availableBalance=available,
-                    isoCurrencyCode=iso_code,
-                    public_token=public_token,              # per requirement
-                    plaid_access_token=access_token,
-                    plaid_item_id=item_id,
+                    user=user,
+                    ownerId=str(user.id),
+                    access_token=access_token,
                     institution_name=institution_name,
-                    mask=mask or None,
-                    updatedDate=now(),
                 ),
             )
 
-            if not created:
-                # Update fields on re-link / re-import
-                obj.isInternalAccount = False
-                obj.accountName = name or obj.accountName
-                obj.officialAccountName = official_name or obj.officialAccountName
-                obj.accountType = accountType
-                obj.subAccountType = subAccountType
-                obj.accountNumber = masked_number or obj.accountNumber
-                obj.currentBalance = current if current is not None else obj.currentBalance
-                obj.availableBalance = available if available is not None else obj.availableBalance
-                obj.isoCurrencyCode = iso_code or obj.isoCurrencyCode
-                obj.public_token = public_token  # (optional) keep last seen
-                obj.plaid_access_token = access_token
-                obj.plaid_item_id = item_id
-                obj.institution_name = institution_name or obj.institution_name
-                obj.mask = mask or obj.mask
-                obj.updatedDate = now()
-                obj.save(update_fields=[
-                    "isInternalAccount","accountName","officialAccountName","accountType","subAccountType",
-                    "accountNumber","currentBalance","availableBalance","isoCurrencyCode",
-                    "public_token","plaid_access_token","plaid_item_id","institution_name","mask","updatedDate"
-                ])
+            # Existing rows are needed to keep their values where Plaid sent none.
+            existing = {
+                acc.accountId: acc
+                for acc in Account.objects.select_for_update().filter(user=user, accountId__in=acct_ids)
+            }
+
+            rows = {}
+            for a in plaid_accounts:
+                acct_id = a.get("account_id")
+                if not acct_id:
+                    continue
+                rows[acct_id] = self._account_row(
+                    user, item, a, existing.get(acct_id), public_token, access_token, institution_name, ts,
+                )
+
+            Account.objects.bulk_create(
+                list(rows.values()),
+                update_conflicts=True,
+                unique_fields=["user", "accountId"],
+                update_fields=self.UPSERT_FIELDS,
+            )
+            pks = dict(
+                Account.objects.filter(user=user, accountId__in=list(rows)).values_list("accountId", "id")
+            )
+            # Plaid's current balance replaces ours, pending ledger deltas included; the opening
+            # balance (and so every monthly closing balance) follows it.
+            overwritten = [
+                pks[a.get("account_id")] for a in plaid_accounts
+                if a.get("account_id") in pks and (a.get("balances") or {}).get("current") is not None
+            ]
+            discard_pending_deltas(overwritten)
+            reset_opening_balance(overwritten)
+            # bulk_create sends no post_save, and analytics show the (possibly renamed) accounts.
+            invalidate_spending_analytics([user.id])
 
+        imported = []
+        for acct_id, obj in rows.items():
             imported.append({
-                "id": obj.id,
+                "id": pks.get(acct_id),
                 "accountId": obj.accountId,
                 "accountName": obj.accountName,
                 "accountType": obj.accountType,
@@ -273,9 +329,15 @@ class ExchangePublicTokenView(APIView):
                 "availableBalance": obj.availableBalance,
                 "isoCurrencyCode": obj.isoCurrencyCode,
                 "institution_name": obj.institution_name,
-                "created": created,
+                "created": acct_id not in existing,
             })
 
+        # The user's link state changed (add -> update mode, or a new item token).
+        invalidate_link_token_cache(user.id)
+
+        # 4) Pull the item's transaction history in the background (run_sync_workers).
+        job = _kick_off_transactions_sync(item_id)
+
         # (Optional) Since public_token is one-time, you can clear it after success:
         # Account.objects.filter(user=user, plaid_item_id=item_id).update(public_token=None)
 
@@ -283,8 +345,73 @@ class ExchangePublicTokenView(APIView):
             "item_id": item_id,
             "imported_count": len(imported),
             "accounts": imported,
+            "sync_job_id": job.id,
         }, status=200)
 
+    @staticmethod
+    def _account_row(user, item, a, existing, public_token, access_token, institution_name, ts) -> Account:
+        """Build the Account to upsert for Plaid account ``a``, falling back to ``existing`` values."""
+        name = a.get("name") or ""
+        official_name = a.get("official_name") or ""
+        mask = a.get("mask") or ""
+        balances = a.get("balances") or {}
+
+        accountType, subAccountType = _map_plaid_type_subtype(a.get("type"), a.get("subtype"))
+
+        # Most reliable balances:
+        current = balances.get("current")
+        available = balances.get("available")
+        iso_code = balances.get("iso_currency_code") or balances.get("unofficial_currency_code")
+
+        # Mask as ****1234 if present
+        masked_number = f"****{mask}" if mask else None
+
+        if existing is None:
+            return Account(
+                user=user,
+                ownerId=str(user.id),
+                accountId=a.get("account_id"),
+                isInternalAccount=False,
+                accountName=name or official_name or "Linked account",
+                officialAccountName=official_name or name,
+                accountType=accountType,
+                subAccountType=subAccountType,
+                accountNumber=masked_number,
+                currentBalance=current,
+                availableBalance=available,
+                isoCurrencyCode=iso_code,
+                public_token=public_token,              # per requirement
+                plaid_access_token=access_token,
+                plaid_item_id=item.item_id,
+                plaidItem=item,
+                institution_name=institution_name,
+                mask=mask or None,
+                updatedDate=ts,
+            )
+
+        # Re-link / re-import: keep what we have where Plaid sent nothing
+        return Account(
+            user=user,
+            ownerId=existing.ownerId,
+            accountId=existing.accountId,
+            isInternalAccount=False,
+            accountName=name or existing.accountName,
+            officialAccountName=official_name or existing.officialAccountName,
+            accountType=accountType,
+            subAccountType=subAccountType,
+            accountNumber=masked_number or existing.accountNumber,
+            currentBalance=current if current is not None else existing.currentBalance,
+            availableBalance=available if available is not None else existing.availableBalance,
+            isoCurrencyCode=iso_code or existing.isoCurrencyCode,
+            public_token=public_token,  # (optional) keep last seen
+            plaid_access_token=access_token,
+            plaid_item_id=item.item_id,
+            plaidItem=item,
+            institution_name=institution_name or existing.institution_name,
+            mask=mask or existing.mask,
+            updatedDate=ts,
+        )
+
 
 class ManualSyncView(APIView):
     permission_classes = [IsAuthenticated]
@@ -292,5 +419,14 @@ class ManualSyncView(APIView):
         item_id = request.data.get("item_id")
         if not item_id:
             return Response({"detail": "item_id required"}, status=400)
-        _kick_off_transactions_sync(item_id)
-        return Response({"ok": True})
\ No newline at end of file
+        if not PlaidItem.objects.filter(item_id=item_id, user=request.user).exists():
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+        job = _kick_off_transactions_sync(item_id)
+        # A job already waiting for this item absorbs the request: it is not queued on its own.
+        return Response({
+            "ok": True,
+            "id": job.id,
+            "queued": job.covered_by_id is None,
+            "coalesced": job.covered_by_id is not None,
+            "covered_by": job.covered_by_id,
+        }, status=status.HTTP_202_ACCEPTED)
\ No newline at end of file
@@ -1,3 +1,5 @@
+from datetime import timedelta
+
 from django.conf import settings
 from django.utils.timezone import now
 from rest_framework.views import APIView
@@ -8,33 +10,29 @@ from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 
 from .models import PlaidWebhookEvent
-from .models import Account
-from .services import sync_plaid_item_transactions
+from .models import PlaidItem
+from .sync_queue import DEBOUNCE_SECONDS, coalesce_into_pending, enqueue_item_sync, is_sync_job
 
 
 def _resolve_user_by_item_id(item_id: str):
     """
-    Find the owning user given a Plaid item_id.
-    Works with either PlaidItem (preferred) or legacy Account.plaid_item_id.
+    Find the owning user given a Plaid item_id (unique index on PlaidItem.item_id).
     """
     if not item_id:
         return None
 
-    acc = Account.objects.filter(plaid_item_id=item_id).select_related("user").first()
-    if acc:
-        return acc.user
+    item = PlaidItem.objects.filter(item_id=item_id).select_related("user").first()
+    if item:
+        return item.user
 
     return None
 
-def _kick_off_transactions_sync(item_id: str):
+def _kick_off_transactions_sync(item_id: str) -> PlaidWebhookEvent:
     """
-    Hook to trigger your background sync job (Celery/RQ) or a direct call.
-    Keep the webhook fast: enqueue and return.
+    Queue a transactions sync for ``item_id``; ``run_sync_workers`` does the work.
+    Keep the request fast: enqueue and return.
     """
-    # Example (pseudo):
-    # from .tasks import plaid_transactions_sync
-    sync_plaid_item_transactions(item_id)
-    pass
+    return enqueue_item_sync(item_id)
 
 
 @method_decorator(csrf_exempt, name="dispatch")
@@ -60,6 +58,8 @@ class PlaidWebhookView(APIView):
         initial_done = bool(payload.get("initial_update_complete"))
         historical_done = bool(payload.get("historical_update_complete"))
 
+        queue_job = is_sync_job(webhook_type, webhook_code)
+
         # Persist the event first (idempotent audit log)
         evt = PlaidWebhookEvent.objects.create(
             item_id=item_id,
@@ -70,18 +70,25 @@ class PlaidWebhookView(APIView):
             historical_update_complete=historical_done,
             body=payload,
             status="received",
+            # Debounce: give the rest of a webhook burst time to fold into this job.
+            available_at=now() + timedelta(seconds=DEBOUNCE_SECONDS) if queue_job else now(),
         )
 
+        # Sync-triggering events stay "received": the row itself is the queue job,
+        # unless a job for the same item is still waiting and can cover it.
+        if queue_job:
+            covering = coalesce_into_pending(evt)
+            return Response({
+                "ok": True,
+                "id": evt.id,
+                "queued": covering is None,
+                "covered_by": covering.id if covering else None,
+            }, status=200)
+
         # Branch on type/code. Keep it FAST; do heavy work async.
         try:
             if webhook_type == "TRANSACTIONS":
-                if webhook_code in ("SYNC_UPDATES_AVAILABLE", "DEFAULT_UPDATE", "HISTORICAL_UPDATE"):
-                    # Find the user; optional but useful for routing
-                    user = _resolve_user_by_item_id(item_id)
-                    # Enqueue/trigger your transactions sync
-                    _kick_off_transactions_sync(item_id)
-                    evt.status = "done"
-                elif webhook_code == "RECURRING_TRANSACTIONS_UPDATE":
+                if webhook_code == "RECURRING_TRANSACTIONS_UPDATE":
                     # Optional: handle recurring updates separately
                     evt.status = "done"
                 else:
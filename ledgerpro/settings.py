@@ -14,11 +14,18 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 env = environ.Env()
 environ.Env.read_env(os.path.join(BASE_DIR, ".env"))
 
-PLAID_CLIENT_ID = env("PLAID_CLIENT_ID")
-PLAID_SECRET = env("PLAID_SECRET")
-PLAID_ENV = env("PLAID_ENV")  # sandbox|development|production
-PLAID_REDIRECT_URI = env("PLAID_REDIRECT_URI")  # optional
-PLAID_WEBHOOK = env("PLAID_WEBHOOK")
+PLAID_ENV = env("PLAID_ENV")  # sandbox|development|production|local
+# "local" targets the fake server from `manage.py run_fake_plaid`; no real credentials needed.
+_PLAID_LOCAL = PLAID_ENV == "local"
+PLAID_LOCAL_URL = env("PLAID_LOCAL_URL", default="http://127.0.0.1:8765")
+PLAID_CLIENT_ID = env("PLAID_CLIENT_ID", default="local" if _PLAID_LOCAL else environ.Env.NOTSET)
+PLAID_SECRET = env("PLAID_SECRET", default="local" if _PLAID_LOCAL else environ.Env.NOTSET)
+PLAID_REDIRECT_URI = env("PLAID_REDIRECT_URI", default="" if _PLAID_LOCAL else environ.Env.NOTSET)  # optional
+PLAID_WEBHOOK = env("PLAID_WEBHOOK", default="" if _PLAID_LOCAL else environ.Env.NOTSET)
+PLAID_POOL_MAXSIZE = env.int("PLAID_POOL_MAXSIZE", default=10)      # keep-alive sockets per Plaid host
+PLAID_CONNECT_TIMEOUT = env.float("PLAID_CONNECT_TIMEOUT", default=5)
+PLAID_READ_TIMEOUT = env.float("PLAID_READ_TIMEOUT", default=60)
+PLAID_LINK_TOKEN_CACHE_MARGIN = env.int("PLAID_LINK_TOKEN_CACHE_MARGIN", default=300)  # seconds before expiry to stop reusing a link token
 CELERY_BROKER_URL = env("CELERY_BROKER_URL", default="redis://localhost:6379/0")
 CELERY_RESULT_BACKEND = env("CELERY_RESULT_BACKEND", default="redis://localhost:6379/0")
 
@@ -76,6 +83,15 @@ AUTH_PASSWORD_VALIDATORS = [
     {'NAME':'django.contrib.auth.password_validation.NumericPasswordValidator'},
 ]
 
+# Per-process memory by default; point CACHE_URL at redis/memcached to share across workers.
+CACHES = {"default": env.cache("CACHE_URL", default="locmemcache://")}
+# Balance history and spending analytics are only cached with a shared backend (a per-process one
+# would miss other workers' invalidations; `check --deploy` warns). Writes invalidate them on commit;
+# the timeouts bound how long unused entries linger (and how long analytics keep showing a renamed
+# category's old name).
+BALANCE_HISTORY_CACHE_TIMEOUT = env.int("BALANCE_HISTORY_CACHE_TIMEOUT", default=3600)  # seconds
+SPENDING_ANALYTICS_CACHE_TIMEOUT = env.int("SPENDING_ANALYTICS_CACHE_TIMEOUT", default=900)  # seconds
+
 LANGUAGE_CODE='en-us'; TIME_ZONE='UTC'; USE_I18N=True; USE_TZ=True
 STATIC_URL='static/'; STATIC_ROOT=BASE_DIR/'staticfiles'
 DEFAULT_AUTO_FIELD='django.db.models.BigAutoField'